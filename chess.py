@@ -1,13 +1,1425 @@
+import json
 import random
-import copy
+import struct
+import time
+from array import array
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
 
-class ChessBot:
+# ========================= BITBOARD-URI =========================
+# Pătratele sunt numerotate a1=0 ... h8=63 (rank * 8 + file); în tabla 8x8
+# din ChessBot rândul 0 este rank-ul 8, deci row = 7 - rank.
+
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+COLOR_NAMES = ['white', 'black']
+PIECE_NAMES = ['wp', 'wn', 'wb', 'wr', 'wq', 'wk', 'bp', 'bn', 'bb', 'br', 'bq', 'bk']
+PIECE_CODES = {name: i for i, name in enumerate(PIECE_NAMES)}
+SQUARE_NAMES = [chr(ord('a') + (sq & 7)) + str((sq >> 3) + 1) for sq in range(64)]
+
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+RANK_1 = 0xFF
+RANK_3 = RANK_1 << 16
+RANK_6 = RANK_1 << 40
+RANK_8 = RANK_1 << 56
+PROMOTION_RANKS = RANK_1 | RANK_8
+FULL_BOARD = (1 << 64) - 1
+
+
+def _leaper_attacks(deltas):
+    table = []
+    for sq in range(64):
+        rank, file = divmod(sq, 8)
+        bb = 0
+        for dr, df in deltas:
+            r, f = rank + dr, file + df
+            if 0 <= r < 8 and 0 <= f < 8:
+                bb |= 1 << (r * 8 + f)
+        table.append(bb)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_attacks([(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)])
+KING_ATTACKS = _leaper_attacks([(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])
+# PAWN_ATTACKS[color][sq] = pătratele atacate de un pion de culoarea color aflat pe sq
+PAWN_ATTACKS = [_leaper_attacks([(1, -1), (1, 1)]), _leaper_attacks([(-1, -1), (-1, 1)])]
+
+ROOK_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+BISHOP_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def _slide(sq, occupied, directions):
+    rank, file = divmod(sq, 8)
+    bb = 0
+    for dr, df in directions:
+        r, f = rank + dr, file + df
+        while 0 <= r < 8 and 0 <= f < 8:
+            bit = 1 << (r * 8 + f)
+            bb |= bit
+            if occupied & bit:
+                break
+            r += dr
+            f += df
+    return bb
+
+
+def _relevant_mask(sq, directions):
+    # Pătratele de pe margine nu pot bloca nimic în spatele lor, deci nu intră în cheie
+    rank, file = divmod(sq, 8)
+    bb = 0
+    for dr, df in directions:
+        r, f = rank + dr, file + df
+        while 0 <= r + dr < 8 and 0 <= f + df < 8:
+            bb |= 1 << (r * 8 + f)
+            r += dr
+            f += df
+    return bb
+
+
+ROOK_MASKS = [_relevant_mask(sq, ROOK_DIRECTIONS) for sq in range(64)]
+BISHOP_MASKS = [_relevant_mask(sq, BISHOP_DIRECTIONS) for sq in range(64)]
+# Tabele de atac pentru piesele glisante, indexate după ocupația relevantă;
+# fiecare intrare se calculează o singură dată, la prima folosire.
+_ROOK_TABLE = [{} for _ in range(64)]
+_BISHOP_TABLE = [{} for _ in range(64)]
+
+
+def rook_attacks(sq, occupied):
+    key = occupied & ROOK_MASKS[sq]
+    table = _ROOK_TABLE[sq]
+    attacks = table.get(key)
+    if attacks is None:
+        attacks = table[key] = _slide(sq, key, ROOK_DIRECTIONS)
+    return attacks
+
+
+def bishop_attacks(sq, occupied):
+    key = occupied & BISHOP_MASKS[sq]
+    table = _BISHOP_TABLE[sq]
+    attacks = table.get(key)
+    if attacks is None:
+        attacks = table[key] = _slide(sq, key, BISHOP_DIRECTIONS)
+    return attacks
+
+
+def queen_attacks(sq, occupied):
+    return rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
+
+
+def _between_and_line():
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+    for a in range(64):
+        for directions, attacks in ((ROOK_DIRECTIONS, rook_attacks), (BISHOP_DIRECTIONS, bishop_attacks)):
+            for direction in directions:
+                ray = _slide(a, 0, [direction])
+                opposite = _slide(a, 0, [(-direction[0], -direction[1])])
+                for b in iter_bits(ray):
+                    between[a][b] = attacks(a, 1 << b) & attacks(b, 1 << a)
+                    line[a][b] = ray | opposite | (1 << a)
+    return between, line
+
+
+def iter_bits(bb):
+    while bb:
+        bit = bb & -bb
+        yield bit.bit_length() - 1
+        bb ^= bit
+
+
+# BETWEEN[a][b] = pătratele strict între a și b, LINE[a][b] = toată linia prin a și b
+# (0 dacă a și b nu sunt pe aceeași linie, coloană sau diagonală)
+BETWEEN, LINE = _between_and_line()
+
+
+# O mutare este un int: from | to << 6 | promovare << 12 | flag << 15,
+# unde promovarea e tipul piesei (KNIGHT..QUEEN) sau 0.
+NORMAL, EN_PASSANT, CASTLE = 0, 1, 2
+PROMOTION_LETTERS = 'pnbrqk'
+# Ce produce generatorul: toate mutările, doar capturi și promovări, sau restul
+GEN_ALL, GEN_NOISY, GEN_QUIET = 0, 1, 2
+
+
+def encode_move(frm, to, promotion=0, flag=NORMAL):
+    return frm | (to << 6) | (promotion << 12) | (flag << 15)
+
+
+def move_from(move):
+    return move & 63
+
+
+def move_to(move):
+    return (move >> 6) & 63
+
+
+PROMOTION_MASK = 7 << 12
+
+
+def move_promotion(move):
+    return (move >> 12) & 7
+
+
+def move_to_str(move):
+    text = SQUARE_NAMES[move & 63] + SQUARE_NAMES[(move >> 6) & 63]
+    promotion = (move >> 12) & 7
+    if promotion:
+        text += PROMOTION_LETTERS[promotion]
+    return text
+
+
+# Drepturi de rocadă
+WHITE_OO, WHITE_OOO, BLACK_OO, BLACK_OOO = 1, 2, 4, 8
+# CASTLING_MASK[sq] păstrează drepturile care rămân după ce ceva pleacă de pe / ajunge pe sq
+CASTLING_MASK = [15] * 64
+CASTLING_MASK[0] = 15 & ~WHITE_OOO
+CASTLING_MASK[7] = 15 & ~WHITE_OO
+CASTLING_MASK[4] = 15 & ~(WHITE_OO | WHITE_OOO)
+CASTLING_MASK[56] = 15 & ~BLACK_OOO
+CASTLING_MASK[63] = 15 & ~BLACK_OO
+CASTLING_MASK[60] = 15 & ~(BLACK_OO | BLACK_OOO)
+# (drept, pătratul regelui, destinația regelui, pătratele care trebuie să fie goale,
+#  pătratele pe care regele nu are voie să fie atacat)
+CASTLING_MOVES = [
+    [(WHITE_OO, 4, 6, 0x60, (5, 6)), (WHITE_OOO, 4, 2, 0x0E, (3, 2))],
+    [(BLACK_OO, 60, 62, 0x60 << 56, (61, 62)), (BLACK_OOO, 60, 58, 0x0E << 56, (59, 58))],
+]
+
+
+# ========================= ZOBRIST =========================
+# Sămânță fixă: cheile trebuie să fie aceleași de la o rulare la alta.
+_zobrist_rng = random.Random(0x5A0B1257)
+ZOBRIST_PIECES = [[_zobrist_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+ZOBRIST_CASTLING = [0] + [_zobrist_rng.getrandbits(64) for _ in range(15)]
+ZOBRIST_EP = [_zobrist_rng.getrandbits(64) for _ in range(8)]
+# Aceleași chei, dar zero pentru ne-pioni: cheia de pioni se actualizează fără ramificații
+ZOBRIST_PAWNS = [ZOBRIST_PIECES[piece] if piece % 6 == PAWN else [0] * 64 for piece in range(12)]
+
+
+# ========================= EVALUARE (PST) =========================
+# Tabele din perspectiva albului, scrise vizual: primul rând e rank-ul 8.
+# Scorul e interpolat între middlegame și endgame după faza jocului.
+
+MG_VALUES = [82, 337, 365, 477, 1025, 0]
+EG_VALUES = [94, 281, 297, 512, 936, 0]
+PHASE_WEIGHTS = [0, 1, 1, 2, 4, 0]
+MAX_PHASE = 24
+
+_PAWN_MG = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+]
+_PAWN_EG = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+     80,  80,  80,  80,  80,  80,  80,  80,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     30,  30,  30,  30,  30,  30,  30,  30,
+     15,  15,  15,  15,  15,  15,  15,  15,
+      5,   5,   5,   5,   5,   5,   5,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+      0,   0,   0,   0,   0,   0,   0,   0,
+]
+_KNIGHT = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]
+_BISHOP = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]
+_ROOK = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+]
+_QUEEN = [
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+]
+_KING_MG = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+]
+_KING_EG = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+]
+_MG_TABLES = [_PAWN_MG, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_MG]
+_EG_TABLES = [_PAWN_EG, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_EG]
+
+
+def _build_pst(tables, values):
+    # PST[piece][sq] include materialul și semnul (pozitiv pentru alb)
+    pst = []
+    for color in (WHITE, BLACK):
+        for ptype in range(6):
+            table = tables[ptype]
+            if color == WHITE:
+                pst.append([values[ptype] + table[sq ^ 56] for sq in range(64)])
+            else:
+                pst.append([-(values[ptype] + table[sq]) for sq in range(64)])
+    return pst
+
+
+MG_PST = _build_pst(_MG_TABLES, MG_VALUES)
+EG_PST = _build_pst(_EG_TABLES, EG_VALUES)
+PIECE_PHASE = PHASE_WEIGHTS * 2
+
+
+# ========================= STRUCTURA DE PIONI =========================
+# Penalizări și bonusuri (middlegame, endgame); pionii liberi după rank-ul relativ
+
+DOUBLED_PAWN = (10, 20)
+ISOLATED_PAWN = (10, 15)
+PASSED_PAWN_MG = [0, 5, 10, 15, 25, 40, 60, 0]
+PASSED_PAWN_EG = [0, 10, 15, 25, 45, 70, 110, 0]
+FILE_MASKS = [FILE_A << file for file in range(8)]
+ADJACENT_FILES = [(FILE_MASKS[file - 1] if file > 0 else 0)
+                  | (FILE_MASKS[file + 1] if file < 7 else 0) for file in range(8)]
+
+
+def _passed_masks():
+    # Pătratele din fața pionului, pe coloana lui și pe cele vecine
+    masks = [[0] * 64, [0] * 64]
+    for sq in range(64):
+        file, rank = sq & 7, sq >> 3
+        files = FILE_MASKS[file] | ADJACENT_FILES[file]
+        ahead_white = FULL_BOARD << (8 * (rank + 1)) & FULL_BOARD
+        ahead_black = (1 << (8 * rank)) - 1
+        masks[WHITE][sq] = files & ahead_white
+        masks[BLACK][sq] = files & ahead_black
+    return masks
+
+
+PASSED_MASKS = _passed_masks()
+
+
+def evaluate_pawns(white_pawns, black_pawns):
+    """(mg, eg) din perspectiva albului: pioni dublați, izolați și liberi"""
+    mg = eg = 0
+    for color, own, enemy, sign in ((WHITE, white_pawns, black_pawns, 1),
+                                    (BLACK, black_pawns, white_pawns, -1)):
+        for file in range(8):
+            count = (own & FILE_MASKS[file]).bit_count()
+            if not count:
+                continue
+            if count > 1:
+                mg -= sign * DOUBLED_PAWN[0] * (count - 1)
+                eg -= sign * DOUBLED_PAWN[1] * (count - 1)
+            if not own & ADJACENT_FILES[file]:
+                mg -= sign * ISOLATED_PAWN[0] * count
+                eg -= sign * ISOLATED_PAWN[1] * count
+        passed_masks = PASSED_MASKS[color]
+        for sq in iter_bits(own):
+            if not enemy & passed_masks[sq]:
+                rank = sq >> 3 if color == WHITE else 7 - (sq >> 3)
+                mg += sign * PASSED_PAWN_MG[rank]
+                eg += sign * PASSED_PAWN_EG[rank]
+    return mg, eg
+
+
+# Codarea compactă a unei poziții (Position.pack): 8 + 16 + 8 octeți
+_PACKED_STATE = struct.Struct('<BBHHxx')
+PACKED_SIZE = 24 + _PACKED_STATE.size
+
+
+class Position:
     def __init__(self):
+        self.pieces = [0] * 12
+        self.occupied = [0, 0]
+        self.mailbox = [None] * 64
+        self.side = WHITE
+        self.castling = 0
+        # Pătratul en passant se setează doar dacă un pion advers chiar poate captura
+        self.ep = None
+        self.halfmove = 0
+        self.fullmove = 1
+        self.key = 0
+        # Cheie Zobrist doar a pionilor, pentru tabela de pioni
+        self.pawn_key = 0
+        # Evaluare incrementală, din perspectiva albului
+        self.mg = 0
+        self.eg = 0
+        self.phase = 0
+        # Stiva de undo: (mutare, piesa mutată, piesa capturată, partea la mutare,
+        # cheie, rocade, en passant, halfmove)
+        self.history = []
+        # Acumulatorul evaluatorului neural (chess_nnue), dacă e folosit
+        self.accumulator = None
+
+    def __getstate__(self):
+        # Acumulatorul ține referință la rețea; se reface la prima evaluare
+        state = self.__dict__.copy()
+        state['accumulator'] = None
+        return state
+
+    @classmethod
+    def from_board(cls, board, side=WHITE):
+        pos = cls()
+        for row in range(8):
+            for col in range(8):
+                name = board[row][col]
+                if name is not None:
+                    pos.put_piece(PIECE_CODES[name], (7 - row) * 8 + col)
+        # Drepturile de rocadă se deduc din poziția regilor și a turnurilor
+        rights = 0
+        for right, king_sq, rook_sq, piece in ((WHITE_OO, 4, 7, 0), (WHITE_OOO, 4, 0, 0),
+                                               (BLACK_OO, 60, 63, 6), (BLACK_OOO, 60, 56, 6)):
+            if pos.mailbox[king_sq] == piece + KING and pos.mailbox[rook_sq] == piece + ROOK:
+                rights |= right
+        pos.set_castling(rights)
+        pos.set_side(side)
+        return pos
+
+    @classmethod
+    def from_fen(cls, fen):
+        fields = fen.split()
+        rows = fields[0].split('/') if fields else []
+        if len(fields) < 4 or len(rows) != 8 or fields[1] not in ('w', 'b'):
+            raise ValueError(f"FEN invalid: {fen!r}")
+        pos = cls()
+        rank = 7
+        for row in rows:
+            file = 0
+            for ch in row:
+                if ch.isdigit():
+                    file += int(ch)
+                else:
+                    color = 'w' if ch.isupper() else 'b'
+                    if color + ch.lower() not in PIECE_CODES or file > 7:
+                        raise ValueError(f"FEN invalid: {fen!r}")
+                    pos.put_piece(PIECE_CODES[color + ch.lower()], rank * 8 + file)
+                    file += 1
+            if file != 8:
+                raise ValueError(f"FEN invalid: {fen!r}")
+            rank -= 1
+        if pos.pieces[KING].bit_count() != 1 or pos.pieces[6 + KING].bit_count() != 1:
+            raise ValueError(f"FEN invalid (kings): {fen!r}")
+        pos.set_side(WHITE if fields[1] == 'w' else BLACK)
+        rights = 0
+        for ch, right in (('K', WHITE_OO), ('Q', WHITE_OOO), ('k', BLACK_OO), ('q', BLACK_OOO)):
+            if ch in fields[2]:
+                rights |= right
+        pos.set_castling(rights)
+        if fields[3] != '-':
+            ep = SQUARE_NAMES.index(fields[3])
+            if PAWN_ATTACKS[pos.side ^ 1][ep] & pos.pieces[pos.side * 6 + PAWN]:
+                pos.ep = ep
+                pos.key ^= ZOBRIST_EP[ep & 7]
+        if len(fields) > 4:
+            pos.halfmove = int(fields[4])
+        if len(fields) > 5:
+            pos.fullmove = int(fields[5])
+        return pos
+
+    def to_fen(self):
+        rows = []
+        for rank in range(7, -1, -1):
+            row = ''
+            empty = 0
+            for file in range(8):
+                piece = self.mailbox[rank * 8 + file]
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                letter = PROMOTION_LETTERS[piece % 6]
+                row += letter.upper() if piece < 6 else letter
+            rows.append(row + (str(empty) if empty else ''))
+        rights = ''.join(ch for ch, right in (('K', WHITE_OO), ('Q', WHITE_OOO),
+                                              ('k', BLACK_OO), ('q', BLACK_OOO))
+                         if self.castling & right) or '-'
+        ep = SQUARE_NAMES[self.ep] if self.ep is not None else '-'
+        return (f"{'/'.join(rows)} {'wb'[self.side]} {rights} {ep} "
+                f"{self.halfmove} {self.fullmove}")
+
+    def pack(self):
+        """Codare fixă de PACKED_SIZE octeți: ocupare (8), câte un nibble pe piesă
+        în ordinea pătratelor (16), apoi parte/rocade, en passant și ceasurile.
+        Istoria nu e inclusă; rezultatul poate fi cheie de dicționar."""
+        occupied = self.occupied[0] | self.occupied[1]
+        mailbox = self.mailbox
+        nibbles = 0
+        shift = 0
+        bits = occupied
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            nibbles |= mailbox[bit.bit_length() - 1] << shift
+            shift += 4
+        if shift > 128:
+            raise ValueError("Cannot pack a position with more than 32 pieces")
+        return (occupied.to_bytes(8, 'little') + nibbles.to_bytes(16, 'little')
+                + _PACKED_STATE.pack(self.side | self.castling << 1,
+                                     self.ep if self.ep is not None else 255,
+                                     min(self.halfmove, 0xFFFF), min(self.fullmove, 0xFFFF)))
+
+    @classmethod
+    def unpack(cls, data):
+        if len(data) != PACKED_SIZE:
+            raise ValueError(f"Packed position must be {PACKED_SIZE} bytes, got {len(data)}")
+        occupied = int.from_bytes(data[:8], 'little')
+        nibbles = int.from_bytes(data[8:24], 'little')
+        pos = cls()
+        # Ca put_piece, dar cu variabile locale: decodarea e pe calea fierbinte a IPC
+        pieces, mailbox = pos.pieces, pos.mailbox
+        key = pawn_key = mg = eg = phase = 0
+        while occupied:
+            bit = occupied & -occupied
+            occupied ^= bit
+            sq = bit.bit_length() - 1
+            piece = nibbles & 15
+            nibbles >>= 4
+            pieces[piece] |= bit
+            mailbox[sq] = piece
+            key ^= ZOBRIST_PIECES[piece][sq]
+            pawn_key ^= ZOBRIST_PAWNS[piece][sq]
+            mg += MG_PST[piece][sq]
+            eg += EG_PST[piece][sq]
+            phase += PIECE_PHASE[piece]
+        white = 0
+        for piece in range(6):
+            white |= pieces[piece]
+        pos.occupied = [white, int.from_bytes(data[:8], 'little') ^ white]
+        pos.key, pos.pawn_key = key, pawn_key
+        pos.mg, pos.eg, pos.phase = mg, eg, phase
+        flags, ep, pos.halfmove, pos.fullmove = _PACKED_STATE.unpack_from(data, 24)
+        pos.set_castling(flags >> 1 & 15)
+        pos.set_side(flags & 1)
+        if ep != 255:
+            pos.ep = ep
+            pos.key ^= ZOBRIST_EP[ep & 7]
+        return pos
+
+    def to_board(self):
+        board = [[None for _ in range(8)] for _ in range(8)]
+        for sq, piece in enumerate(self.mailbox):
+            if piece is not None:
+                board[7 - (sq >> 3)][sq & 7] = PIECE_NAMES[piece]
+        return board
+
+    def copy(self):
+        pos = Position()
+        pos.pieces = self.pieces[:]
+        pos.occupied = self.occupied[:]
+        pos.mailbox = self.mailbox[:]
+        pos.side = self.side
+        pos.castling = self.castling
+        pos.ep = self.ep
+        pos.halfmove = self.halfmove
+        pos.fullmove = self.fullmove
+        pos.key = self.key
+        pos.pawn_key = self.pawn_key
+        pos.mg, pos.eg, pos.phase = self.mg, self.eg, self.phase
+        pos.history = self.history[:]
+        return pos
+
+    def compute_key(self):
+        key = ZOBRIST_SIDE if self.side == BLACK else 0
+        key ^= ZOBRIST_CASTLING[self.castling]
+        if self.ep is not None:
+            key ^= ZOBRIST_EP[self.ep & 7]
+        for sq, piece in enumerate(self.mailbox):
+            if piece is not None:
+                key ^= ZOBRIST_PIECES[piece][sq]
+        return key
+
+    def evaluate(self):
+        """Scorul tapered din perspectiva albului, citit din câmpurile incrementale"""
+        phase = min(self.phase, MAX_PHASE)
+        return (self.mg * phase + self.eg * (MAX_PHASE - phase)) // MAX_PHASE
+
+    def compute_eval_terms(self):
+        mg = eg = phase = 0
+        for sq, piece in enumerate(self.mailbox):
+            if piece is not None:
+                mg += MG_PST[piece][sq]
+                eg += EG_PST[piece][sq]
+                phase += PIECE_PHASE[piece]
+        return mg, eg, phase
+
+    def compute_pawn_key(self):
+        key = 0
+        for piece in (PAWN, 6 + PAWN):
+            for sq in iter_bits(self.pieces[piece]):
+                key ^= ZOBRIST_PIECES[piece][sq]
+        return key
+
+    def check_eval_consistency(self):
+        expected = self.compute_eval_terms()
+        actual = (self.mg, self.eg, self.phase)
+        if actual != expected:
+            raise AssertionError(f"Evaluare incrementală {actual} != recalculată {expected}")
+        if self.pawn_key != self.compute_pawn_key():
+            raise AssertionError("Cheia de pioni incrementală diferă de cea recalculată")
+        if self.accumulator is not None:
+            self.accumulator.check(self)
+
+    def set_side(self, color):
+        if color != self.side:
+            self.side = color
+            self.key ^= ZOBRIST_SIDE
+
+    def set_castling(self, rights):
+        self.key ^= ZOBRIST_CASTLING[self.castling] ^ ZOBRIST_CASTLING[rights]
+        self.castling = rights
+
+    def put_piece(self, piece, sq):
+        bit = 1 << sq
+        self.pieces[piece] |= bit
+        self.occupied[piece // 6] |= bit
+        self.mailbox[sq] = piece
+        self.key ^= ZOBRIST_PIECES[piece][sq]
+        self.pawn_key ^= ZOBRIST_PAWNS[piece][sq]
+        self.mg += MG_PST[piece][sq]
+        self.eg += EG_PST[piece][sq]
+        self.phase += PIECE_PHASE[piece]
+        if self.accumulator is not None:
+            self.accumulator.add(piece, sq)
+
+    def remove_piece(self, sq):
+        piece = self.mailbox[sq]
+        bit = 1 << sq
+        self.pieces[piece] ^= bit
+        self.occupied[piece // 6] ^= bit
+        self.mailbox[sq] = None
+        self.key ^= ZOBRIST_PIECES[piece][sq]
+        self.pawn_key ^= ZOBRIST_PAWNS[piece][sq]
+        self.mg -= MG_PST[piece][sq]
+        self.eg -= EG_PST[piece][sq]
+        self.phase -= PIECE_PHASE[piece]
+        if self.accumulator is not None:
+            self.accumulator.remove(piece, sq)
+        return piece
+
+    def make_move(self, move):
+        frm, to = move & 63, (move >> 6) & 63
+        flag = move >> 15
+        mailbox = self.mailbox
+        moved = mailbox[frm]
+        captured = mailbox[to]
+        color = moved // 6
+        self.history.append((move, moved, captured, self.side, self.key,
+                             self.castling, self.ep, self.halfmove))
+        if self.ep is not None:
+            self.key ^= ZOBRIST_EP[self.ep & 7]
+            self.ep = None
+        if flag == EN_PASSANT:
+            self.remove_piece(to ^ 8)
+        elif captured is not None:
+            self.remove_piece(to)
+        self.remove_piece(frm)
+        promotion = (move >> 12) & 7
+        self.put_piece(color * 6 + promotion if promotion else moved, to)
+        if flag == CASTLE:
+            if to > frm:
+                self.put_piece(self.remove_piece(frm + 3), frm + 1)
+            else:
+                self.put_piece(self.remove_piece(frm - 4), frm - 1)
+        rights = self.castling & CASTLING_MASK[frm] & CASTLING_MASK[to]
+        if rights != self.castling:
+            self.set_castling(rights)
+        if moved % 6 == PAWN:
+            self.halfmove = 0
+            if to - frm in (16, -16):
+                ep = (frm + to) >> 1
+                if PAWN_ATTACKS[color][ep] & self.pieces[(color ^ 1) * 6 + PAWN]:
+                    self.ep = ep
+                    self.key ^= ZOBRIST_EP[ep & 7]
+        elif captured is not None:
+            self.halfmove = 0
+        else:
+            self.halfmove += 1
+        if color == BLACK:
+            self.fullmove += 1
+        self.set_side(color ^ 1)
+
+    def unmake_move(self):
+        move, moved, captured, side, key, castling, ep, halfmove = self.history.pop()
+        frm, to = move & 63, (move >> 6) & 63
+        flag = move >> 15
+        self.remove_piece(to)
+        self.put_piece(moved, frm)
+        if flag == EN_PASSANT:
+            self.put_piece((moved // 6 ^ 1) * 6 + PAWN, to ^ 8)
+        elif captured is not None:
+            self.put_piece(captured, to)
+        if flag == CASTLE:
+            if to > frm:
+                self.put_piece(self.remove_piece(frm + 1), frm + 3)
+            else:
+                self.put_piece(self.remove_piece(frm - 1), frm - 4)
+        if moved // 6 == BLACK:
+            self.fullmove -= 1
+        self.side = side
+        self.key = key
+        self.castling = castling
+        self.ep = ep
+        self.halfmove = halfmove
+
+    def make_null_move(self):
+        """Pasează rândul (pentru null-move pruning); se anulează cu unmake_null_move"""
+        self.history.append((0, None, None, self.side, self.key,
+                             self.castling, self.ep, self.halfmove))
+        if self.ep is not None:
+            self.key ^= ZOBRIST_EP[self.ep & 7]
+            self.ep = None
+        # Repetițiile nu trec peste o mutare nulă
+        self.halfmove = 0
+        self.set_side(self.side ^ 1)
+
+    def unmake_null_move(self):
+        _, _, _, side, key, _, ep, halfmove = self.history.pop()
+        self.side = side
+        self.key = key
+        self.ep = ep
+        self.halfmove = halfmove
+
+    def perft(self, depth):
+        if depth == 0:
+            return 1
+        moves = self.generate_legal_moves()
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self.make_move(move)
+            nodes += self.perft(depth - 1)
+            self.unmake_move()
+        return nodes
+
+    # ========================= NOTAȚII =========================
+
+    def parse_uci(self, text):
+        """Mutarea legală pentru notația de coordonate ('e2e4', 'e7e8q') sau None"""
+        text = text.strip().lower()
+        if len(text) not in (4, 5) or text[:2] not in SQUARE_NAMES or text[2:4] not in SQUARE_NAMES:
+            return None
+        for move in self.generate_legal_moves():
+            if move_to_str(move) == text:
+                return move
+        return None
+
+    def parse_san(self, text):
+        """Mutarea legală pentru notația algebrică standard ('Nbd7', 'exd5', 'O-O', 'e8=Q+')"""
+        san = text.strip().rstrip('+#!?')
+        moves = self.generate_legal_moves()
+        if san in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+            long_castle = len(san) == 5
+            for move in moves:
+                if move >> 15 == CASTLE and (((move >> 6) & 63) < (move & 63)) == long_castle:
+                    return move
+            raise ValueError(f"Illegal move: {text}")
+        promotion = 0
+        if '=' in san:
+            san, letter = san.split('=', 1)
+            promotion = PROMOTION_LETTERS.index(letter[:1].lower())
+        elif len(san) > 2 and san[-1] in 'NBRQ' and san[-2].isdigit():
+            promotion = PROMOTION_LETTERS.index(san[-1].lower())
+            san = san[:-1]
+        ptype = PAWN
+        if san[:1] in ('N', 'B', 'R', 'Q', 'K'):
+            ptype = PROMOTION_LETTERS.index(san[0].lower())
+            san = san[1:]
+        san = san.replace('x', '').replace('-', '')
+        if len(san) < 2 or san[-2:] not in SQUARE_NAMES:
+            raise ValueError(f"Invalid move: {text}")
+        to = SQUARE_NAMES.index(san[-2:])
+        hint = san[:-2]
+        matches = []
+        for move in moves:
+            frm = move & 63
+            if (move >> 6) & 63 != to or self.mailbox[frm] % 6 != ptype:
+                continue
+            if (move >> 12) & 7 != promotion:
+                continue
+            name = SQUARE_NAMES[frm]
+            if all(ch in name for ch in hint):
+                matches.append(move)
+        if len(matches) != 1:
+            raise ValueError(f"{'Ambiguous' if matches else 'Illegal'} move: {text}")
+        return matches[0]
+
+    def san(self, move):
+        """Notația algebrică standard a unei mutări legale, cu + sau # la final"""
+        frm, to = move & 63, (move >> 6) & 63
+        ptype = self.mailbox[frm] % 6
+        if move >> 15 == CASTLE:
+            text = 'O-O' if to > frm else 'O-O-O'
+        else:
+            capture = self.mailbox[to] is not None or move >> 15 == EN_PASSANT
+            if ptype == PAWN:
+                text = (SQUARE_NAMES[frm][0] + 'x' if capture else '') + SQUARE_NAMES[to]
+                promotion = (move >> 12) & 7
+                if promotion:
+                    text += '=' + PROMOTION_LETTERS[promotion].upper()
+            else:
+                rivals = [other & 63 for other in self.generate_legal_moves()
+                          if (other >> 6) & 63 == to and other & 63 != frm
+                          and self.mailbox[other & 63] == self.mailbox[frm]]
+                hint = ''
+                if rivals:
+                    name = SQUARE_NAMES[frm]
+                    if all(SQUARE_NAMES[sq][0] != name[0] for sq in rivals):
+                        hint = name[0]
+                    elif all(SQUARE_NAMES[sq][1] != name[1] for sq in rivals):
+                        hint = name[1]
+                    else:
+                        hint = name
+                text = (PROMOTION_LETTERS[ptype].upper() + hint + ('x' if capture else '')
+                        + SQUARE_NAMES[to])
+        self.make_move(move)
+        if self.in_check(self.side):
+            text += '#' if not self.generate_legal_moves() else '+'
+        self.unmake_move()
+        return text
+
+    # ========================= REMIZE =========================
+
+    def repetitions(self):
+        """De câte ori a apărut poziția curentă, de la ultima mutare ireversibilă"""
+        count = 1
+        history = self.history
+        for back in range(2, min(self.halfmove, len(history)) + 1, 2):
+            if history[-back][4] == self.key:
+                count += 1
+        return count
+
+    def is_insufficient_material(self):
+        """Doar regi, plus cel mult un nebun sau cal în total"""
+        p = self.pieces
+        for color in (WHITE, BLACK):
+            base = color * 6
+            if p[base + PAWN] or p[base + ROOK] or p[base + QUEEN]:
+                return False
+        minors = sum((p[c * 6 + KNIGHT] | p[c * 6 + BISHOP]).bit_count() for c in (WHITE, BLACK))
+        return minors <= 1
+
+    def draw_reason(self):
+        """'fifty-move', 'repetition', 'insufficient material' sau None"""
+        if self.halfmove >= 100:
+            return 'fifty-move'
+        if self.repetitions() >= 3:
+            return 'repetition'
+        if self.is_insufficient_material():
+            return 'insufficient material'
+        return None
+
+    def parse_move(self, text):
+        """Acceptă atât notația de coordonate cât și SAN"""
+        move = self.parse_uci(text)
+        if move is None:
+            move = self.parse_san(text)
+        return move
+
+    # ========================= ATACURI =========================
+
+    def king_square(self, color):
+        return self.pieces[color * 6 + KING].bit_length() - 1
+
+    def attackers_to(self, sq, by_color, occupied=None):
+        if occupied is None:
+            occupied = self.occupied[0] | self.occupied[1]
+        p = self.pieces
+        base = by_color * 6
+        diagonal = p[base + BISHOP] | p[base + QUEEN]
+        straight = p[base + ROOK] | p[base + QUEEN]
+        return ((PAWN_ATTACKS[by_color ^ 1][sq] & p[base + PAWN])
+                | (KNIGHT_ATTACKS[sq] & p[base + KNIGHT])
+                | (KING_ATTACKS[sq] & p[base + KING])
+                | (bishop_attacks(sq, occupied) & diagonal)
+                | (rook_attacks(sq, occupied) & straight))
+
+    def is_square_attacked(self, sq, by_color):
+        return self.attackers_to(sq, by_color) != 0
+
+    def in_check(self, color):
+        king = self.pieces[color * 6 + KING]
+        if not king:
+            return False
+        return self.is_square_attacked(king.bit_length() - 1, color ^ 1)
+
+    # ========================= GENERARE MUTĂRI =========================
+
+    def checkers_and_pins(self, color):
+        """Piesele care dau șah regelui și piesele proprii legate de rege,
+        calculate o singură dată pe nod din razele regelui"""
+        ksq = self.king_square(color)
+        them = color ^ 1
+        own = self.occupied[color]
+        occupied = own | self.occupied[them]
+        checkers = self.attackers_to(ksq, them, occupied)
+        p = self.pieces
+        base = them * 6
+        snipers = ((rook_attacks(ksq, 0) & (p[base + ROOK] | p[base + QUEEN]))
+                   | (bishop_attacks(ksq, 0) & (p[base + BISHOP] | p[base + QUEEN])))
+        pinned = 0
+        while snipers:
+            bit = snipers & -snipers
+            snipers ^= bit
+            blockers = BETWEEN[ksq][bit.bit_length() - 1] & occupied
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned |= blockers
+        return checkers, pinned
+
+    def generate_legal_moves(self, color=None, kind=GEN_ALL):
+        """Mutările legale; kind = GEN_NOISY dă doar capturi și promovări,
+        GEN_QUIET doar restul (inclusiv rocadele)"""
+        if color is None:
+            color = self.side
+        moves = []
+        them = color ^ 1
+        own = self.occupied[color]
+        enemy = self.occupied[them]
+        occupied = own | enemy
+        p = self.pieces
+        base = color * 6
+        ksq = self.king_square(color)
+        if ksq < 0:
+            return moves
+        checkers, pinned = self.checkers_and_pins(color)
+        empty = ~occupied & FULL_BOARD
+        if kind == GEN_NOISY:
+            kind_mask = enemy
+        elif kind == GEN_QUIET:
+            kind_mask = empty
+        else:
+            kind_mask = ~own & FULL_BOARD
+
+        # Regele: pătratul destinație nu trebuie atacat nici după ce regele îl părăsește
+        without_king = occupied ^ (1 << ksq)
+        for to in iter_bits(KING_ATTACKS[ksq] & kind_mask):
+            if not self.attackers_to(to, them, without_king):
+                moves.append(ksq | (to << 6))
+        if not checkers and self.castling and kind != GEN_NOISY:
+            for right, king_from, king_to, empty_mask, safe in CASTLING_MOVES[color]:
+                if (self.castling & right and not occupied & empty_mask
+                        and not self.attackers_to(safe[0], them, occupied)
+                        and not self.attackers_to(safe[1], them, occupied)):
+                    moves.append(king_from | (king_to << 6) | (CASTLE << 15))
+        if checkers & (checkers - 1):
+            # Șah dublu: doar regele se poate muta
+            return moves
+        if checkers:
+            mask = checkers | BETWEEN[ksq][checkers.bit_length() - 1]
+        else:
+            mask = FULL_BOARD
+        line = LINE[ksq]
+
+        # Pionii sunt generați pe seturi, prin shiftarea întregului bitboard
+        pawns = p[base + PAWN]
+        if color == WHITE:
+            single = (pawns << 8) & empty
+            double = ((single & RANK_3) << 8) & empty
+            left = ((pawns & ~FILE_A) << 7) & enemy
+            right = ((pawns & ~FILE_H) << 9) & enemy
+            deltas = (8, 16, 7, 9)
+        else:
+            single = (pawns >> 8) & empty
+            double = ((single & RANK_6) >> 8) & empty
+            left = ((pawns & ~FILE_A) >> 9) & enemy
+            right = ((pawns & ~FILE_H) >> 7) & enemy
+            deltas = (-8, -16, -9, -7)
+        # Promovările prin înaintare sunt „zgomotoase”, restul înaintărilor liniștite
+        if kind == GEN_NOISY:
+            single &= PROMOTION_RANKS
+            double = 0
+        elif kind == GEN_QUIET:
+            single &= ~PROMOTION_RANKS
+            left = right = 0
+        pushes = zip((single, double, left, right), deltas)
+        for targets, delta in pushes:
+            for to in iter_bits(targets & mask):
+                frm = to - delta
+                if pinned >> frm & 1 and not line[frm] >> to & 1:
+                    continue
+                if (1 << to) & PROMOTION_RANKS:
+                    for promotion in (QUEEN, KNIGHT, ROOK, BISHOP):
+                        moves.append(frm | (to << 6) | (promotion << 12))
+                else:
+                    moves.append(frm | (to << 6))
+        if self.ep is not None and kind != GEN_QUIET:
+            # En passant e rar și poate descoperi un șah pe orizontală,
+            # așa că e singura mutare verificată jucând-o efectiv
+            ep = self.ep
+            for frm in iter_bits(PAWN_ATTACKS[them][ep] & pawns):
+                move = frm | (ep << 6) | (EN_PASSANT << 15)
+                self.make_move(move)
+                if not self.in_check(color):
+                    moves.append(move)
+                self.unmake_move()
+
+        targets_mask = kind_mask & mask
+        for ptype in (KNIGHT, BISHOP, ROOK, QUEEN):
+            for frm in iter_bits(p[base + ptype]):
+                if ptype == KNIGHT:
+                    if pinned >> frm & 1:
+                        # Un cal legat nu se poate mișca niciodată
+                        continue
+                    targets = KNIGHT_ATTACKS[frm]
+                elif ptype == BISHOP:
+                    targets = bishop_attacks(frm, occupied)
+                elif ptype == ROOK:
+                    targets = rook_attacks(frm, occupied)
+                else:
+                    targets = queen_attacks(frm, occupied)
+                targets &= targets_mask
+                if pinned >> frm & 1:
+                    targets &= line[frm]
+                for to in iter_bits(targets):
+                    moves.append(frm | (to << 6))
+        return moves
+
+    def is_legal(self, move):
+        """Verifică o mutare venită din afara generatorului (TT, killers)
+        fără să genereze toate mutările poziției"""
+        if not move:
+            return False
+        frm, to = move & 63, (move >> 6) & 63
+        piece = self.mailbox[frm]
+        color = self.side
+        if piece is None or piece // 6 != color or self.occupied[color] >> to & 1:
+            return False
+        flag = move >> 15
+        promotion = (move >> 12) & 7
+        ptype = piece % 6
+        if flag == CASTLE or flag == EN_PASSANT:
+            # Rare: le căutăm direct în lista generatorului
+            kind = GEN_QUIET if flag == CASTLE else GEN_NOISY
+            return move in self.generate_legal_moves(color, kind)
+        if flag:
+            return False
+        occupied = self.occupied[0] | self.occupied[1]
+        target = self.mailbox[to]
+        if ptype == PAWN:
+            forward = 8 if color == WHITE else -8
+            if (1 << to) & PROMOTION_RANKS:
+                if promotion not in (KNIGHT, BISHOP, ROOK, QUEEN):
+                    return False
+            elif promotion:
+                return False
+            if target is None:
+                start_rank = 1 if color == WHITE else 6
+                if to - frm == forward:
+                    pass
+                elif (to - frm == 2 * forward and frm >> 3 == start_rank
+                      and not occupied >> (frm + forward) & 1):
+                    pass
+                else:
+                    return False
+            elif not PAWN_ATTACKS[color][frm] >> to & 1:
+                return False
+        else:
+            if promotion:
+                return False
+            if ptype == KNIGHT:
+                targets = KNIGHT_ATTACKS[frm]
+            elif ptype == BISHOP:
+                targets = bishop_attacks(frm, occupied)
+            elif ptype == ROOK:
+                targets = rook_attacks(frm, occupied)
+            elif ptype == QUEEN:
+                targets = queen_attacks(frm, occupied)
+            else:
+                targets = KING_ATTACKS[frm]
+            if not targets >> to & 1:
+                return False
+        self.make_move(move)
+        legal = not self.in_check(color)
+        self.unmake_move()
+        return legal
+
+
+# ========================= TABELĂ DE TRANSPOZIȚIE =========================
+
+EXACT, LOWER, UPPER = 1, 2, 3
+MATE_SCORE = 100000
+MATE_BOUND = MATE_SCORE - 1000
+
+
+def score_to_tt(score, ply):
+    # Scorurile de mat se păstrează relativ la nod, nu la rădăcină
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class TranspositionTable:
+    """Tabelă de dimensiune fixă, cu buckets de două intrări:
+    slotul 0 păstrează intrarea cea mai adâncă, slotul 1 se suprascrie mereu."""
+
+    # cheie (8) + scor (4) + mutare (4) + adâncime (1) + tip (1)
+    ENTRY_BYTES = 18
+
+    def __init__(self, size_mb=16):
+        buckets = 1
+        while buckets * 4 * self.ENTRY_BYTES <= size_mb * 1024 * 1024:
+            buckets *= 2
+        self.size_mb = size_mb
+        self.mask = buckets - 1
+        self.slots = buckets * 2
+        self.clear()
+
+    def clear(self):
+        n = self.slots
+        self.keys = array('Q', bytes(8 * n))
+        self.scores = array('i', bytes(4 * n))
+        self.moves = array('I', bytes(4 * n))
+        self.depths = array('b', bytes(n))
+        self.flags = array('B', bytes(n))
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def probe(self, key):
+        """Întoarce (depth, flag, score, move) sau None"""
+        self.probes += 1
+        i = (key & self.mask) << 1
+        keys = self.keys
+        if keys[i] != key:
+            i += 1
+            if keys[i] != key:
+                if self.flags[i - 1] and self.flags[i]:
+                    self.collisions += 1
+                return None
+        if not self.flags[i]:
+            return None
+        self.hits += 1
+        return self.depths[i], self.flags[i], self.scores[i], self.moves[i]
+
+    def store(self, key, depth, flag, score, move):
+        self.stores += 1
+        i = (key & self.mask) << 1
+        keys = self.keys
+        if keys[i] != key and self.flags[i] and depth < self.depths[i]:
+            i += 1
+        if self.flags[i] and keys[i] != key:
+            self.overwrites += 1
+        keys[i] = key
+        self.depths[i] = depth
+        self.flags[i] = flag
+        self.scores[i] = score
+        self.moves[i] = move or 0
+
+    def hashfull(self):
+        """Proporția de sloturi ocupate, în promile (eșantion din primele 1000)"""
+        sample = min(1000, self.slots)
+        return sum(1 for i in range(sample) if self.flags[i]) * 1000 // sample
+
+    def stats(self):
+        return {
+            'size_mb': self.size_mb,
+            'entries': self.slots,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'hashfull': self.hashfull(),
+        }
+
+
+class PawnHashTable:
+    """Cache pentru evaluarea structurii de pioni, indexat direct după cheia de pioni"""
+
+    def __init__(self, entries=1 << 14):
+        size = 1
+        while size < entries:
+            size *= 2
+        self.mask = size - 1
+        self.keys = array('Q', bytes(8 * size))
+        self.mg = array('i', bytes(4 * size))
+        self.eg = array('i', bytes(4 * size))
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        self.__init__(self.mask + 1)
+
+    def evaluate(self, position):
+        """(mg, eg) din perspectiva albului, din cache sau calculat și memorat"""
+        self.probes += 1
+        key = position.pawn_key
+        i = key & self.mask
+        if self.keys[i] == key:
+            self.hits += 1
+            return self.mg[i], self.eg[i]
+        mg, eg = evaluate_pawns(position.pieces[PAWN], position.pieces[6 + PAWN])
+        self.keys[i] = key
+        self.mg[i] = mg
+        self.eg[i] = eg
+        return mg, eg
+
+    def stats(self):
+        return {
+            'entries': self.mask + 1,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
+
+
+# ========================= STATISTICI =========================
+
+@dataclass
+class SearchStats:
+    """Statisticile unei căutări; contoarele sunt simple incrementări în _search"""
+    # 'search', 'book', 'tablebase', 'mate' sau 'parallel'
+    source: str = 'search'
+    nodes: int = 0
+    # Nodurile de la orizont (evaluate sau căutate în quiescence)
+    qnodes: int = 0
+    cutoffs: int = 0
+    first_move_cutoffs: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+    pawn_probes: int = 0
+    pawn_hits: int = 0
+    depth: int = 0
+    score: int = 0
+    seconds: float = 0.0
+    # (adâncime, mutare UCI, scor, noduri, secunde) pentru fiecare iterație
+    iterations: List = field(default_factory=list)
+    pv: List[str] = field(default_factory=list)
+    # Noduri pe ply, doar cu ChessBot.collect_histogram
+    ply_nodes: Optional[List[int]] = None
+
+    @property
+    def nps(self):
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def pawn_hit_rate(self):
+        return self.pawn_hits / self.pawn_probes if self.pawn_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def effective_branching_factor(self):
+        """Raportul nodurilor dintre ultimele două iterații"""
+        if len(self.iterations) >= 2:
+            last = self.iterations[-1][3] - self.iterations[-2][3]
+            previous = self.iterations[-2][3] - (self.iterations[-3][3]
+                                                 if len(self.iterations) >= 3 else 0)
+            if previous > 0:
+                return last / previous
+        if self.depth > 0 and self.nodes > 0:
+            return self.nodes ** (1 / self.depth)
+        return 0.0
+
+    def merge(self, other):
+        """Adună contoarele altei căutări (workerii căutării paralele)"""
+        self.nodes += other.nodes
+        self.qnodes += other.qnodes
+        self.cutoffs += other.cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.pawn_probes += other.pawn_probes
+        self.pawn_hits += other.pawn_hits
+        if other.ply_nodes is not None:
+            if self.ply_nodes is None:
+                self.ply_nodes = [0] * len(other.ply_nodes)
+            for ply, count in enumerate(other.ply_nodes):
+                self.ply_nodes[ply] += count
+
+    def to_dict(self):
+        data = asdict(self)
+        data.update(nps=self.nps, tt_hit_rate=self.tt_hit_rate, pawn_hit_rate=self.pawn_hit_rate,
+                    first_move_cutoff_rate=self.first_move_cutoff_rate,
+                    effective_branching_factor=self.effective_branching_factor)
+        if self.ply_nodes is not None:
+            # Fără coada de zerouri
+            while data['ply_nodes'] and not data['ply_nodes'][-1]:
+                data['ply_nodes'].pop()
+        return data
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+
+# Valori în centipioni pentru ordonare și pruning; regii nu se capturează
+PIECE_VALUES = [100, 300, 320, 500, 900, 0]
+
+MAX_PLY = 64
+MAX_DEPTH = 32
+# Tehnicile de căutare selectivă, fiecare poate fi oprită prin search_options
+SEARCH_OPTIONS = {
+    'quiescence': True,
+    'delta_pruning': True,
+    'null_move': True,
+    'lmr': True,
+    'futility': True,
+    'staged_moves': True,
+    'pawn_structure': True,
+    'mate_solver': True,
+}
+# Marja pentru delta pruning și marjele de futility pe adâncimea rămasă
+DELTA_MARGIN = 200
+FUTILITY_MARGINS = [0, 200, 500]
+NULL_MOVE_MIN_DEPTH = 3
+LMR_MIN_DEPTH = 3
+LMR_MIN_INDEX = 3
+HISTORY_MAX = 1 << 20
+# Bugetul căutării de mat df-pn rulate înaintea iterative deepening
+MATE_SOLVER_NODES = 10000
+MATE_SOLVER_TIME_RATIO = 0.1
+# Fracțiunea din timp după care nu mai începem o iterație nouă
+SOFT_TIME_RATIO = 0.5
+
+
+class ChessBot:
+    def __init__(self, tt_size_mb=16, move_time=2.0, debug=False, workers=1, book_path=None,
+                 tablebase_dir=None, stats_log=None, collect_histogram=False,
+                 search_options=None, pawn_hash_entries=1 << 14, nnue_path=None,
+                 mate_table_entries=1 << 18):
+        self.tt = TranspositionTable(tt_size_mb)
+        self.pawn_table = PawnHashTable(pawn_hash_entries)
+        # Configurația căutării, refolosită de boții din procesele worker (chess_parallel)
+        self.worker_options = {
+            'tt_size_mb': tt_size_mb, 'tablebase_dir': tablebase_dir,
+            'search_options': search_options, 'pawn_hash_entries': pawn_hash_entries,
+            'nnue_path': nnue_path, 'mate_table_entries': mate_table_entries,
+        }
+        # Cu o rețea NNUE (necesită numpy), ea înlocuiește evaluarea scrisă de mână
+        self.nnue = None
+        if nnue_path is not None:
+            from chess_nnue import NnueNetwork
+            self.nnue = NnueNetwork.load(nnue_path)
+        self.options = dict(SEARCH_OPTIONS)
+        if search_options:
+            unknown = set(search_options) - set(SEARCH_OPTIONS)
+            if unknown:
+                raise ValueError(f"Unknown search options: {', '.join(sorted(unknown))}")
+            self.options.update(search_options)
+        # Mutările găsite în cartea de deschideri sunt jucate fără căutare
+        self.book = None
+        if book_path is not None:
+            from chess_book import OpeningBook
+            self.book = OpeningBook(book_path)
+        # Finalurile cu puține piese se rezolvă din tabele, la rădăcină și în arbore
+        self.tablebases = None
+        if tablebase_dir is not None:
+            from chess_tablebase import Tablebases
+            self.tablebases = Tablebases(tablebase_dir)
+        # Căutarea de mat (chess_mate) are tabela ei de noduri, creată la prima folosire
+        self.mate_table_entries = mate_table_entries
+        self.mate_solver = None
+        self.move_time = move_time
+        # Cu workers > 1, get_best_move împarte mutările de la rădăcină între procese
+        self.workers = workers
+        self._parallel = None
+        # În modul debug fiecare frunză verifică evaluarea incrementală
+        self.debug = debug
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history_table = [[0] * 64 for _ in range(12)]
+        self.nodes = 0
+        self.stopped = False
+        self.soft_deadline = self.hard_deadline = float('inf')
+        # Oprire cerută din alt fir (ex. threading.Event din front-end-ul UCI)
+        self.stop_event = None
+        # Apelat după fiecare iterație cu (adâncime, mutare, scor, noduri)
+        self.info_callback = None
+        # SearchStats pentru ultima căutare; cu stats_log, fiecare e adăugat
+        # ca o linie JSON în fișier
+        self.last_stats = None
+        self.stats_log = stats_log
+        self._stats_file = None
+        self.collect_histogram = collect_histogram
+        self.qnodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.ply_nodes = None
+        self.last_score = 0
+        self.last_depth = 0
+        # (adâncime, mutare, scor, noduri) pentru fiecare iterație terminată
+        self.iterations = []
+        self.position = Position()
         self.board = self.initialize_board()
         self.current_player = 'white'
         self.game_over = False
         self.winner = None
-        
+
+    # Tabla 8x8 și jucătorul curent sunt vederi peste Position
+    @property
+    def board(self):
+        return self.position.to_board()
+
+    @board.setter
+    def board(self, board):
+        self.position = Position.from_board(board, self.position.side)
+
+    @property
+    def current_player(self):
+        return COLOR_NAMES[self.position.side]
+
+    @current_player.setter
+    def current_player(self, color):
+        self.position.set_side(COLOR_NAMES.index(color))
+
     def initialize_board(self):
         board = [[None for _ in range(8)] for _ in range(8)]
         for i in range(8):
@@ -19,16 +1431,35 @@ class ChessBot:
             board[7][i] = 'w' + piece
         return board
 
+    def set_fen(self, fen):
+        """Pornește jocul din poziția FEN dată (ValueError dacă e invalidă)"""
+        self.position = Position.from_fen(fen)
+        self.game_over = False
+        self.winner = None
+
+    def get_fen(self):
+        return self.position.to_fen()
+
+    def set_packed(self, data):
+        """Pornește jocul din codarea compactă (Position.pack)"""
+        self.position = Position.unpack(data)
+        self.game_over = False
+        self.winner = None
+
+    def get_packed(self):
+        return self.position.pack()
+
     def print_board(self):
         piece_symbols = {
             'wk': '♔', 'wq': '♕', 'wr': '♖', 'wb': '♗', 'wn': '♘', 'wp': '♙',
             'bk': '♚', 'bq': '♛', 'br': '♜', 'bb': '♝', 'bn': '♞', 'bp': '♟'
         }
+        board = self.board
         print("\n  a b c d e f g h")
         for i in range(8):
             print(f"{8-i} ", end="")
             for j in range(8):
-                piece = self.board[i][j]
+                piece = board[i][j]
                 print(piece_symbols.get(piece, '·') + " ", end="")
             print(f"{8-i}")
         print("  a b c d e f g h\n")
@@ -45,6 +1476,13 @@ class ChessBot:
     def indices_to_pos(self, row, col):
         return chr(ord('a') + col) + str(8 - row)
 
+    def pos_to_square(self, pos):
+        indices = self.pos_to_indices(pos)
+        if indices is None:
+            return None
+        row, col = indices
+        return (7 - row) * 8 + col
+
     def get_piece_color(self, piece):
         if piece is None:
             return None
@@ -52,227 +1490,591 @@ class ChessBot:
 
     # ========================= VALIDĂRI DE MUTARE =========================
 
-    def is_valid_move(self, from_pos, to_pos):
-        from_indices = self.pos_to_indices(from_pos)
-        to_indices = self.pos_to_indices(to_pos)
-        if not from_indices or not to_indices:
-            return False
-
-        from_row, from_col = from_indices
-        to_row, to_col = to_indices
-        piece = self.board[from_row][from_col]
-        target = self.board[to_row][to_col]
-
-        if piece is None:
-            return False
-        if self.get_piece_color(piece) != self.current_player:
-            return False
-        if target and self.get_piece_color(target) == self.current_player:
-            return False
-
-        piece_type = piece[1]
-        if piece_type == 'p':
-            if not self.is_valid_pawn_move(from_row, from_col, to_row, to_col, piece):
-                return False
-        elif piece_type == 'r' and not self.is_valid_rook_move(from_row, from_col, to_row, to_col):
-            return False
-        elif piece_type == 'n' and not self.is_valid_knight_move(from_row, from_col, to_row, to_col):
-            return False
-        elif piece_type == 'b' and not self.is_valid_bishop_move(from_row, from_col, to_row, to_col):
-            return False
-        elif piece_type == 'q' and not (self.is_valid_rook_move(from_row, from_col, to_row, to_col) or
-                                        self.is_valid_bishop_move(from_row, from_col, to_row, to_col)):
-            return False
-        elif piece_type == 'k' and not self.is_valid_king_move(from_row, from_col, to_row, to_col):
-            return False
-
-        # NU permite mutări care își lasă regele în șah
-        simulated_board = copy.deepcopy(self.board)
-        simulated_board[to_row][to_col] = simulated_board[from_row][from_col]
-        simulated_board[from_row][from_col] = None
-        if self.is_king_in_check(self.current_player, simulated_board):
-            return False
-
-        return True
-
-    def is_valid_pawn_move(self, fr, fc, tr, tc, piece):
-        direction = -1 if piece[0] == 'w' else 1
-        start_row = 6 if piece[0] == 'w' else 1
-        if fc == tc:
-            if tr == fr + direction and self.board[tr][tc] is None:
-                return True
-            if fr == start_row and tr == fr + 2 * direction and self.board[fr + direction][fc] is None and self.board[tr][tc] is None:
-                return True
-        elif abs(fc - tc) == 1 and tr == fr + direction and self.board[tr][tc] is not None:
-            return True
-        return False
-
-    def is_valid_rook_move(self, fr, fc, tr, tc):
-        if fr != tr and fc != tc:
-            return False
-        if fr == tr:
-            for c in range(min(fc, tc) + 1, max(fc, tc)):
-                if self.board[fr][c] is not None:
-                    return False
-        else:
-            for r in range(min(fr, tr) + 1, max(fr, tr)):
-                if self.board[r][fc] is not None:
-                    return False
-        return True
+    def find_move(self, from_pos, to_pos):
+        """Mutarea legală (int) corespunzătoare lui from_pos/to_pos sau None.
+        to_pos poate avea litera piesei de promovare ('e8n'); implicit damă."""
+        promotion = QUEEN
+        if len(to_pos) == 3:
+            letter = to_pos[2].lower()
+            if letter not in 'nbrq':
+                return None
+            promotion = PROMOTION_LETTERS.index(letter)
+            to_pos = to_pos[:2]
+        frm = self.pos_to_square(from_pos)
+        to = self.pos_to_square(to_pos)
+        if frm is None or to is None:
+            return None
+        # Generatorul produce doar mutări legale (inclusiv regele să nu rămână în șah);
+        # rocada se dă ca mutare a regelui, ex. e1 g1
+        for move in self.position.generate_legal_moves():
+            if move & 63 == frm and (move >> 6) & 63 == to:
+                if not move & PROMOTION_MASK or (move >> 12) & 7 == promotion:
+                    return move
+        return None
 
-    def is_valid_knight_move(self, fr, fc, tr, tc):
-        return (abs(fr - tr), abs(fc - tc)) in [(2, 1), (1, 2)]
+    def move_to_pair(self, move):
+        return SQUARE_NAMES[move & 63], move_to_str(move)[2:]
 
-    def is_valid_bishop_move(self, fr, fc, tr, tc):
-        if abs(fr - tr) != abs(fc - tc):
-            return False
-        rdir = 1 if tr > fr else -1
-        cdir = 1 if tc > fc else -1
-        for i in range(1, abs(fr - tr)):
-            if self.board[fr + i * rdir][fc + i * cdir] is not None:
-                return False
-        return True
-
-    def is_valid_king_move(self, fr, fc, tr, tc):
-        return abs(fr - tr) <= 1 and abs(fc - tc) <= 1
+    def is_valid_move(self, from_pos, to_pos):
+        return self.find_move(from_pos, to_pos) is not None
 
     # ========================= DETECȚIE ȘAH / MAT =========================
 
     def find_king(self, color, board=None):
-        if board is None:
-            board = self.board
-        for r in range(8):
-            for c in range(8):
-                if board[r][c] == ('w' if color == 'white' else 'b') + 'k':
-                    return r, c
-        return None
+        if board is not None:
+            pos = Position.from_board(board)
+        else:
+            pos = self.position
+        sq = pos.king_square(COLOR_NAMES.index(color))
+        if sq < 0:
+            return None
+        return 7 - (sq >> 3), sq & 7
 
     def is_king_in_check(self, color, board=None):
-        if board is None:
-            board = self.board
-        king_pos = self.find_king(color, board)
-        if not king_pos:
-            return False
-        kr, kc = king_pos
-        enemy_color = 'black' if color == 'white' else 'white'
-        for r in range(8):
-            for c in range(8):
-                piece = board[r][c]
-                if piece and self.get_piece_color(piece) == enemy_color:
-                    from_pos = self.indices_to_pos(r, c)
-                    to_pos = self.indices_to_pos(kr, kc)
-                    old_player = self.current_player
-                    self.current_player = enemy_color
-                    if self.is_valid_move(from_pos, to_pos):
-                        self.current_player = old_player
-                        return True
-                    self.current_player = old_player
-        return False
+        pos = self.position if board is None else Position.from_board(board)
+        return pos.in_check(COLOR_NAMES.index(color))
 
     def is_checkmate(self, color):
         if not self.is_king_in_check(color):
             return False
-        return len(self.get_all_valid_moves(color)) == 0
+        return len(self.position.generate_legal_moves(COLOR_NAMES.index(color))) == 0
 
     # ========================= MUTĂRI, MINIMAX, AI =========================
 
     def make_move(self, from_pos, to_pos):
-        if not self.is_valid_move(from_pos, to_pos):
+        move = self.find_move(from_pos, to_pos)
+        if move is None:
             return False
-        fr, fc = self.pos_to_indices(from_pos)
-        tr, tc = self.pos_to_indices(to_pos)
-        self.board[tr][tc] = self.board[fr][fc]
-        self.board[fr][fc] = None
-        self.current_player = 'black' if self.current_player == 'white' else 'white'
+        self.position.make_move(move)
+        return True
+
+    def unmake_move(self):
+        if not self.position.history:
+            return False
+        self.position.unmake_move()
         return True
 
     def get_all_valid_moves(self, color):
-        moves = []
-        old_player = self.current_player
-        for r in range(8):
-            for c in range(8):
-                piece = self.board[r][c]
-                if piece and self.get_piece_color(piece) == color:
-                    from_pos = self.indices_to_pos(r, c)
-                    self.current_player = color
-                    for tr in range(8):
-                        for tc in range(8):
-                            to_pos = self.indices_to_pos(tr, tc)
-                            if from_pos != to_pos and self.is_valid_move(from_pos, to_pos):
-                                moves.append((from_pos, to_pos))
-        self.current_player = old_player
-        return moves
+        moves = self.position.generate_legal_moves(COLOR_NAMES.index(color))
+        return [self.move_to_pair(m) for m in moves]
 
     def evaluate_board(self):
-        piece_values = {'p': 1, 'n': 3, 'b': 3.2, 'r': 5, 'q': 9, 'k': 100}
-        score = 0
-        for r in range(8):
-            for c in range(8):
-                piece = self.board[r][c]
-                if piece:
-                    val = piece_values[piece[1]]
-                    if piece[0] == 'w':
-                        score += val
-                    else:
-                        score -= val
+        pos = self.position
+        if self.debug:
+            pos.check_eval_consistency()
+        if self.nnue is not None:
+            return self.nnue.evaluate(pos)
+        score = pos.evaluate()
+        if self.options['pawn_structure']:
+            mg, eg = self.pawn_table.evaluate(pos)
+            phase = min(pos.phase, MAX_PHASE)
+            score += (mg * phase + eg * (MAX_PHASE - phase)) // MAX_PHASE
         return score
 
     def minimax(self, depth, maximizing, alpha=-float('inf'), beta=float('inf')):
-        if depth == 0 or self.is_checkmate('white') or self.is_checkmate('black'):
-            return self.evaluate_board()
-        color = 'white' if maximizing else 'black'
-        moves = self.get_all_valid_moves(color)
-        if not moves:
-            return self.evaluate_board()
+        # Scor din perspectiva albului; căutarea propriu-zisă e negamax, fără limită de timp
+        self.soft_deadline = self.hard_deadline = float('inf')
+        self.stopped = False
+        alpha = max(alpha, -MATE_SCORE)
+        beta = min(beta, MATE_SCORE)
         if maximizing:
-            max_eval = -float('inf')
-            for f, t in moves:
-                old_board = copy.deepcopy(self.board)
-                old_player = self.current_player
-                self.make_move(f, t)
-                eval_score = self.minimax(depth - 1, False, alpha, beta)
-                self.board = old_board
-                self.current_player = old_player
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break
-            return max_eval
+            return self._search(depth, alpha, beta, 0)
+        return -self._search(depth, -beta, -alpha, 0)
+
+    # ========================= ORDONAREA MUTĂRILOR =========================
+
+    def _order_moves(self, moves, hash_move, ply):
+        # Mutarea din TT/PV, capturi MVV-LVA, killers, apoi istoric
+        mailbox = self.position.mailbox
+        killer1, killer2 = self.killers[ply]
+        history = self.history_table
+
+        def score(move):
+            if move == hash_move:
+                return 1 << 30
+            to = (move >> 6) & 63
+            victim = mailbox[to]
+            attacker = mailbox[move & 63]
+            if victim is not None:
+                return (1 << 29) + (victim % 6) * 8 + 7 - attacker % 6 + ((move >> 12) & 7) * 64
+            if move & PROMOTION_MASK:
+                return (1 << 29) + ((move >> 12) & 7) * 64
+            if move == killer1:
+                return 1 << 28
+            if move == killer2:
+                return (1 << 28) - 1
+            return history[attacker][to]
+
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def _staged_moves(self, hash_move, ply):
+        """Mutările nodului pe etape: mutarea din TT, capturile câștigătoare,
+        killers, mutările liniștite după istoric, apoi capturile pierzătoare.
+        O etapă se generează doar când cea anterioară s-a epuizat fără tăietură."""
+        pos = self.position
+        mailbox = pos.mailbox
+        if hash_move and pos.is_legal(hash_move):
+            yield hash_move
         else:
-            min_eval = float('inf')
-            for f, t in moves:
-                old_board = copy.deepcopy(self.board)
-                old_player = self.current_player
-                self.make_move(f, t)
-                eval_score = self.minimax(depth - 1, True, alpha, beta)
-                self.board = old_board
-                self.current_player = old_player
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break
-            return min_eval
+            hash_move = 0
 
-    def get_best_move(self, color, depth=3):
-        moves = self.get_all_valid_moves(color)
-        if not moves:
-            return None
-        best_move = None
-        best_score = -float('inf') if color == 'white' else float('inf')
-        for f, t in moves:
-            old_board = copy.deepcopy(self.board)
-            old_player = self.current_player
-            self.make_move(f, t)
-            score = self.minimax(depth - 1, color == 'black')
-            self.board = old_board
-            self.current_player = old_player
-            if color == 'white' and score > best_score:
+        them = pos.side ^ 1
+        good, bad = [], []
+        for move in pos.generate_legal_moves(kind=GEN_NOISY):
+            if move == hash_move:
+                continue
+            to = (move >> 6) & 63
+            victim = mailbox[to]
+            attacker = mailbox[move & 63] % 6
+            promotion = (move >> 12) & 7
+            victim_type = victim % 6 if victim is not None else PAWN
+            order = victim_type * 8 + 7 - attacker + promotion * 64
+            # Capturi pierzătoare: piesă mai valoroasă pe un pătrat apărat; sub-promovările la final
+            if promotion and promotion != QUEEN:
+                bad.append((order, move))
+            elif (PIECE_VALUES[victim_type] + PIECE_VALUES[promotion] >= PIECE_VALUES[attacker]
+                  or not pos.attackers_to(to, them)):
+                good.append((order, move))
+            else:
+                bad.append((order, move))
+        good.sort(reverse=True)
+        for _, move in good:
+            yield move
+
+        played = [hash_move]
+        for killer in self.killers[ply]:
+            if (killer and killer not in played and mailbox[(killer >> 6) & 63] is None
+                    and not killer & PROMOTION_MASK and killer >> 15 != EN_PASSANT
+                    and pos.is_legal(killer)):
+                played.append(killer)
+                yield killer
+
+        history = self.history_table
+        quiets = [move for move in pos.generate_legal_moves(kind=GEN_QUIET) if move not in played]
+        quiets.sort(key=lambda move: history[mailbox[move & 63]][(move >> 6) & 63], reverse=True)
+        yield from quiets
+
+        bad.sort(reverse=True)
+        for _, move in bad:
+            yield move
+
+    def _update_quiet_stats(self, move, depth, ply):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        row = self.history_table[self.position.mailbox[move & 63]]
+        to = (move >> 6) & 63
+        row[to] += depth * depth
+        if row[to] > HISTORY_MAX:
+            self._age_history()
+
+    def _age_history(self):
+        for row in self.history_table:
+            for sq in range(64):
+                row[sq] >>= 1
+
+    # ========================= CĂUTARE =========================
+
+    def _check_time(self):
+        if time.perf_counter() >= self.hard_deadline or (
+                self.stop_event is not None and self.stop_event.is_set()):
+            self.stopped = True
+
+    def _search(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & 255:
+            self._check_time()
+        if self.ply_nodes is not None:
+            self.ply_nodes[ply] += 1
+        pos = self.position
+        tt = self.tt
+        key = pos.key
+        hash_move = 0
+        entry = tt.probe(key)
+        if entry is not None:
+            tt_depth, flag, tt_score, hash_move = entry
+            if tt_depth >= depth and ply > 0:
+                tt_score = score_from_tt(tt_score, ply)
+                if flag == EXACT:
+                    return tt_score
+                if flag == LOWER and tt_score >= beta:
+                    return tt_score
+                if flag == UPPER and tt_score <= alpha:
+                    return tt_score
+        if self.tablebases is not None and ply > 0:
+            tb_score = self.tablebases.probe_score(pos, ply)
+            if tb_score is not None:
+                return tb_score
+
+        in_check = pos.in_check(pos.side)
+        if depth <= 0 or ply >= MAX_PLY - 1:
+            if self.options['quiescence'] and ply < MAX_PLY - 1:
+                return self._quiesce(alpha, beta, ply)
+            if not pos.generate_legal_moves():
+                return -MATE_SCORE + ply if in_check else 0
+            self.qnodes += 1
+            score = self.evaluate_board()
+            return score if pos.side == WHITE else -score
+
+        options = self.options
+        static = None
+        if not in_check and ply > 0:
+            static = self.evaluate_board()
+            if pos.side != WHITE:
+                static = -static
+            # Null move: dacă și după o pasă suntem peste beta, tăiem. Nu în
+            # finaluri doar cu pioni (zugzwang) și nu după altă mutare nulă
+            if (options['null_move'] and depth >= NULL_MOVE_MIN_DEPTH and static >= beta
+                    and abs(beta) < MATE_BOUND and (not pos.history or pos.history[-1][0])
+                    and pos.occupied[pos.side] & ~(pos.pieces[pos.side * 6 + PAWN]
+                                                   | pos.pieces[pos.side * 6 + KING])):
+                reduction = 3 if depth >= 6 else 2
+                pos.make_null_move()
+                score = -self._search(depth - 1 - reduction, -beta, -beta + 1, ply + 1)
+                pos.unmake_null_move()
+                if self.stopped:
+                    return 0
+                if score >= beta:
+                    return beta
+        # Futility: la ultimele plies, mutările liniștite nu pot ridica alpha
+        futile = (options['futility'] and static is not None and depth < len(FUTILITY_MARGINS)
+                  and abs(alpha) < MATE_BOUND and static + FUTILITY_MARGINS[depth] <= alpha)
+
+        if options['staged_moves']:
+            moves = self._staged_moves(hash_move, ply)
+        else:
+            moves = self._order_moves(pos.generate_legal_moves(), hash_move, ply)
+        mailbox = pos.mailbox
+        alpha_orig = alpha
+        best_score = -MATE_SCORE
+        best_move = 0
+        index = -1
+        for index, move in enumerate(moves):
+            quiet = (mailbox[(move >> 6) & 63] is None and not move & PROMOTION_MASK
+                     and move >> 15 != EN_PASSANT)
+            pos.make_move(move)
+            gives_check = quiet and index > 0 and pos.in_check(pos.side)
+            if futile and quiet and index > 0 and not gives_check:
+                pos.unmake_move()
+                if static + FUTILITY_MARGINS[depth] > best_score:
+                    best_score = static + FUTILITY_MARGINS[depth]
+                continue
+            # LMR: mutările liniștite târzii se caută mai puțin adânc; dacă
+            # ridică totuși alpha, se reiau la adâncimea întreagă
+            if (options['lmr'] and quiet and not in_check and not gives_check
+                    and depth >= LMR_MIN_DEPTH and index >= LMR_MIN_INDEX):
+                reduction = 2 if index >= 2 * LMR_MIN_INDEX and depth >= 6 else 1
+                score = -self._search(depth - 1 - reduction, -alpha - 1, -alpha, ply + 1)
+                if score > alpha and not self.stopped:
+                    score = -self._search(depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self._search(depth - 1, -beta, -alpha, ply + 1)
+            pos.unmake_move()
+            if self.stopped:
+                return 0
+            if score > best_score:
                 best_score = score
-                best_move = (f, t)
-            elif color == 'black' and score < best_score:
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.cutoffs += 1
+                        if index == 0:
+                            self.first_move_cutoffs += 1
+                        if quiet:
+                            self._update_quiet_stats(move, depth, ply)
+                        break
+
+        if index < 0:
+            # Nicio mutare legală: mat sau pat
+            return -MATE_SCORE + ply if in_check else 0
+        if best_score >= beta:
+            flag = LOWER
+        elif best_score > alpha_orig:
+            flag = EXACT
+        else:
+            flag = UPPER
+        tt.store(key, depth, flag, score_to_tt(best_score, ply), best_move)
+        return best_score
+
+    def _quiesce(self, alpha, beta, ply):
+        """Doar capturi și promovări, cu stand-pat; în șah se caută toate evitările"""
+        self.nodes += 1
+        self.qnodes += 1
+        if not self.nodes & 255:
+            self._check_time()
+        if self.ply_nodes is not None:
+            self.ply_nodes[ply] += 1
+        pos = self.position
+        in_check = pos.in_check(pos.side)
+        if in_check:
+            moves = pos.generate_legal_moves()
+            if not moves:
+                return -MATE_SCORE + ply
+        else:
+            # Patul nu e detectat aici; capturile sunt suficiente pentru stand-pat
+            moves = pos.generate_legal_moves(kind=GEN_NOISY)
+        stand = self.evaluate_board()
+        if pos.side != WHITE:
+            stand = -stand
+        if ply >= MAX_PLY - 1:
+            return stand
+        mailbox = pos.mailbox
+        delta = self.options['delta_pruning']
+        if in_check:
+            best_score = -MATE_SCORE + ply
+        else:
+            if stand >= beta:
+                return stand
+            # Nici câștigarea unei dame nu ar ajunge la alpha
+            if delta and stand + PIECE_VALUES[QUEEN] + DELTA_MARGIN < alpha:
+                return stand
+            best_score = stand
+            if stand > alpha:
+                alpha = stand
+        self._order_moves(moves, 0, ply)
+        for move in moves:
+            if delta and not in_check and not move & PROMOTION_MASK:
+                victim = mailbox[(move >> 6) & 63]
+                gain = PIECE_VALUES[victim % 6] if victim is not None else PIECE_VALUES[PAWN]
+                if stand + gain + DELTA_MARGIN <= alpha:
+                    continue
+            pos.make_move(move)
+            score = -self._quiesce(-beta, -alpha, ply + 1)
+            pos.unmake_move()
+            if self.stopped:
+                return 0
+            if score > best_score:
                 best_score = score
-                best_move = (f, t)
-        return best_move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
+    def _search_root(self, moves, depth):
+        # Întoarce (mutare, scor); mutarea e None dacă iterația a fost
+        # întreruptă înainte să se termine vreo mutare
+        pos = self.position
+        alpha, beta = -MATE_SCORE, MATE_SCORE
+        best_move, best_score = None, -MATE_SCORE
+        for move in moves:
+            pos.make_move(move)
+            score = -self._search(depth - 1, -beta, -alpha, 1)
+            pos.unmake_move()
+            if self.stopped:
+                break
+            if score > best_score:
+                best_move, best_score = move, score
+                alpha = max(alpha, score)
+        if best_move is not None and not self.stopped:
+            self.tt.store(pos.key, depth, EXACT, best_score, best_move)
+        return best_move, best_score
+
+    def search(self, depth=None, time_limit=None, root_moves=None):
+        """Iterative deepening pentru partea la mutare. Cu time_limit (secunde),
+        nu începe o iterație nouă după termenul soft și se oprește la cel hard;
+        depth limitează adâncimea maximă, root_moves restrânge mutările de la
+        rădăcină. Întoarce (mutare, scor, adâncime)."""
+        pos = self.position
+        moves = pos.generate_legal_moves()
+        if root_moves is not None:
+            moves = [move for move in moves if move in root_moves]
+        self.iterations = []
+        start = time.perf_counter()
+        self.nodes = self.qnodes = self.cutoffs = self.first_move_cutoffs = 0
+        self.ply_nodes = [0] * MAX_PLY if self.collect_histogram else None
+        self._tt_counters = (self.tt.probes, self.tt.hits,
+                             self.pawn_table.probes, self.pawn_table.hits)
+        self._iteration_times = []
+        if not moves:
+            return self._finish_search(start, None, 0, 0)
+        max_depth = depth if depth is not None else MAX_DEPTH
+        if time_limit is None:
+            self.soft_deadline = self.hard_deadline = float('inf')
+        else:
+            self.soft_deadline = start + time_limit * SOFT_TIME_RATIO
+            self.hard_deadline = start + time_limit
+        self.stopped = False
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self._age_history()
+
+        best_move, best_score, completed = moves[0], 0, 0
+        # Cu root_moves, o singură mutare e doar partea unui worker, nu o mutare forțată
+        if time_limit is not None and len(moves) == 1 and root_moves is None:
+            return self._finish_search(start, best_move, best_score, completed)
+        if self.tablebases is not None and root_moves is None:
+            tb_move = self.tablebases.best_move(pos)
+            if tb_move is not None:
+                best_move, best_score = tb_move[0], self.tablebases.probe_score(pos, 0)
+                self.iterations.append((1, best_move, best_score, self.nodes))
+                self._iteration_times.append(time.perf_counter() - start)
+                return self._finish_search(start, best_move, best_score, 1, 'tablebase')
+        # În pozițiile ascuțite (cu șahuri disponibile) încercăm întâi un mat
+        # forțat doar din șahuri, cu buget mic; altfel solverul iese imediat
+        if self.options['mate_solver'] and root_moves is None:
+            deadline = None if time_limit is None else start + time_limit * MATE_SOLVER_TIME_RATIO
+            mate = self.find_mate(MATE_SOLVER_NODES, checks_only=True, deadline=deadline)
+            self.nodes += self.mate_solver.nodes
+            if mate is not None:
+                line, plies = mate
+                best_move, best_score = line[0], MATE_SCORE - plies
+                self.iterations.append((plies, best_move, best_score, self.nodes))
+                self._iteration_times.append(time.perf_counter() - start)
+                if self.info_callback is not None:
+                    self.info_callback(plies, best_move, best_score, self.nodes)
+                return self._finish_search(start, best_move, best_score, plies, 'mate')
+        for current in range(1, max_depth + 1):
+            self._order_moves(moves, best_move, 0)
+            move, score = self._search_root(moves, current)
+            if move is not None:
+                best_move, best_score = move, score
+            if self.stopped:
+                break
+            completed = current
+            self.iterations.append((current, best_move, best_score, self.nodes))
+            self._iteration_times.append(time.perf_counter() - start)
+            if self.info_callback is not None:
+                self.info_callback(current, best_move, best_score, self.nodes)
+            if abs(best_score) > MATE_BOUND:
+                break
+            if time.perf_counter() >= self.soft_deadline:
+                break
+        return self._finish_search(start, best_move, best_score, completed)
+
+    def find_mate(self, max_nodes=100000, checks_only=False, deadline=None):
+        """Caută un mat forțat pentru partea la mutare cu df-pn (chess_mate).
+        Întoarce (linia de mat, plies) sau None; linia e scrisă și în tabela
+        de transpoziție, pentru varianta principală și ponder."""
+        if self.mate_solver is None:
+            from chess_mate import MateSolver
+            self.mate_solver = MateSolver(self.mate_table_entries)
+        pos = self.position
+        mate = self.mate_solver.solve(pos, max_nodes, checks_only, deadline, self.stop_event)
+        if mate is not None:
+            line, plies = mate
+            # Matul demonstrat e o limită: poate exista unul mai scurt
+            for ply, move in enumerate(line):
+                score = MATE_SCORE - plies
+                if ply % 2:
+                    self.tt.store(pos.key, plies - ply, UPPER, score_to_tt(-score, ply), move)
+                else:
+                    self.tt.store(pos.key, plies - ply, LOWER, score_to_tt(score, ply), move)
+                pos.make_move(move)
+            for _ in line:
+                pos.unmake_move()
+        return mate
+
+    def _finish_search(self, start, best_move, best_score, completed, source='search'):
+        self.last_score, self.last_depth = best_score, completed
+        probes, hits, pawn_probes, pawn_hits = self._tt_counters
+        previous = 0.0
+        iterations = []
+        for (depth, move, score, nodes), elapsed in zip(self.iterations, self._iteration_times):
+            iterations.append((depth, move_to_str(move), score, nodes, elapsed - previous))
+            previous = elapsed
+        pv = self.principal_variation(best_move) if best_move is not None else []
+        self.last_stats = SearchStats(
+            source=source, nodes=self.nodes, qnodes=self.qnodes, cutoffs=self.cutoffs,
+            first_move_cutoffs=self.first_move_cutoffs,
+            tt_probes=self.tt.probes - probes, tt_hits=self.tt.hits - hits,
+            pawn_probes=self.pawn_table.probes - pawn_probes,
+            pawn_hits=self.pawn_table.hits - pawn_hits,
+            depth=completed, score=best_score, seconds=time.perf_counter() - start,
+            iterations=iterations, pv=[move_to_str(move) for move in pv],
+            ply_nodes=self.ply_nodes)
+        self._log_stats(self.last_stats)
+        return best_move, best_score, completed
+
+    def _log_stats(self, stats):
+        if self.stats_log is None:
+            return
+        if self._stats_file is None:
+            self._stats_file = open(self.stats_log, 'a', encoding='utf-8')
+        self._stats_file.write(stats.to_json() + "\n")
+        self._stats_file.flush()
+
+    def principal_variation(self, first=None, max_length=MAX_DEPTH):
+        """Varianta principală citită din tabela de transpoziție, pornind
+        de la poziția curentă (sau de la mutarea first, dacă e dată)"""
+        pos = self.position
+        pv = []
+        seen = set()
+        move = first
+        while len(pv) < max_length and pos.key not in seen:
+            seen.add(pos.key)
+            if move is None:
+                entry = self.tt.probe(pos.key)
+                move = entry[3] if entry is not None else 0
+            if not move or move not in pos.generate_legal_moves():
+                break
+            pv.append(move)
+            pos.make_move(move)
+            move = None
+        for _ in pv:
+            pos.unmake_move()
+        return pv
+
+    def get_best_move(self, color, depth=3, time_limit=None):
+        """Cu time_limit, depth e ignorat și căutarea e controlată de timp."""
+        pos = self.position
+        side = pos.side
+        pos.set_side(COLOR_NAMES.index(color))
+        if time_limit is not None:
+            depth = None
+        try:
+            move = self.book.choose(pos) if self.book is not None else None
+            if move is not None:
+                self.last_stats = SearchStats(source='book', pv=[move_to_str(move)])
+                self._log_stats(self.last_stats)
+            elif self.workers > 1:
+                move, _, _ = self._parallel_search().search(pos, depth, time_limit)
+            elif move is None:
+                move, _, _ = self.search(depth, time_limit)
+        finally:
+            pos.set_side(side)
+        if move is None:
+            return None
+        return self.move_to_pair(move)
+
+    def _parallel_search(self):
+        if self._parallel is None:
+            from chess_parallel import ParallelSearch
+            self._parallel = ParallelSearch(self.workers, bot=self)
+        return self._parallel
+
+    # ========================= PERFT =========================
+
+    def perft(self, depth):
+        """Numărul de frunze la adâncimea dată, plus timpul și nodurile pe secundă"""
+        start = time.perf_counter()
+        nodes = self.position.perft(depth)
+        elapsed = time.perf_counter() - start
+        return {
+            'depth': depth,
+            'nodes': nodes,
+            'seconds': elapsed,
+            'nps': nodes / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def divide(self, depth):
+        """Perft defalcat pe mutările de la rădăcină, pentru depanarea generatorului"""
+        pos = self.position
+        counts = {}
+        start = time.perf_counter()
+        for move in pos.generate_legal_moves():
+            pos.make_move(move)
+            counts[move_to_str(move)] = pos.perft(depth - 1)
+            pos.unmake_move()
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        for name in sorted(counts):
+            print(f"{name}: {counts[name]}")
+        nps = total / elapsed if elapsed > 0 else 0.0
+        print(f"\nMoves: {len(counts)}  Nodes: {total}  Time: {elapsed:.3f}s  NPS: {nps:.0f}")
+        return counts
 
     def play_game(self):
         print("Chess Bot Started! You are White. Format: e2 e4")
@@ -295,7 +2097,7 @@ class ChessBot:
                     break
             else:
                 print("AI thinking...")
-                move = self.get_best_move('black', 3)
+                move = self.get_best_move('black', time_limit=self.move_time)
                 if move:
                     f, t = move
                     self.make_move(f, t)
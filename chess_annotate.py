@@ -0,0 +1,265 @@
+"""Analiza în lot a arhivelor PGN, cu un pool persistent de procese ChessBot.
+
+Partidele se citesc leneș, pe rând, iar pozițiile lor se trimit în bucăți
+de mutări consecutive către workeri; fiecare worker își păstrează botul și
+tabela de transpoziție între bucăți, deci pozițiile apropiate se găsesc
+parțial în tabelă. Numărul de bucăți în lucru și de partide în așteptare e
+limitat, așa că memoria nu depinde de mărimea arhivei. Partidele se scriu în
+ordinea din fișier, ca PGN adnotat sau ca JSONL.
+
+    python chess_annotate.py archive.pgn --out annotated.pgn --workers 4 --depth 6
+    python chess_annotate.py a.pgn b.pgn --format jsonl --out analysis.jsonl --time 0.2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from chess import MATE_BOUND, MATE_SCORE, WHITE, ChessBot, Position, move_to_str
+from chess_pgn import read_games, write_game
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+# Poziții consecutive trimise odată aceluiași worker
+CHUNK_PLIES = 8
+# Pierderea (în centipioni) de la care mutarea primește NAG-ul ?? ($4), ? ($2) sau ?! ($6)
+NAG_THRESHOLDS = ((300, '$4'), (150, '$2'), (70, '$6'))
+
+# Botul fiecărui proces, creat o singură dată de _init_worker
+_worker_bot = None
+
+
+def _init_worker(tt_size_mb, search_options):
+    global _worker_bot
+    _worker_bot = ChessBot(tt_size_mb=tt_size_mb, search_options=search_options)
+
+
+def _analyse(positions, depth, time_limit):
+    """Caută fiecare poziție (codată cu Position.pack); scorul e din perspectiva
+    părții la mutare"""
+    bot = _worker_bot
+    results = []
+    for packed in positions:
+        bot.position = Position.unpack(packed)
+        # Cu limită de timp, ChessBot.search joacă o mutare forțată fără s-o caute
+        # (scor 0); restrângerea rădăcinii la ea forțează căutarea și un scor real
+        moves = bot.position.generate_legal_moves()
+        root_moves = moves if time_limit is not None and len(moves) == 1 else None
+        move, score, completed = bot.search(depth, time_limit, root_moves=root_moves)
+        if move is None:
+            score = -MATE_SCORE if bot.position.in_check(bot.position.side) else 0
+        results.append({
+            'best': move_to_str(move) if move is not None else None,
+            'score': score,
+            'depth': completed,
+            'nodes': bot.nodes,
+            'pv': bot.last_stats.pv,
+        })
+    return results
+
+
+def format_score(score):
+    if abs(score) > MATE_BOUND:
+        moves = (MATE_SCORE - abs(score) + 1) // 2
+        if moves == 0:
+            return "#"
+        return f"#{moves}" if score > 0 else f"#-{moves}"
+    return f"{score / 100:+.2f}"
+
+
+class _Game:
+    """Partida în lucru: pozițiile, rezultatele primite și bucățile rămase"""
+
+    def __init__(self, game, positions, sans, moves):
+        self.game = game
+        self.positions = positions
+        self.sans = sans
+        self.moves = moves
+        self.results = [None] * len(positions)
+        self.pending = 0
+
+
+def _replay(game):
+    """(pozițiile codate compact, SAN, UCI) pentru mutările valide ale partidei"""
+    position = Position.from_fen(game.headers.get('FEN', START_FEN))
+    positions, sans, moves = [position.pack()], [], []
+    for text in game.moves:
+        try:
+            move = position.parse_move(text)
+        except (ValueError, IndexError):
+            move = None
+        if move is None:
+            break
+        sans.append(position.san(move))
+        moves.append(move_to_str(move))
+        position.make_move(move)
+        positions.append(position.pack())
+    return positions, sans, moves
+
+
+def annotate_game(item):
+    """Mutările cu evaluări: pentru fiecare, cea mai bună mutare și pierderea față de ea"""
+    annotated = []
+    for ply, (san, played) in enumerate(zip(item.sans, item.moves)):
+        before, after = item.results[ply], item.results[ply + 1]
+        # Scorul după mutarea jucată, din perspectiva celui care a mutat
+        played_score = -after['score']
+        loss = max(0, before['score'] - played_score) if before['best'] != played else 0
+        white = Position.unpack(item.positions[ply]).side == WHITE
+        annotated.append({
+            'ply': ply + 1,
+            'san': san,
+            'move': played,
+            'best': before['best'],
+            'score': played_score if white else -played_score,
+            'best_score': before['score'] if white else -before['score'],
+            'loss': loss,
+            'depth': after['depth'],
+            'pv': before['pv'],
+        })
+    return annotated
+
+
+def _pgn_annotation(entry, fen):
+    nag = next((mark for limit, mark in NAG_THRESHOLDS if entry['loss'] >= limit), '')
+    text = f"{nag} {{{format_score(entry['score'])}/{entry['depth']}}}".strip()
+    if nag and entry['best']:
+        position = Position.from_fen(fen)
+        best = position.parse_uci(entry['best'])
+        if best is not None:
+            fields = fen.split()
+            number = f"{fields[5]}." if fields[1] == 'w' else f"{fields[5]}..."
+            text += f" ({number} {position.san(best)})"
+    return text
+
+
+class Annotator:
+    def __init__(self, workers=None, depth=None, time_limit=1.0, tt_size_mb=16,
+                 search_options=None, window=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.depth = depth
+        self.time_limit = time_limit if depth is None else None
+        # Bucăți în lucru și partide neterminate, cel mult câte window
+        self.window = window or 4 * self.workers
+        self.executor = None
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                initargs=(tt_size_mb, search_options))
+        else:
+            _init_worker(tt_size_mb, search_options)
+        self.positions = 0
+        self.nodes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def run(self, games):
+        """Generator de (PgnGame, mutări adnotate), în ordinea partidelor"""
+        queue = deque()
+        futures = {}
+        games = iter(games)
+        exhausted = False
+        while True:
+            # Umplem fereastra cu partide noi, împărțite în bucăți
+            while not exhausted and len(futures) < self.window and len(queue) < self.window:
+                game = next(games, None)
+                if game is None:
+                    exhausted = True
+                    break
+                item = _Game(game, *_replay(game))
+                queue.append(item)
+                for start in range(0, len(item.positions), CHUNK_PLIES):
+                    chunk = item.positions[start:start + CHUNK_PLIES]
+                    item.pending += 1
+                    if self.executor is None:
+                        self._store(item, start, _analyse(chunk, self.depth, self.time_limit))
+                    else:
+                        future = self.executor.submit(_analyse, chunk, self.depth, self.time_limit)
+                        futures[future] = (item, start)
+            while queue and not queue[0].pending:
+                item = queue.popleft()
+                yield item.game, annotate_game(item)
+            if not futures:
+                if exhausted and not queue:
+                    return
+                continue
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                item, start = futures.pop(future)
+                self._store(item, start, future.result())
+
+    def _store(self, item, start, results):
+        item.results[start:start + len(results)] = results
+        item.pending -= 1
+        self.positions += len(results)
+        self.nodes += sum(result['nodes'] for result in results)
+
+
+def write_pgn(stream, game, annotated):
+    fen = game.headers.get('FEN', START_FEN)
+    fens = [fen]
+    position = Position.from_fen(fen)
+    for entry in annotated:
+        position.make_move(position.parse_uci(entry['move']))
+        fens.append(position.to_fen())
+    annotations = [_pgn_annotation(entry, fens[i]) for i, entry in enumerate(annotated)]
+    headers = dict(game.headers)
+    headers.setdefault('Result', game.result)
+    headers['Annotator'] = 'ChessBot'
+    write_game(stream, headers, [entry['san'] for entry in annotated], game.result,
+               annotations=annotations)
+
+
+def write_jsonl(stream, game, annotated):
+    stream.write(json.dumps({'headers': game.headers, 'moves': annotated}) + "\n")
+
+
+def iter_games(paths):
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as source:
+            yield from read_games(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch PGN annotation with a pool of ChessBot workers")
+    parser.add_argument('pgn', nargs='+', help="input PGN files, read lazily")
+    parser.add_argument('--out', help="output file (default: stdout)")
+    parser.add_argument('--format', choices=('pgn', 'jsonl'), default='pgn')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--depth', type=int, help="fixed depth per position (overrides --time)")
+    parser.add_argument('--time', type=float, default=0.5, help="seconds per position")
+    parser.add_argument('--hash', type=int, default=16, help="transposition table per worker, MB")
+    args = parser.parse_args()
+
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    writer = write_pgn if args.format == 'pgn' else write_jsonl
+    start = time.perf_counter()
+    games = 0
+    try:
+        with Annotator(args.workers, args.depth, args.time, args.hash) as annotator:
+            for game, annotated in annotator.run(iter_games(args.pgn)):
+                writer(out, game, annotated)
+                out.flush()
+                games += 1
+            positions, nodes = annotator.positions, annotator.nodes
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {positions} positions, {nodes} nodes in {elapsed:.1f}s "
+          f"({positions / elapsed if elapsed > 0 else 0:.1f} positions/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Carte de deschideri binară, citită prin mmap.
+
+Fișierul e o secvență de înregistrări de 16 octeți, big-endian, sortate după
+cheie: cheie Zobrist (u64), mutare (u16), pondere (u16), rezervat (u32).
+Mutarea păstrează doar from | to << 6 | promovare << 12; flag-urile de
+rocadă/en passant se recuperează din mutările legale la căutare. Cheile sunt
+cele din chess.py, deci cartea nu e compatibilă cu fișierele Polyglot.
+
+    python chess_book.py build games.pgn book.bin --max-ply 24
+    python chess_book.py probe book.bin "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+"""
+import argparse
+import mmap
+import random
+import struct
+import sys
+from collections import defaultdict
+
+from chess import Position, move_to_str
+from chess_pgn import read_games, read_move_lists
+
+ENTRY = struct.Struct('>QHHI')
+MOVE_MASK = (1 << 15) - 1
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class OpeningBook:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap nu acceptă fișiere goale
+            self._map = b''
+        self.entries = len(self._map) // ENTRY.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _key_at(self, index):
+        return struct.unpack_from('>Q', self._map, index * ENTRY.size)[0]
+
+    def probe(self, position):
+        """Lista (mutare, pondere) pentru poziție, doar cu mutări legale"""
+        key = position.key
+        lo, hi = 0, self.entries
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        index = lo
+        while index < self.entries:
+            entry_key, move, weight, _ = ENTRY.unpack_from(self._map, index * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((move, weight))
+            index += 1
+        if not found:
+            return []
+        legal = {move & MOVE_MASK: move for move in position.generate_legal_moves()}
+        return [(legal[move], weight) for move, weight in found if move in legal and weight > 0]
+
+    def choose(self, position, rng=random):
+        """O mutare aleasă aleator, proporțional cu ponderea, sau None"""
+        entries = self.probe(position)
+        if not entries:
+            return None
+        moves, weights = zip(*entries)
+        return rng.choices(moves, weights=weights)[0]
+
+
+def build_book(source_path, book_path, max_ply=24, min_games=1, start_fen=START_FEN):
+    """Compilează cartea din PGN (extensia .pgn) sau dintr-o listă de mutări,
+    câte o partidă pe linie. Ponderea e numărul de partide în care s-a jucat mutarea."""
+    counts = defaultdict(int)
+    games = 0
+    with open(source_path, encoding='utf-8', errors='replace') as source:
+        reader = read_games if source_path.lower().endswith('.pgn') else read_move_lists
+        for game in reader(source):
+            position = Position.from_fen(game.headers.get('FEN', start_fen))
+            for text in game.moves[:max_ply]:
+                try:
+                    move = position.parse_move(text)
+                except (ValueError, IndexError):
+                    move = None
+                if move is None:
+                    break
+                counts[(position.key, move & MOVE_MASK)] += 1
+                position.make_move(move)
+            games += 1
+
+    entries = [(key, move, count) for (key, move), count in counts.items() if count >= min_games]
+    scale = max((count for _, _, count in entries), default=1) / 0xFFFF
+    entries.sort(key=lambda e: (e[0], -e[2], e[1]))
+    with open(book_path, 'wb') as out:
+        for key, move, count in entries:
+            weight = count if scale <= 1 else max(1, int(count / scale))
+            out.write(ENTRY.pack(key, move, weight, 0))
+    return games, len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Opening book builder and prober")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="compile a book from a PGN or move-list file")
+    build.add_argument('source')
+    build.add_argument('book')
+    build.add_argument('--max-ply', type=int, default=24)
+    build.add_argument('--min-games', type=int, default=1)
+    probe = sub.add_parser('probe', help="list book moves for a FEN")
+    probe.add_argument('book')
+    probe.add_argument('fen', nargs='?', default=START_FEN)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        games, entries = build_book(args.source, args.book, args.max_ply, args.min_games)
+        print(f"{games} games, {entries} book entries written to {args.book}")
+        return 0
+    with OpeningBook(args.book) as book:
+        entries = book.probe(Position.from_fen(args.fen))
+        total = sum(weight for _, weight in entries)
+        for move, weight in sorted(entries, key=lambda e: -e[1]):
+            print(f"{move_to_str(move)}  {weight:6}  {100 * weight / total:5.1f}%")
+        if not entries:
+            print("Position not in book")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
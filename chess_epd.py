@@ -0,0 +1,145 @@
+"""Rulează suite de test EPD (bm/am) cu ChessBot și măsoară timpul până la soluție.
+
+Fiecare poziție e căutată cu o limită de timp (și opțional de adâncime).
+O poziție e rezolvată dacă mutarea finală e printre cele din `bm` și nu e
+printre cele din `am`. Timpul până la soluție e momentul iterației de la
+care mutarea aleasă a rămas corectă până la final.
+
+    python chess_epd.py wac.epd --time 2
+    python chess_epd.py --time 1            # suita mică inclusă
+    python chess_epd.py wac.epd --disable lmr,null_move
+"""
+import argparse
+import re
+import sys
+import time
+
+from chess import SEARCH_OPTIONS, ChessBot
+
+# Primele poziții din Win At Chess, pentru o verificare rapidă
+SAMPLE_SUITE = [
+    '2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - - bm Qg6; id "WAC.001";',
+    '8/7p/5k2/5p2/p1p2P2/Pr1pPK2/1P1R3P/8 b - - bm Rxb2; id "WAC.002";',
+    '5rk1/1ppb3p/p1pb4/6q1/3P1p1r/2P1R2P/PP1BQ1P1/5RKN w - - bm Rg3; id "WAC.003";',
+    'r1bq2rk/pp3pbp/2p1p1pQ/7P/3P4/2PB1N2/PP3PPR/2KR4 w - - bm Qxh7+; id "WAC.004";',
+    '5k2/6pp/p1qN4/1p1p4/3P4/2PKP2Q/PP3r2/3R4 b - - bm Qc4+; id "WAC.005";',
+]
+_OPERATION = re.compile(r'\s*([A-Za-z][A-Za-z0-9_]*)\s*((?:"[^"]*"|[^;"])*);')
+
+
+def parse_epd(line):
+    """(fen, operații) dintr-o linie EPD; operațiile sunt liste de operanzi"""
+    fields = line.split(None, 4)
+    if len(fields) < 4:
+        raise ValueError(f"EPD invalid: {line!r}")
+    operations = {}
+    rest = fields[4] if len(fields) > 4 else ''
+    for name, operands in _OPERATION.findall(rest):
+        operations[name] = [op.strip('"') for op in re.findall(r'"[^"]*"|\S+', operands)]
+    # Câmpurile hmvc/fmvn, dacă lipsesc, devin ceasurile implicite
+    clocks = [operations.get('hmvc', ['0'])[0], operations.get('fmvn', ['1'])[0]]
+    return ' '.join(fields[:4] + clocks), operations
+
+
+def load_epd(path):
+    with open(path, encoding='utf-8') as source:
+        return [parse_epd(line) for line in source
+                if line.strip() and not line.startswith('#')]
+
+
+def run_position(bot, fen, operations, time_limit, depth=None):
+    """Caută o poziție și întoarce un dict cu rezultatul"""
+    bot.set_fen(fen)
+    bot.tt.clear()
+    pos = bot.position
+    best = {pos.parse_move(text) for text in operations.get('bm', [])}
+    avoid = {pos.parse_move(text) for text in operations.get('am', [])}
+
+    def correct(move):
+        return (not best or move in best) and move not in avoid
+
+    start = time.perf_counter()
+    solved_at = []
+
+    def on_iteration(current, move, score, nodes):
+        if correct(move):
+            if not solved_at:
+                solved_at.append((time.perf_counter() - start, current))
+        else:
+            solved_at.clear()
+
+    bot.info_callback = on_iteration
+    try:
+        move, score, completed = bot.search(depth, time_limit)
+    finally:
+        bot.info_callback = None
+    elapsed = time.perf_counter() - start
+    solved = move is not None and correct(move)
+    return {
+        'id': (operations.get('id') or [fen])[0],
+        'fen': fen,
+        'move': pos.san(move) if move is not None else None,
+        'expected': operations.get('bm', []),
+        'avoid': operations.get('am', []),
+        'solved': solved,
+        'score': score,
+        'depth': completed,
+        'nodes': bot.nodes,
+        'seconds': elapsed,
+        'nps': bot.nodes / elapsed if elapsed > 0 else 0.0,
+        'time_to_solution': solved_at[0][0] if solved and solved_at else None,
+        'depth_to_solution': solved_at[0][1] if solved and solved_at else None,
+    }
+
+
+def run_suite(positions, time_limit=1.0, depth=None, bot=None, verbose=True):
+    """Rulează toată suita; întoarce (rezultate, rezumat)"""
+    bot = bot if bot is not None else ChessBot()
+    results = []
+    for fen, operations in positions:
+        result = run_position(bot, fen, operations, time_limit, depth)
+        results.append(result)
+        if verbose:
+            tts = (f"{result['time_to_solution']:.2f}s" if result['time_to_solution'] is not None
+                   else "-")
+            expected = ' '.join(result['expected'] + ['!' + m for m in result['avoid']])
+            print(f"{result['id']:<12} {'ok  ' if result['solved'] else 'FAIL'} "
+                  f"{result['move'] or '-':<8} expected {expected:<10} "
+                  f"depth {result['depth']:2} {result['nodes']:>9} nodes "
+                  f"{result['nps']:>8.0f} nps  tts {tts}")
+    total_nodes = sum(r['nodes'] for r in results)
+    total_time = sum(r['seconds'] for r in results)
+    summary = {
+        'positions': len(results),
+        'solved': sum(r['solved'] for r in results),
+        'nodes': total_nodes,
+        'seconds': total_time,
+        'nps': total_nodes / total_time if total_time > 0 else 0.0,
+        'time_to_solution': sum(r['time_to_solution'] for r in results
+                                if r['time_to_solution'] is not None),
+    }
+    if verbose:
+        print(f"Solved {summary['solved']}/{summary['positions']}  {total_nodes} nodes "
+              f"in {total_time:.2f}s ({summary['nps']:.0f} nps), "
+              f"total time-to-solution {summary['time_to_solution']:.2f}s")
+    return results, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EPD test-suite runner for ChessBot")
+    parser.add_argument('epd', nargs='?', help="EPD file with bm/am operations")
+    parser.add_argument('--time', type=float, default=1.0, help="seconds per position")
+    parser.add_argument('--depth', type=int, help="maximum depth per position")
+    parser.add_argument('--hash', type=int, default=16, help="transposition table size in MB")
+    parser.add_argument('--disable', default='',
+                        help="comma-separated search options to turn off: " + ', '.join(SEARCH_OPTIONS))
+    args = parser.parse_args()
+    disabled = {name: False for name in filter(None, args.disable.split(','))}
+    positions = load_epd(args.epd) if args.epd else [parse_epd(line) for line in SAMPLE_SUITE]
+    bot = ChessBot(tt_size_mb=args.hash, search_options=disabled)
+    _, summary = run_suite(positions, args.time, args.depth, bot)
+    return 0 if summary['solved'] == summary['positions'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""Meciuri între configurații ChessBot, în paralel, cu oprire prin SPRT.
+
+Fiecare deschidere din suită se joacă de două ori, cu culorile inversate.
+Partidele rulează într-un ProcessPoolExecutor; după fiecare rezultat se
+recalculează raportul log-verosimilitate (GSPRT trinomial, ca în fishtest)
+și meciul se oprește când trece de una din limite. Partidele se scriu în
+PGN, iar rezumatul în JSON (scor, Elo, LLR, noduri pe secundă).
+
+    python chess_match.py --engine base:time=0.05 --engine dev:time=0.05,tt_size_mb=32 \\
+        --games 400 --workers 4 --pgn match.pgn --json match.json --elo0 0 --elo1 10
+"""
+import argparse
+import ast
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+from chess import SEARCH_OPTIONS, ChessBot, Position
+from chess_pgn import read_games, read_move_lists, write_game
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+MAX_PLIES = 300
+# Deschideri scurte și echilibrate, în notația de coordonate
+OPENINGS = [
+    "e2e4 e7e5 g1f3 b8c6",
+    "e2e4 c7c5 g1f3 d7d6",
+    "e2e4 e7e6 d2d4 d7d5",
+    "e2e4 c7c6 d2d4 d7d5",
+    "d2d4 d7d5 c2c4 e7e6",
+    "d2d4 g8f6 c2c4 e7e6",
+    "d2d4 g8f6 c2c4 g7g6",
+    "c2c4 e7e5 b1c3 g8f6",
+    "g1f3 d7d5 g2g3 g8f6",
+    "e2e4 d7d5 e4d5 d8d5",
+]
+
+
+@dataclass
+class EngineConfig:
+    name: str
+    # Argumentele pentru ChessBot (tt_size_mb, book_path, tablebase_dir, ...)
+    options: Dict = field(default_factory=dict)
+    depth: Optional[int] = None
+    move_time: Optional[float] = 0.1
+
+
+def parse_engine(spec):
+    """'nume:cheie=valoare,...'; depth și time sunt limitele de căutare, cheile din
+    SEARCH_OPTIONS (ex. lmr=False) pornesc/opresc tehnici, restul merg în ChessBot"""
+    name, _, rest = spec.partition(':')
+    config = EngineConfig(name)
+    for item in filter(None, rest.split(',')):
+        key, _, text = item.partition('=')
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            value = text
+        if key == 'depth':
+            config.depth = value
+            config.move_time = None
+        elif key == 'time':
+            config.move_time = value
+        elif key in SEARCH_OPTIONS:
+            config.options.setdefault('search_options', {})[key] = value
+        else:
+            config.options[key] = value
+    return config
+
+
+def load_openings(path=None):
+    """Lista de (fen, mutări) din PGN, din fișier text (FEN sau mutări pe linie) sau suita internă"""
+    if path is None:
+        return [(START_FEN, line.split()) for line in OPENINGS]
+    openings = []
+    with open(path, encoding='utf-8') as source:
+        if path.lower().endswith('.pgn'):
+            for game in read_games(source):
+                openings.append((game.headers.get('FEN', START_FEN), game.moves))
+            return openings
+        lines = [line.strip() for line in source if line.strip() and not line.startswith('#')]
+    for line in lines:
+        fields = line.split()
+        if '/' in fields[0]:
+            # EPD/FEN: completăm ceasurile lipsă
+            fen = ' '.join(fields[:4] + (fields[4:6] if len(fields) >= 6 else ['0', '1']))
+            openings.append((fen, []))
+        else:
+            game = next(read_move_lists([line]))
+            openings.append((START_FEN, game.moves))
+    return openings
+
+
+# ========================= SPRT =========================
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def sprt_bounds(alpha=0.05, beta=0.05):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """Raportul log-verosimilitate pentru H1 (elo1) față de H0 (elo0), aproximare trinomială"""
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0
+    score = (wins + draws / 2) / n
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / n
+    if variance <= 0:
+        return 0.0
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return n * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def elo_estimate(wins, draws, losses):
+    """(Elo, marja de eroare la 95%) din scorul primului motor"""
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0, 0.0
+    score = (wins + draws / 2) / n
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / n
+    margin = 1.96 * math.sqrt(variance / n)
+
+    def to_elo(s):
+        s = min(max(s, 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / s - 1)
+
+    return to_elo(score), (to_elo(score + margin) - to_elo(score - margin)) / 2
+
+
+# ========================= PARTIDE =========================
+
+# Boții fiecărui proces, refolosiți între partide (tabela se golește la fiecare partidă)
+_bots = {}
+
+
+def _bot_for(config):
+    bot = _bots.get(config.name)
+    if bot is None:
+        bot = _bots[config.name] = ChessBot(**config.options)
+    return bot
+
+
+def play_game(white, black, fen, opening, max_plies=MAX_PLIES):
+    """Joacă o partidă și întoarce un dict cu rezultatul, mutările SAN și statisticile"""
+    position = Position.from_fen(fen)
+    sans = []
+    for text in opening:
+        move = position.parse_move(text)
+        sans.append(position.san(move))
+        position.make_move(move)
+    configs = (white, black)
+    bots = [_bot_for(config) for config in configs]
+    for bot in bots:
+        bot.tt.clear()
+    nodes = [0, 0]
+    seconds = [0.0, 0.0]
+    searched = [0, 0]
+    while True:
+        moves = position.generate_legal_moves()
+        if not moves:
+            if position.in_check(position.side):
+                result, termination = ('0-1' if position.side == 0 else '1-0'), 'checkmate'
+            else:
+                result, termination = '1/2-1/2', 'stalemate'
+            break
+        reason = position.draw_reason()
+        if reason is not None:
+            result, termination = '1/2-1/2', reason
+            break
+        if len(sans) >= max_plies:
+            result, termination = '1/2-1/2', 'max plies'
+            break
+        side = position.side
+        bot, config = bots[side], configs[side]
+        bot.position = position
+        start = time.perf_counter()
+        move = bot.book.choose(position) if bot.book is not None else None
+        if move is None:
+            move, _, _ = bot.search(config.depth, config.move_time)
+            nodes[side] += bot.nodes
+            searched[side] += 1
+        seconds[side] += time.perf_counter() - start
+        sans.append(position.san(move))
+        position.make_move(move)
+    return {
+        'white': white.name,
+        'black': black.name,
+        'fen': fen,
+        'result': result,
+        'termination': termination,
+        'moves': sans,
+        'nodes': {configs[c].name: nodes[c] for c in (0, 1)},
+        'seconds': {configs[c].name: seconds[c] for c in (0, 1)},
+        'searches': {configs[c].name: searched[c] for c in (0, 1)},
+    }
+
+
+def _game_args(index, engine_a, engine_b, openings, max_plies):
+    # Perechi de partide: aceeași deschidere, culori inversate
+    fen, opening = openings[(index // 2) % len(openings)]
+    white, black = (engine_a, engine_b) if index % 2 == 0 else (engine_b, engine_a)
+    return white, black, fen, opening, max_plies
+
+
+# ========================= MECI =========================
+
+class Match:
+    def __init__(self, engine_a, engine_b, openings=None, games=100, workers=None,
+                 elo0=0.0, elo1=10.0, alpha=0.05, beta=0.05, max_plies=MAX_PLIES,
+                 pgn_path=None):
+        self.engines = (engine_a, engine_b)
+        self.openings = openings or load_openings()
+        self.games = games
+        self.workers = workers or os.cpu_count() or 1
+        self.elo0, self.elo1 = elo0, elo1
+        self.bounds = sprt_bounds(alpha, beta)
+        self.max_plies = max_plies
+        self.pgn_path = pgn_path
+        # Rezultatele din perspectiva primului motor
+        self.wins = self.draws = self.losses = 0
+        self.llr = 0.0
+        self.decision = None
+        self.terminations = Counter()
+        self.nodes = Counter()
+        self.seconds = Counter()
+        self.searches = Counter()
+        self.played = 0
+        self.elapsed = 0.0
+
+    def record(self, game, pgn=None):
+        first = self.engines[0].name
+        if game['result'] == '1/2-1/2':
+            self.draws += 1
+        elif (game['result'] == '1-0') == (game['white'] == first):
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.played += 1
+        self.terminations[game['termination']] += 1
+        self.nodes.update(game['nodes'])
+        self.seconds.update(game['seconds'])
+        self.searches.update(game['searches'])
+        self.llr = sprt_llr(self.wins, self.draws, self.losses, self.elo0, self.elo1)
+        if self.llr <= self.bounds[0]:
+            self.decision = 'H0'
+        elif self.llr >= self.bounds[1]:
+            self.decision = 'H1'
+        if pgn is not None:
+            headers = {
+                'Event': f"{first} vs {self.engines[1].name}",
+                'Site': 'chess_match.py',
+                'Date': time.strftime('%Y.%m.%d'),
+                'Round': str(self.played),
+                'White': game['white'],
+                'Black': game['black'],
+                'Result': game['result'],
+            }
+            if game['fen'] != START_FEN:
+                headers['SetUp'] = '1'
+                headers['FEN'] = game['fen']
+            headers['Termination'] = game['termination']
+            headers['PlyCount'] = str(len(game['moves']))
+            write_game(pgn, headers, game['moves'], game['result'])
+            pgn.flush()
+
+    def run(self, verbose=True):
+        pgn = open(self.pgn_path, 'w', encoding='utf-8') if self.pgn_path else None
+        start = time.perf_counter()
+
+        def args(index):
+            return _game_args(index, *self.engines, self.openings, self.max_plies)
+
+        try:
+            if self.workers == 1:
+                for index in range(self.games):
+                    self.record(play_game(*args(index)), pgn)
+                    if verbose:
+                        self.report()
+                    if self.decision:
+                        break
+            else:
+                with ProcessPoolExecutor(self.workers) as executor:
+                    # Fereastră limitată de partide în lucru, ca oprirea SPRT să nu
+                    # lase sute de partide deja trimise
+                    pending = set()
+                    submitted = 0
+                    while submitted < self.games or pending:
+                        while submitted < self.games and len(pending) < 2 * self.workers \
+                                and not self.decision:
+                            pending.add(executor.submit(play_game, *args(submitted)))
+                            submitted += 1
+                        if not pending:
+                            break
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self.record(future.result(), pgn)
+                            if verbose:
+                                self.report()
+                        if self.decision:
+                            for future in pending:
+                                future.cancel()
+                            break
+        finally:
+            if pgn is not None:
+                pgn.close()
+        self.elapsed = time.perf_counter() - start
+        return self.summary()
+
+    def report(self):
+        elo, error = elo_estimate(self.wins, self.draws, self.losses)
+        print(f"games {self.played:4}  +{self.wins} ={self.draws} -{self.losses}  "
+              f"elo {elo:+.1f} +/- {error:.1f}  LLR {self.llr:+.2f} "
+              f"[{self.bounds[0]:.2f}, {self.bounds[1]:.2f}]"
+              + (f"  {self.decision} accepted" if self.decision else ""), flush=True)
+
+    def summary(self):
+        elo, error = elo_estimate(self.wins, self.draws, self.losses)
+        engines = {}
+        for config in self.engines:
+            name = config.name
+            engines[name] = {
+                **asdict(config),
+                'nodes': self.nodes[name],
+                'seconds': self.seconds[name],
+                'nps': self.nodes[name] / self.seconds[name] if self.seconds[name] else 0.0,
+                'seconds_per_move': (self.seconds[name] / self.searches[name]
+                                     if self.searches[name] else 0.0),
+            }
+        return {
+            'engines': engines,
+            'games': self.played,
+            'wins': self.wins,
+            'draws': self.draws,
+            'losses': self.losses,
+            'score': (self.wins + self.draws / 2) / self.played if self.played else 0.0,
+            'elo': elo,
+            'elo_error': error,
+            'sprt': {
+                'elo0': self.elo0,
+                'elo1': self.elo1,
+                'llr': self.llr,
+                'lower_bound': self.bounds[0],
+                'upper_bound': self.bounds[1],
+                'decision': self.decision,
+            },
+            'terminations': dict(self.terminations),
+            'seconds': self.elapsed,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChessBot engine-vs-engine match runner")
+    parser.add_argument('--engine', action='append', required=True,
+                        help="name:key=value,... (depth, time or ChessBot arguments); give it twice")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--openings', help="PGN, FEN/EPD or move-list file (default: built-in suite)")
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES)
+    parser.add_argument('--elo0', type=float, default=0.0)
+    parser.add_argument('--elo1', type=float, default=10.0)
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    parser.add_argument('--pgn', help="write all games to this PGN file")
+    parser.add_argument('--json', help="write the match summary to this JSON file")
+    parser.add_argument('--fail-on-h0', action='store_true',
+                        help="exit with status 1 when SPRT accepts H0 (for CI)")
+    args = parser.parse_args()
+    if len(args.engine) != 2:
+        parser.error("exactly two --engine options are required")
+
+    engine_a, engine_b = (parse_engine(spec) for spec in args.engine)
+    match = Match(engine_a, engine_b, load_openings(args.openings), args.games, args.workers,
+                  args.elo0, args.elo1, args.alpha, args.beta, args.max_plies, args.pgn)
+    summary = match.run()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as out:
+            json.dump(summary, out, indent=2)
+    return 1 if args.fail_on_h0 and summary['sprt']['decision'] == 'H0' else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
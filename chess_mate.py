@@ -0,0 +1,257 @@
+"""Căutare de mat forțat cu proof-number search în adâncime (df-pn).
+
+Partea la mutare e atacatorul: în nodurile lui ajunge o singură mutare care
+forțează matul (nod OR), în nodurile apărătorului trebuie respinse toate
+răspunsurile (nod AND). Fiecare nod are numerele (phi, delta) din
+perspectiva părții la mutare: phi e costul estimat al demonstrației pentru
+ea, delta al infirmării. Căutarea coboară mereu spre frontiera cea mai
+ieftină de demonstrat și nu are orizont de adâncime, deci maturile lungi,
+dar forțate (șahuri, răspunsuri unice), se găsesc cu puține noduri.
+
+Lungimea raportată e a matului demonstrat, nu neapărat cea mai scurtă:
+atacatorul alege cel mai scurt dintre matii găsiți, apărătorul cel mai lung.
+
+Tabela de noduri e un dict cu număr maxim de intrări; la depășire se
+elimină jumătatea cu cel mai puțin lucru investit, păstrând demonstrațiile.
+Repetițiile pe drumul curent, regula celor 50 de mutări și materialul
+insuficient contează ca infirmări; ele pot doar rata un mat, nu pot
+produce unul fals.
+
+    python chess_mate.py "r1b1kb1r/pppp1ppp/5q2/4n3/3KP3/2N3PN/PPP4P/R1BQ1B1R b kq - 0 1"
+    python chess_mate.py --bench --nodes 50000
+"""
+import argparse
+import sys
+import time
+
+from chess import MATE_BOUND, MAX_PLY, ChessBot, Position, move_to_str
+
+INFINITY = 10 ** 9
+# Câte noduri între două verificări ale termenului și ale opririi externe
+CHECK_INTERVAL = 256
+
+# Poziții cu mat forțat pentru benchmark: (fen, matul cel mai scurt în plies)
+BENCH_POSITIONS = [
+    ("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1", 1),
+    ("kbK5/pp6/1P6/8/8/8/8/R7 w - - 0 1", 3),
+    ("6k1/pp4p1/2p5/2bp4/8/P5Pb/1P3rrP/2BRRN1K b - - 0 1", 3),
+    ("r1b1kb1r/pppp1ppp/5q2/4n3/3KP3/2N3PN/PPP4P/R1BQ1B1R b kq - 0 1", 5),
+    # Ed. Lasker - Thomas, Londra 1912: 11. Qxh7+ și vânătoarea regelui
+    ("rn3rk1/pbppq1pp/1p2pb2/4N2Q/3PN3/3B4/PPP2PPP/R3K2R w KQ - 7 11", 15),
+]
+
+
+class MateSolver:
+    def __init__(self, max_entries=1 << 18, max_ply=MAX_PLY):
+        self.max_entries = max_entries
+        self.max_ply = max_ply
+        # cheie -> [phi, delta, lucru, plies până la mat sau None, mutare]
+        self.table = {}
+        self.attacker = 0
+        self.checks_only = False
+        self.nodes = 0
+        self.max_nodes = 0
+        self.deadline = None
+        self.stop_event = None
+        self.stopped = False
+
+    def solve(self, position, max_nodes=100000, checks_only=False, deadline=None, stop_event=None):
+        """Încearcă să demonstreze un mat forțat pentru partea la mutare.
+        Întoarce (linia de mat, plies) dacă l-a demonstrat, altfel None.
+        Cu checks_only atacatorul joacă doar șahuri."""
+        self.table.clear()
+        self.attacker = position.side
+        self.checks_only = checks_only
+        self.nodes = 0
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.stopped = False
+        if not self._moves(position, True):
+            return None
+        phi, _ = self._mid(position, 0, INFINITY, INFINITY)
+        plies = self.table[position.key][3]
+        if phi != 0 or plies is None:
+            return None
+        return self._line(position), plies
+
+    def _moves(self, pos, attacker):
+        moves = pos.generate_legal_moves()
+        if attacker and self.checks_only:
+            checks = []
+            for move in moves:
+                pos.make_move(move)
+                if pos.in_check(pos.side):
+                    checks.append(move)
+                pos.unmake_move()
+            return checks
+        return moves
+
+    def _failed(self, attacker):
+        # Matul e imposibil: pentru atacator (phi, delta) = (INF, 0), invers la apărător
+        return (INFINITY, 0) if attacker else (0, INFINITY)
+
+    def _child(self, pos, ply, move):
+        """[mutare, cheie, phi, delta, plies, fixat] pentru poziția de după move.
+        Nodurile fixate depind de drum și nu intră în tabelă."""
+        self.nodes += 1
+        if not self.nodes % CHECK_INTERVAL:
+            self._check_limits()
+        key = pos.key
+        attacker = pos.side == self.attacker
+        if (ply >= self.max_ply or pos.halfmove >= 100 or pos.repetitions() > 1
+                or pos.is_insufficient_material()):
+            return [move, key, *self._failed(attacker), None, True]
+        entry = self.table.get(key)
+        if entry is not None:
+            return [move, key, entry[0], entry[1], entry[3], False]
+        count = len(self._moves(pos, attacker))
+        plies = None
+        if count:
+            # Inițializare df-pn+: un nod cu multe mutări e greu de demonstrat
+            # pentru apărător și greu de infirmat pentru atacator
+            phi, delta = 1, count
+        elif not attacker and pos.in_check(pos.side):
+            phi, delta, plies = INFINITY, 0, 0
+        else:
+            phi, delta = self._failed(attacker)
+        self._store(key, phi, delta, 0, plies, 0)
+        return [move, key, phi, delta, plies, False]
+
+    def _mid(self, pos, ply, th_phi, th_delta):
+        key = pos.key
+        attacker = pos.side == self.attacker
+        start_nodes = self.nodes
+        children = []
+        for move in self._moves(pos, attacker):
+            pos.make_move(move)
+            children.append(self._child(pos, ply + 1, move))
+            pos.unmake_move()
+        table = self.table
+        while True:
+            phi, delta = INFINITY, 0
+            second = INFINITY
+            best = None
+            for child in children:
+                if not child[5]:
+                    entry = table.get(child[1])
+                    if entry is not None:
+                        child[2], child[3], child[4] = entry[0], entry[1], entry[3]
+                if child[3] < phi:
+                    second = phi
+                    phi = child[3]
+                    best = child
+                elif child[3] < second:
+                    second = child[3]
+                delta += child[2]
+            delta = min(delta, INFINITY)
+            if phi >= th_phi or delta >= th_delta or self.stopped or self.nodes >= self.max_nodes:
+                break
+            child_th_phi = min(INFINITY, th_delta - delta + best[2])
+            child_th_delta = min(th_phi, second + 1)
+            pos.make_move(best[0])
+            best[2], best[3] = self._mid(pos, ply + 1, child_th_phi, child_th_delta)
+            pos.unmake_move()
+        plies, move = None, 0
+        if attacker and phi == 0:
+            # Cel mai scurt mat printre mutările demonstrate
+            proven = [child for child in children if child[3] == 0 and child[4] is not None]
+            if proven:
+                child = min(proven, key=lambda c: c[4])
+                plies, move = child[4] + 1, child[0]
+        elif not attacker and delta == 0:
+            # Apărătorul alege rezistența cea mai lungă
+            if all(child[4] is not None for child in children):
+                child = max(children, key=lambda c: c[4])
+                plies, move = child[4] + 1, child[0]
+        self._store(key, phi, delta, self.nodes - start_nodes, plies, move)
+        return phi, delta
+
+    def _check_limits(self):
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stopped = True
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.stopped = True
+
+    def _store(self, key, phi, delta, work, plies, move):
+        table = self.table
+        previous = table.get(key)
+        if previous is not None:
+            work += previous[2]
+        table[key] = [phi, delta, work, plies, move]
+        if len(table) > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        # Păstrăm jumătatea cu cel mai mult lucru și toate demonstrațiile
+        table = self.table
+        works = sorted(entry[2] for entry in table.values())
+        limit = works[len(works) // 2]
+        for key in [key for key, entry in table.items() if entry[2] <= limit and entry[3] is None]:
+            del table[key]
+
+    def _line(self, pos):
+        line = []
+        while len(line) < self.max_ply:
+            entry = self.table.get(pos.key)
+            if entry is None or not entry[4] or entry[4] not in pos.generate_legal_moves():
+                break
+            line.append(entry[4])
+            pos.make_move(entry[4])
+        for _ in line:
+            pos.unmake_move()
+        return line
+
+
+# ========================= BENCHMARK =========================
+
+def benchmark(max_nodes=100000, time_limit=10.0, positions=BENCH_POSITIONS):
+    """Noduri și timp pentru df-pn față de căutarea alfa-beta (fără solverul
+    de mat) până la adâncimea matului, limitată la time_limit secunde"""
+    solver = MateSolver()
+    bot = ChessBot(search_options={'mate_solver': False})
+    for fen, expected in positions:
+        position = Position.from_fen(fen)
+        start = time.perf_counter()
+        result = solver.solve(position, max_nodes)
+        pn_time = time.perf_counter() - start
+        found = f"mate in {result[1]} plies" if result else "not proven"
+        bot.set_fen(fen)
+        bot.tt.clear()
+        _, score, depth = bot.search(expected, time_limit)
+        ab = "mate" if score > MATE_BOUND else "no mate"
+        print(f"{fen}\n  df-pn: {found:<20} {solver.nodes:>8} nodes {pn_time:6.2f}s"
+              f"   alpha-beta: {ab:<8} at depth {depth:2} {bot.nodes:>8} nodes "
+              f"{bot.last_stats.seconds:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proof-number (df-pn) mate solver")
+    parser.add_argument('fen', nargs='?', help="position to solve for the side to move")
+    parser.add_argument('--nodes', type=int, default=200000, help="node budget")
+    parser.add_argument('--checks-only', action='store_true',
+                        help="restrict the attacker to checking moves")
+    parser.add_argument('--bench', action='store_true',
+                        help="compare with alpha-beta on the built-in mate positions")
+    parser.add_argument('--time', type=float, default=10.0,
+                        help="alpha-beta time limit per benchmark position, seconds")
+    args = parser.parse_args()
+    if args.bench or args.fen is None:
+        benchmark(args.nodes, args.time)
+        return 0
+    position = Position.from_fen(args.fen)
+    solver = MateSolver()
+    start = time.perf_counter()
+    result = solver.solve(position, args.nodes, args.checks_only)
+    elapsed = time.perf_counter() - start
+    if result is None:
+        print(f"No forced mate proven ({solver.nodes} nodes, {elapsed:.2f}s)")
+        return 1
+    line, plies = result
+    print(f"Mate in {(plies + 1) // 2}: {' '.join(move_to_str(move) for move in line)} "
+          f"({solver.nodes} nodes, {elapsed:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""Evaluator neural mic, actualizabil incremental (stil NNUE), în NumPy.
+
+Intrarea are 768 de trăsături (piesă x pătrat) văzute din ambele perspective:
+pentru negru tabla e oglindită și culorile inversate. Primul strat produce
+câte un acumulator de `hidden` valori pe perspectivă; la make/unmake
+Position adună sau scade doar coloanele pieselor mutate, deci o evaluare
+înseamnă doar stratul de ieșire: clipped ReLU peste [partea la mutare,
+adversar] și un produs scalar.
+
+Ponderile se cuantizează la încărcare (primul strat x QA, stratul de ieșire
+x QB) și acumulatorii sunt întregi int32, deci adunările și scăderile din
+make/unmake se anulează exact: acumulatorul nu se depărtează de cel
+recalculat, oricât de lungă ar fi căutarea.
+
+Fișierul de ponderi e binar, little-endian:
+    b'PYNN'  u32 versiune  u32 hidden
+    float32 W1[768][hidden]  b1[hidden]  W2[2 * hidden]  b2
+Ieșirea rețelei e în centipioni, din perspectiva părții la mutare.
+
+NumPy e opțional pentru restul proiectului; doar acest modul are nevoie de el.
+
+    python chess_nnue.py bench --weights net.bin
+    python chess_nnue.py check --cycles 20000
+    python chess_nnue.py random net.bin --hidden 128
+"""
+import argparse
+import random
+import struct
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from chess import BLACK, WHITE, ChessBot, Position
+
+MAGIC = b'PYNN'
+VERSION = 1
+FEATURES = 768
+HEADER = struct.Struct('<4sII')
+# Scalele de cuantizare: activările primului strat sunt în [0, QA]
+QA = 255
+QB = 64
+
+
+def feature_index(piece, sq, perspective):
+    """Indicele trăsăturii piesei pe pătratul sq, văzută de perspective"""
+    if perspective == BLACK:
+        piece = (piece + 6) % 12
+        sq ^= 56
+    return piece * 64 + sq
+
+
+class NnueNetwork:
+    def __init__(self, w1, b1, w2, b2):
+        if np is None:
+            raise ImportError("chess_nnue needs numpy (pip install numpy)")
+        self.hidden = b1.shape[0]
+        # Ponderile float32 originale, pentru save
+        self.w1 = w1.astype(np.float32)
+        self.b1 = b1.astype(np.float32)
+        self.w2 = w2.astype(np.float32)
+        self.b2 = float(b2)
+        self.b1_q = np.round(self.b1 * QA).astype(np.int32)
+        self.w2_q = np.round(self.w2 * QB).astype(np.int64)
+        self.b2_q = round(self.b2 * QA * QB)
+        # Pentru fiecare (piesă, pătrat), coloanele din ambele perspective, ca o
+        # actualizare să fie o singură adunare pe acumulatorul (2, hidden)
+        w1_q = np.round(self.w1 * QA).astype(np.int32)
+        deltas = np.empty((FEATURES, 2, self.hidden), dtype=np.int32)
+        for piece in range(12):
+            for sq in range(64):
+                deltas[piece * 64 + sq, WHITE] = w1_q[feature_index(piece, sq, WHITE)]
+                deltas[piece * 64 + sq, BLACK] = w1_q[feature_index(piece, sq, BLACK)]
+        self.deltas = deltas
+
+    @classmethod
+    def load(cls, path):
+        if np is None:
+            raise ImportError("chess_nnue needs numpy (pip install numpy)")
+        with open(path, 'rb') as source:
+            magic, version, hidden = HEADER.unpack(source.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Invalid network file: {path}")
+            data = np.fromfile(source, dtype='<f4')
+        expected = FEATURES * hidden + hidden + 2 * hidden + 1
+        if data.size != expected:
+            raise ValueError(f"{path}: expected {expected} weights, found {data.size}")
+        w1 = data[:FEATURES * hidden].reshape(FEATURES, hidden)
+        offset = FEATURES * hidden
+        b1 = data[offset:offset + hidden]
+        w2 = data[offset + hidden:offset + 3 * hidden]
+        return cls(w1, b1, w2, data[-1])
+
+    @classmethod
+    def random(cls, hidden=128, seed=0):
+        """Rețea cu ponderi aleatoare, pentru benchmark și teste de format"""
+        if np is None:
+            raise ImportError("chess_nnue needs numpy (pip install numpy)")
+        rng = np.random.default_rng(seed)
+        w1 = rng.normal(0, 0.05, (FEATURES, hidden))
+        b1 = rng.normal(0, 0.05, hidden)
+        w2 = rng.normal(0, 50 / hidden, 2 * hidden)
+        return cls(w1, b1, w2, 0.0)
+
+    def save(self, path):
+        with open(path, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, VERSION, self.hidden))
+            for part in (self.w1.ravel(), self.b1, self.w2, np.array([self.b2])):
+                out.write(part.astype('<f4').tobytes())
+
+    def attach(self, position):
+        """Creează acumulatorul poziției din toate piesele; apoi se actualizează singur"""
+        position.accumulator = Accumulator(self, position)
+        return position.accumulator
+
+    def evaluate(self, position):
+        """Scorul din perspectiva albului, ca Position.evaluate"""
+        accumulator = position.accumulator
+        if accumulator is None or accumulator.network is not self:
+            accumulator = self.attach(position)
+        values = accumulator.values
+        side = position.side
+        hidden = np.concatenate((values[side], values[side ^ 1]))
+        np.clip(hidden, 0, QA, out=hidden)
+        score = int(hidden @ self.w2_q + self.b2_q) // (QA * QB)
+        return score if side == WHITE else -score
+
+
+class Accumulator:
+    """Ieșirea primului strat pentru ambele perspective; Position apelează
+    add/remove din put_piece/remove_piece"""
+    __slots__ = ('network', 'values', 'deltas')
+
+    def __init__(self, network, position):
+        self.network = network
+        self.deltas = network.deltas
+        self.values = self.refresh(position)
+
+    def refresh(self, position):
+        """Valorile calculate de la zero, din toate piesele poziției"""
+        values = np.tile(self.network.b1_q, (2, 1))
+        for sq, piece in enumerate(position.mailbox):
+            if piece is not None:
+                values += self.deltas[piece * 64 + sq]
+        return values
+
+    def check(self, position):
+        if not np.array_equal(self.values, self.refresh(position)):
+            raise AssertionError("Acumulatorul incremental diferă de cel recalculat")
+
+    def add(self, piece, sq):
+        self.values += self.deltas[piece * 64 + sq]
+
+    def remove(self, piece, sq):
+        self.values -= self.deltas[piece * 64 + sq]
+
+
+# ========================= BENCHMARK =========================
+
+BENCH_FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+]
+
+
+def _walk(fen, plies, seed):
+    # Mutări aleatoare, jucate și anulate în timpul evaluării, ca în căutare
+    rng = random.Random(seed)
+    position = Position.from_fen(fen)
+    moves = []
+    for _ in range(plies):
+        legal = position.generate_legal_moves()
+        if not legal:
+            break
+        move = rng.choice(legal)
+        moves.append(move)
+        position.make_move(move)
+    for _ in moves:
+        position.unmake_move()
+    return position, moves
+
+
+def check_accumulator(network, cycles=20000, fens=BENCH_FENS, seed=0):
+    """Plimbări aleatoare cu make/unmake; după fiecare mutare și la întoarcerea
+    la rădăcină, acumulatorul trebuie să fie exact cel recalculat"""
+    rng = random.Random(seed)
+    done = 0
+    while done < cycles:
+        position = Position.from_fen(fens[done % len(fens)])
+        accumulator = network.attach(position)
+        root = accumulator.values.copy()
+        for _ in range(rng.randint(1, 40)):
+            legal = position.generate_legal_moves()
+            if not legal:
+                break
+            position.make_move(rng.choice(legal))
+            accumulator.check(position)
+            done += 1
+        while position.history:
+            position.unmake_move()
+        if not np.array_equal(accumulator.values, root):
+            raise AssertionError("Acumulatorul nu revine la rădăcină după unmake")
+    print(f"{done} make/unmake cycles, accumulator exact")
+    return done
+
+
+def benchmark(network, rounds=200, fens=BENCH_FENS):
+    """Evaluări pe secundă: evaluatorul scris de mână, NNUE incremental
+    (make/unmake + evaluare) și NNUE recalculat complet la fiecare frunză"""
+    rows = {}
+    bot = ChessBot()
+    walks = [_walk(fen, 12, i) for i, fen in enumerate(fens)]
+
+    def run(evaluate, incremental):
+        count = 0
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for position, moves in walks:
+                if incremental:
+                    network.attach(position)
+                for move in moves:
+                    position.make_move(move)
+                    evaluate(position)
+                    count += 1
+                for _ in moves:
+                    position.unmake_move()
+                position.accumulator = None
+        elapsed = time.perf_counter() - start
+        return count / elapsed if elapsed > 0 else 0.0
+
+    def hand_written(position):
+        bot.position = position
+        return bot.evaluate_board()
+
+    def full_refresh(position):
+        network.attach(position)
+        return network.evaluate(position)
+
+    rows['hand-written'] = run(hand_written, False)
+    rows['nnue incremental'] = run(network.evaluate, True)
+    rows['nnue full refresh'] = run(full_refresh, False)
+    for name, rate in rows.items():
+        print(f"{name:18} {rate:>10.0f} evals/s (including make/unmake)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NNUE-style evaluator tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help="compare evals/sec with the hand-written evaluator")
+    bench.add_argument('--weights', help="network file (default: random network)")
+    bench.add_argument('--hidden', type=int, default=128)
+    bench.add_argument('--rounds', type=int, default=200)
+    check = sub.add_parser('check', help="verify incremental updates against full refreshes")
+    check.add_argument('--weights', help="network file (default: random network)")
+    check.add_argument('--hidden', type=int, default=128)
+    check.add_argument('--cycles', type=int, default=20000)
+    rand = sub.add_parser('random', help="write a random network in the flat binary format")
+    rand.add_argument('path')
+    rand.add_argument('--hidden', type=int, default=128)
+    rand.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'random':
+        NnueNetwork.random(args.hidden, args.seed).save(args.path)
+        return 0
+    network = NnueNetwork.load(args.weights) if args.weights else NnueNetwork.random(args.hidden)
+    if args.command == 'check':
+        check_accumulator(network, args.cycles)
+        return 0
+    benchmark(network, args.rounds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Căutare paralelă pentru ChessBot, cu împărțirea mutărilor de la rădăcină.
+
+Fiecare proces din pool are propriul ChessBot, cu tabela de transpoziție
+păstrată între căutări. Mutările de la rădăcină sunt ordonate în procesul
+principal și împărțite round-robin, ca fiecare worker să primească și
+mutări bune. Rezultatele se combină la cea mai mare adâncime terminată
+de workerii care au terminat cel puțin o iterație, iar scorul rădăcinii e
+scris înapoi în tabela locală. Workerii au aceeași configurație ca botul
+local (opțiuni de căutare, tablebases, NNUE); rezultatele din tablebase sau
+din solverul de mat ale căutării locale preliminare se întorc direct.
+Poziția se trimite workerilor codată cu Position.pack (32 de octeți), nu
+ca obiect serializat cu pickle.
+
+Benchmark de scalare:
+
+    python chess_parallel.py --workers 4 --depth 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chess import EXACT, ChessBot, Position, SearchStats, move_to_str
+
+# Botul fiecărui proces worker, creat o singură dată de _init_worker
+_worker_bot = None
+
+
+def _init_worker(options):
+    global _worker_bot
+    _worker_bot = ChessBot(**options)
+
+
+def _search_subset(packed, root_moves, depth, time_limit):
+    bot = _worker_bot
+    bot.position = Position.unpack(packed)
+    bot.search(depth, time_limit, root_moves=root_moves)
+    return bot.iterations, bot.nodes, bot.last_stats
+
+
+class ParallelSearch:
+    def __init__(self, workers=None, tt_size_mb=16, bot=None):
+        self.workers = workers or os.cpu_count() or 1
+        # Botul local ordonează mutările și face căutarea cu un singur worker
+        self.bot = bot if bot is not None else ChessBot(tt_size_mb=tt_size_mb)
+        self.executor = None
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                initargs=(self.bot.worker_options,))
+        self.nodes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def search(self, position, depth=None, time_limit=None):
+        """Întoarce (mutare, scor, adâncime), ca ChessBot.search"""
+        bot = self.bot
+        start = time.perf_counter()
+        saved = bot.position
+        bot.position = position
+        try:
+            moves = position.generate_legal_moves()
+            if self.executor is None or len(moves) < 2:
+                # Un singur worker: exact căutarea secvențială, deci determinist
+                result = bot.search(depth, time_limit)
+                self.nodes = bot.nodes
+                return result
+
+            # O căutare scurtă umple tabela locală și dă ordinea mutărilor
+            first, pre_score, pre_depth = bot.search(min(depth or 2, 2))
+            if bot.last_stats.source != 'search':
+                # Rezolvată din tablebase sau de solverul de mat: nu mai e nimic de căutat
+                self.nodes = bot.nodes
+                return first, pre_score, pre_depth
+            bot._order_moves(moves, first, 0)
+            chunks = [moves[i::self.workers] for i in range(self.workers)]
+            # Poziția circulă între procese în codarea compactă de 32 de octeți
+            packed = position.pack()
+            futures = [self.executor.submit(_search_subset, packed, chunk, depth, time_limit)
+                       for chunk in chunks if chunk]
+            results = [future.result() for future in futures]
+        finally:
+            bot.position = saved
+
+        self.nodes = sum(nodes for _, nodes, _ in results)
+        stats = SearchStats(source='parallel')
+        for _, _, worker_stats in results:
+            stats.merge(worker_stats)
+        # Un worker oprit înainte de prima iterație nu are nimic de spus despre mutările lui
+        results = [result for result in results if result[0]]
+        if not results:
+            return first, pre_score, pre_depth
+        completed = min(iterations[-1][0] for iterations, _, _ in results)
+        # La egalitate câștigă mutarea care era prima în ordonare, ca rezultatul să fie stabil
+        rank = {move: i for i, move in enumerate(moves)}
+        best_move, best_score = None, None
+        for iterations, _, _ in results:
+            _, move, score, _ = next(it for it in iterations if it[0] == completed)
+            if (best_score is None or score > best_score
+                    or (score == best_score and rank[move] < rank[best_move])):
+                best_move, best_score = move, score
+        bot.tt.store(position.key, completed, EXACT, best_score, best_move)
+        bot.last_score, bot.last_depth = best_score, completed
+        stats.depth, stats.score = completed, best_score
+        stats.seconds = time.perf_counter() - start
+        stats.pv = [move_to_str(best_move)]
+        bot.last_stats = stats
+        bot._log_stats(stats)
+        return best_move, best_score, completed
+
+
+# ========================= BENCHMARK =========================
+
+BENCH_POSITIONS = [
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+]
+
+
+def benchmark(max_workers, depth=4, fens=BENCH_POSITIONS):
+    """Rulează aceleași căutări cu 1..max_workers procese și raportează accelerarea"""
+    rows = []
+    base_time = None
+    for workers in range(1, max_workers + 1):
+        nodes = 0
+        elapsed = 0.0
+        with ParallelSearch(workers) as parallel:
+            for fen in fens:
+                start = time.perf_counter()
+                parallel.search(Position.from_fen(fen), depth)
+                elapsed += time.perf_counter() - start
+                nodes += parallel.nodes
+        if base_time is None:
+            base_time = elapsed
+        row = {
+            'workers': workers,
+            'seconds': elapsed,
+            'nodes': nodes,
+            'nps': nodes / elapsed if elapsed > 0 else 0.0,
+            'speedup': base_time / elapsed if elapsed > 0 else 0.0,
+        }
+        rows.append(row)
+        print(f"{workers:3} workers: {elapsed:7.2f}s {nodes:>9} nodes "
+              f"{row['nps']:>9.0f} nps  speedup {row['speedup']:.2f}x")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel search scaling benchmark")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--depth", type=int, default=4)
+    args = parser.parse_args()
+    benchmark(args.workers, args.depth)
+
+
+if __name__ == "__main__":
+    main()
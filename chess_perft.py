@@ -0,0 +1,83 @@
+"""Suita perft pentru generatorul de mutări din chess.py.
+
+Numără frunzele pe poziții standard (încărcate din FEN) și le compară cu
+valorile de referință; raportează și nodurile pe secundă. Rulează după
+orice modificare a generatorului:
+
+    python chess_perft.py --depth 4
+"""
+import argparse
+import sys
+
+from chess import ChessBot, Position
+
+# (nume, FEN, {adâncime: frunze})
+PERFT_POSITIONS = [
+    ("startpos", "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    ("position3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624, 6: 11030083}),
+    ("position4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("position4-mirrored", "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("position5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    ("position6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     {1: 46, 2: 2079, 3: 89890, 4: 3894594}),
+    # Cazuri speciale: en passant ilegal, rocadă prin șah, promovări
+    ("illegal-ep-1", "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1", {6: 1440467}),
+    ("illegal-ep-2", "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1", {6: 1134888}),
+    ("ep-capture-checks", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1", {6: 1015133}),
+    ("castling-rights", "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1", {4: 1274206}),
+    ("promote-out-of-check", "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1", {6: 3821001}),
+    ("underpromotion", "8/P1k5/K7/8/8/8/8/8 w - - 0 1", {6: 92683}),
+    ("self-stalemate", "K1k5/8/P7/8/8/8/8/8 w - - 0 1", {6: 2217}),
+    ("promote-to-check", "8/k1P5/8/1K6/8/8/8/8 w - - 0 1", {7: 567584}),
+]
+
+
+def run_suite(max_depth=4, verbose=True):
+    """Rulează toate pozițiile până la max_depth; întoarce True dacă toate numărătorile corespund"""
+    bot = ChessBot()
+    failures = 0
+    total_nodes = 0
+    total_seconds = 0.0
+    for name, fen, expected in PERFT_POSITIONS:
+        for depth in sorted(expected):
+            if depth > max_depth:
+                continue
+            bot.position = Position.from_fen(fen)
+            result = bot.perft(depth)
+            total_nodes += result['nodes']
+            total_seconds += result['seconds']
+            ok = result['nodes'] == expected[depth]
+            if not ok:
+                failures += 1
+            if verbose:
+                status = "ok" if ok else f"FAIL (expected {expected[depth]})"
+                print(f"{name:22} depth {depth}: {result['nodes']:>10} "
+                      f"{result['seconds']:8.2f}s {result['nps']:>10.0f} nps  {status}")
+    if verbose:
+        nps = total_nodes / total_seconds if total_seconds > 0 else 0.0
+        print(f"\nTotal: {total_nodes} nodes in {total_seconds:.2f}s ({nps:.0f} nps), {failures} failures")
+    return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft correctness and speed suite")
+    parser.add_argument("--depth", type=int, default=4, help="maximum depth to run (default 4)")
+    parser.add_argument("--fen", help="run divide on a single position instead of the suite")
+    args = parser.parse_args()
+    if args.fen:
+        bot = ChessBot()
+        bot.position = Position.from_fen(args.fen)
+        bot.divide(args.depth)
+        return 0
+    return 0 if run_suite(args.depth) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
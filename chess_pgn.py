@@ -0,0 +1,116 @@
+"""Citire PGN în flux: partidele sunt produse pe rând, fără să se încarce tot fișierul."""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+_TOKEN = re.compile(r'\{|\}|\(|\)|;|[^\s{}();]+')
+_HEADER = re.compile(r'\[\s*(\w+)\s+"(.*)"\s*\]')
+_MOVE_NUMBER = re.compile(r'^\d+\.+')
+
+
+@dataclass
+class PgnGame:
+    headers: Dict[str, str] = field(default_factory=dict)
+    moves: List[str] = field(default_factory=list)
+
+    @property
+    def result(self):
+        return self.headers.get('Result', '*')
+
+
+def read_games(stream):
+    """Generator de PgnGame dintr-un flux text PGN. Comentariile, variantele
+    și NAG-urile sunt ignorate; mutările rămân în SAN, ca în fișier."""
+    game = PgnGame()
+    comment = False
+    variation = 0
+    for line in stream:
+        if not comment and line.startswith('['):
+            match = _HEADER.match(line.strip())
+            if match:
+                if game.moves:
+                    yield game
+                    game = PgnGame()
+                game.headers[match.group(1)] = match.group(2)
+                continue
+        for token in _TOKEN.findall(line):
+            if comment:
+                if token == '}':
+                    comment = False
+                continue
+            if token == '{':
+                comment = True
+            elif token == ';':
+                break
+            elif token == '(':
+                variation += 1
+            elif token == ')':
+                variation = max(0, variation - 1)
+            elif variation or token.startswith('$'):
+                continue
+            elif token in RESULTS:
+                game.headers.setdefault('Result', token)
+                yield game
+                game = PgnGame()
+            else:
+                token = _MOVE_NUMBER.sub('', token)
+                if token:
+                    game.moves.append(token)
+    if game.moves:
+        yield game
+
+
+def read_move_lists(stream):
+    """Generator de PgnGame dintr-un fișier text cu câte o partidă pe linie
+    (mutări în SAN sau în notația de coordonate, separate prin spații)"""
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        game = PgnGame()
+        for token in line.split():
+            if token in RESULTS:
+                game.headers['Result'] = token
+                continue
+            token = _MOVE_NUMBER.sub('', token)
+            if token:
+                game.moves.append(token)
+        yield game
+
+
+def write_game(stream, headers, moves, result='*', width=80, annotations=None):
+    """Scrie o partidă PGN: antetele în ordinea dată, apoi mutările SAN numerotate.
+    annotations, dacă e dat, are pentru fiecare mutare un text (NAG, comentariu,
+    variantă) pus imediat după ea."""
+    for name, value in headers.items():
+        stream.write(f'[{name} "{value}"]\n')
+    stream.write('\n')
+    fen = headers.get('FEN')
+    black_first = fen is not None and fen.split()[1] == 'b'
+    number = int(fen.split()[5]) if fen is not None and len(fen.split()) > 5 else 1
+    tokens = []
+    # Mutarea negrului primește „N...” la început și după o adnotare
+    resume = black_first
+    for i, san in enumerate(moves):
+        white_move = (i % 2 == 0) != black_first
+        if white_move:
+            tokens.append(f"{number}.")
+        elif resume:
+            tokens.append(f"{number}...")
+        tokens.append(san)
+        resume = False
+        if annotations is not None and annotations[i]:
+            tokens.extend(annotations[i].split(' '))
+            resume = True
+        if not white_move:
+            number += 1
+    tokens.append(result)
+    line = ''
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > width:
+            stream.write(line + '\n')
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    stream.write(line + '\n\n')
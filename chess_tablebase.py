@@ -0,0 +1,582 @@
+"""Tabele de final generate prin analiză retrogradă, pentru 3 și 4 piese.
+
+Fiecare set de material (ex. KQvK, KRvKP) are un fișier <semnătură>.tb: un
+antet scurt, urmat de câte un octet pentru fiecare index
+(partea la mutare) + 2 * (perechea de regi, apoi pătratele celorlalte piese
+în baza 64). Prin simetrie, regele alb e mereu în jumătatea a-d a tablei,
+iar fără pioni în triunghiul a1-d1-d4; perechile de regi alăturați lipsesc.
+Un set de 4 piese ocupă astfel 3.8 MB fără pioni și 14.8 MB cu pioni, față
+de 32 MB pentru toate pozițiile brute. Octetul e:
+    0         remiză (sau poziție necunoscută)
+    1..127    câștig pentru partea la mutare, mat în atâtea plies
+    128..254  pierdere, mat în (octet - 128) plies
+    255       poziție imposibilă
+Tabelele se deschid prin mmap, doar la prima poziție cu acel material.
+Pozițiile cu drept de rocadă sau en passant nu se sondează; la generare,
+valoarea unui avans dublu care permite capturarea en passant ține cont și
+de această captură.
+
+Generarea e în Python pur: un set de 3 piese durează de ordinul minutelor,
+unul de 4 piese de ordinul orelor.
+
+    python chess_tablebase.py generate KQvK KRvK --dir tablebases
+    python chess_tablebase.py probe "8/8/8/4k3/8/8/8/4K2Q w - - 0 1" --dir tablebases
+"""
+import argparse
+import mmap
+import os
+import sys
+import time
+from array import array
+
+from chess import (BLACK, EN_PASSANT, KING, KING_ATTACKS, KNIGHT, KNIGHT_ATTACKS, MATE_SCORE,
+                   PAWN, PROMOTION_MASK, QUEEN, ROOK, WHITE, Position, bishop_attacks,
+                   move_to_str, queen_attacks, rook_attacks)
+
+MAGIC = b'PYTB2'
+DRAW, WIN, LOSS = 0, 1, 2
+INVALID = 255
+MAX_DTM = 126
+PIECE_LETTERS = 'PNBRQK'
+# Ordinea pieselor într-o semnătură: regele, apoi descrescător după valoare
+SIGNATURE_ORDER = 'KQRBNP'
+# Materialul cu care nu se poate da mat deloc nu are nevoie de tabelă
+DRAWN_SIGNATURES = {'KvK', 'KBvK', 'KNvK'}
+
+
+def _transpose(sq):
+    return ((sq & 7) << 3) | (sq >> 3)
+
+
+# Simetriile tablei ca permutări de pătrate; primele două (identitatea și
+# oglindirea coloanelor) păstrează direcția pionilor
+SYMMETRY_MAPS = [[(_transpose(sq) if transpose else sq) ^ flip for sq in range(64)]
+                 for transpose in (False, True) for flip in (0, 7, 56, 63)]
+
+
+def _canonical_kings(white_king, black_king, pawns):
+    file, rank = white_king & 7, white_king >> 3
+    if file > 3:
+        return False
+    if pawns:
+        return True
+    # Fără pioni: triunghiul a1-d1-d4; pe diagonală, regele negru nu e deasupra ei
+    if rank > file:
+        return False
+    return rank < file or black_king >> 3 <= black_king & 7
+
+
+def _king_pairs(pawns):
+    """(regele alb, regele negru) -> index, pentru perechile canonice"""
+    pairs = {}
+    for white_king in range(64):
+        for black_king in range(64):
+            if (black_king != white_king and not KING_ATTACKS[white_king] >> black_king & 1
+                    and _canonical_kings(white_king, black_king, pawns)):
+                pairs[(white_king, black_king)] = len(pairs)
+    return pairs
+
+
+KING_PAIRS = [_king_pairs(False), _king_pairs(True)]
+
+
+def _side_string(position, color):
+    letters = []
+    for letter in SIGNATURE_ORDER:
+        ptype = PIECE_LETTERS.index(letter)
+        letters.append(letter * position.pieces[color * 6 + ptype].bit_count())
+    return ''.join(letters)
+
+
+def _side_strength(side):
+    values = {'K': 0, 'Q': 9, 'R': 5, 'B': 3, 'N': 3, 'P': 1}
+    return sum(values[letter] for letter in side), side
+
+
+def signature_of(position):
+    """(semnătură canonică, flipped); flipped înseamnă că negrul e partea
+    mai puternică și poziția trebuie oglindită pentru tabelă"""
+    white = _side_string(position, WHITE)
+    black = _side_string(position, BLACK)
+    if _side_strength(black) > _side_strength(white):
+        return f"{black}v{white}", True
+    return f"{white}v{black}", False
+
+
+def canonical_signature(white, black):
+    if _side_strength(black) > _side_strength(white):
+        white, black = black, white
+    order = SIGNATURE_ORDER.index
+    white = ''.join(sorted(white, key=order))
+    black = ''.join(sorted(black, key=order))
+    return f"{white}v{black}"
+
+
+def signature_pieces(signature):
+    """Codurile pieselor (color * 6 + tip) în ordinea din index"""
+    white, black = signature.split('v')
+    return ([PIECE_LETTERS.index(letter) for letter in white]
+            + [6 + PIECE_LETTERS.index(letter) for letter in black])
+
+
+def child_signatures(signature):
+    """Seturile de material în care se poate ajunge prin captură sau promovare"""
+    white, black = signature.split('v')
+    children = set()
+    for side, other, is_white in ((white, black, True), (black, white, False)):
+        for i, letter in enumerate(side):
+            if letter == 'K':
+                continue
+            rest = side[:i] + side[i + 1:]
+            if letter != 'P':
+                children.add(canonical_signature(rest, other) if is_white
+                             else canonical_signature(other, rest))
+            else:
+                for promoted in 'QRBN':
+                    side_after = rest + promoted
+                    children.add(canonical_signature(side_after, other) if is_white
+                                 else canonical_signature(other, side_after))
+    return children
+
+
+def encode_value(result, dtm):
+    if result == WIN:
+        return dtm
+    if result == LOSS:
+        return 128 + dtm
+    return 0
+
+
+def decode_value(value):
+    if value == 0 or value == INVALID:
+        return DRAW, 0
+    if value < 128:
+        return WIN, value
+    return LOSS, value - 128
+
+
+class Table:
+    def __init__(self, signature, data):
+        self.signature = signature
+        self.pieces = signature_pieces(signature)
+        self.data = data
+        pawns = any(piece % 6 == PAWN for piece in self.pieces)
+        self.king_pairs = KING_PAIRS[pawns]
+        self.symmetries = SYMMETRY_MAPS[:2] if pawns else SYMMETRY_MAPS
+        self.black_king = self.pieces.index(6 + KING)
+        self.others = [i for i in range(len(self.pieces)) if i not in (0, self.black_king)]
+
+    def size(self):
+        return len(self.king_pairs) << (6 * len(self.others) + 1)
+
+    def compact_index(self, squares, side):
+        """Indexul din fișier pentru pătratele în ordinea din semnătură"""
+        for symmetry in self.symmetries:
+            pair = self.king_pairs.get((symmetry[squares[0]], symmetry[squares[self.black_king]]))
+            if pair is not None:
+                break
+        index = pair
+        for i in self.others:
+            index = (index << 6) | symmetry[squares[i]]
+        return (index << 1) | side
+
+    def pack(self, values):
+        """Tabela compactă din valorile tuturor pozițiilor brute (indexate ca la generare)"""
+        data = bytearray(self.size())
+        count = len(self.others)
+        shifts = [6 * i for i in self.others]
+        for (white_king, black_king), pair in self.king_pairs.items():
+            kings = white_king | (black_king << (6 * self.black_king))
+            base = pair << (6 * count)
+            for rest in range(1 << (6 * count)):
+                raw = kings
+                for j, shift in enumerate(shifts):
+                    raw |= ((rest >> (6 * (count - 1 - j))) & 63) << shift
+                index = (base | rest) << 1
+                data[index] = values[raw << 1]
+                data[index | 1] = values[(raw << 1) | 1]
+        return data
+
+    def index(self, position, flipped):
+        # Piesele identice se atribuie în ordinea pătratelor; ambele ordini
+        # sunt în tabelă cu aceeași valoare
+        squares = []
+        used = {}
+        for piece in self.pieces:
+            source = (piece + 6) % 12 if flipped else piece
+            bb = position.pieces[source]
+            for _ in range(used.get(source, 0)):
+                bb &= bb - 1
+            used[source] = used.get(source, 0) + 1
+            sq = (bb & -bb).bit_length() - 1
+            if flipped:
+                sq ^= 56
+            squares.append(sq)
+        side = position.side ^ 1 if flipped else position.side
+        return self.compact_index(squares, side)
+
+    def probe(self, position, flipped):
+        return decode_value(self.data[self.index(position, flipped)])
+
+
+class Tablebases:
+    """Colecție de tabele dintr-un director, încărcate leneș, pe semnătură"""
+
+    def __init__(self, directory, max_pieces=4):
+        self.directory = directory
+        self.max_pieces = max_pieces
+        self._tables = {}
+        self._files = []
+        self.probes = 0
+        self.hits = 0
+
+    def close(self):
+        for handle, mapped in self._files:
+            mapped.close()
+            handle.close()
+        self._files = []
+        self._tables = {}
+
+    def path_for(self, signature):
+        return os.path.join(self.directory, signature + '.tb')
+
+    def table(self, signature):
+        if signature in self._tables:
+            return self._tables[signature]
+        table = None
+        path = self.path_for(signature)
+        if os.path.exists(path):
+            handle = open(path, 'rb')
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            header = len(MAGIC) + 1 + mapped[len(MAGIC)]
+            if mapped[:len(MAGIC)] != MAGIC or mapped[len(MAGIC) + 1:header].decode() != signature:
+                raise ValueError(f"Invalid tablebase file: {path}")
+            self._files.append((handle, mapped))
+            table = Table(signature, memoryview(mapped)[header:])
+        self._tables[signature] = table
+        return table
+
+    def add_table(self, table):
+        self._tables[table.signature] = table
+
+    def probe(self, position):
+        """(rezultat, dtm) din perspectiva părții la mutare sau None"""
+        occupied = position.occupied[0] | position.occupied[1]
+        if occupied.bit_count() > self.max_pieces or position.castling or position.ep is not None:
+            return None
+        self.probes += 1
+        signature, flipped = signature_of(position)
+        if signature in DRAWN_SIGNATURES:
+            self.hits += 1
+            return DRAW, 0
+        table = self.table(signature)
+        if table is None:
+            return None
+        self.hits += 1
+        return table.probe(position, flipped)
+
+    def probe_score(self, position, ply):
+        """Scorul pentru căutare (perspectiva părții la mutare) sau None"""
+        entry = self.probe(position)
+        if entry is None:
+            return None
+        result, dtm = entry
+        if result == WIN:
+            return MATE_SCORE - ply - dtm
+        if result == LOSS:
+            return -MATE_SCORE + ply + dtm
+        return 0
+
+    def best_move(self, position):
+        """(mutare, rezultat, dtm) perfectă din tabele, sau None dacă poziția nu e acoperită"""
+        if self.probe(position) is None:
+            return None
+        best = None
+        best_key = None
+        for move in position.generate_legal_moves():
+            position.make_move(move)
+            entry = self.probe(position)
+            position.unmake_move()
+            if entry is None:
+                return None
+            result, dtm = entry
+            # Preferăm: adversarul pierde repede > remiză > adversarul câștigă cât mai târziu
+            if result == LOSS:
+                key = (2, -dtm)
+            elif result == DRAW:
+                key = (1, 0)
+            else:
+                key = (0, dtm)
+            if best_key is None or key > best_key:
+                best_key = key
+                best = (move, {2: WIN, 1: DRAW, 0: LOSS}[key[0]],
+                        dtm + 1 if key[0] != 1 else 0)
+        return best
+
+
+# ========================= GENERARE =========================
+
+def _place(squares, pieces, side):
+    position = Position()
+    for piece, sq in zip(pieces, squares):
+        position.put_piece(piece, sq)
+    position.set_side(side)
+    return position
+
+
+def _predecessors(squares, pieces, side, occupied):
+    """Indicii pozițiilor din care se ajunge aici printr-o mutare fără
+    captură și fără promovare a părții care tocmai a mutat"""
+    mover = side ^ 1
+    for i, piece in enumerate(pieces):
+        if piece // 6 != mover:
+            continue
+        sq = squares[i]
+        ptype = piece % 6
+        if ptype == PAWN:
+            step = -8 if mover == WHITE else 8
+            origins = []
+            origin = sq + step
+            rank = origin >> 3
+            if 1 <= rank <= 6 and not occupied >> origin & 1:
+                origins.append(origin)
+                double = origin + step
+                if (rank == 2 and mover == WHITE or rank == 5 and mover == BLACK) \
+                        and not occupied >> double & 1:
+                    origins.append(double)
+        else:
+            if ptype == KNIGHT:
+                targets = KNIGHT_ATTACKS[sq]
+            elif ptype == KING:
+                targets = KING_ATTACKS[sq]
+            elif ptype == QUEEN:
+                targets = queen_attacks(sq, occupied)
+            elif ptype == ROOK:
+                targets = rook_attacks(sq, occupied)
+            else:
+                targets = bishop_attacks(sq, occupied)
+            targets &= ~occupied
+            origins = []
+            while targets:
+                bit = targets & -targets
+                targets ^= bit
+                origins.append(bit.bit_length() - 1)
+        base = 0
+        for j, other in enumerate(squares):
+            if j != i:
+                base |= other << (6 * j)
+        for origin in origins:
+            yield ((base | (origin << (6 * i))) << 1) | mover
+
+
+def _link_en_passant(position, move, index, pawn, tablebases, ep_links, events):
+    """Pentru un avans dublu după care adversarul poate captura en passant,
+    reține valoarea celei mai bune capturi (copilul din tabelă nu are dreptul
+    en passant) și, dacă ea câștigă, programează mutarea ca pierzătoare"""
+    position.make_move(move)
+    best = None
+    if position.ep is not None:
+        for reply in position.generate_legal_moves():
+            if reply >> 15 != EN_PASSANT:
+                continue
+            position.make_move(reply)
+            result, dtm = tablebases.probe(position)
+            position.unmake_move()
+            # Din perspectiva celui care capturează
+            if result == LOSS:
+                key = (2, -dtm)
+            elif result == DRAW:
+                key = (1, 0)
+            else:
+                key = (0, dtm)
+            if best is None or key > best:
+                best = key
+    position.unmake_move()
+    if best is None:
+        return
+    result = {2: WIN, 1: DRAW, 0: LOSS}[best[0]]
+    dtm = abs(best[1]) + 1 if result != DRAW else 0
+    rest = (index >> 1) & ~(63 << (6 * pawn)) | ((move >> 6) & 63) << (6 * pawn)
+    link = (index, (rest << 1) | ((index & 1) ^ 1))
+    ep_links[link] = (result, dtm)
+    if result == WIN:
+        events.setdefault(dtm + 1, []).append((index, False, link))
+
+
+def generate_table(signature, tablebases, verbose=True):
+    """Generează tabela prin analiză retrogradă și o scrie în directorul colecției"""
+    for child in sorted(child_signatures(signature)):
+        if child not in DRAWN_SIGNATURES and tablebases.table(child) is None:
+            generate_table(child, tablebases, verbose)
+
+    start = time.perf_counter()
+    pieces = signature_pieces(signature)
+    n = len(pieces)
+    size = 2 << (6 * n)
+    values = bytearray(size)
+    done = bytearray(size)
+    remaining = array('B', bytes(size))
+    # nivel -> [(index, mutarea câștigă, legătură en passant sau None)]
+    events = {}
+    losses = []
+    # (părinte, copil) -> (rezultat, dtm) al capturii en passant pentru partea la mutare
+    # în copil, când avansul dublu din părinte o permite
+    ep_links = {}
+    ep_done = set()
+
+    # Pasul 1: validitate, numărul de mutări și ieșirile din tabelă
+    for index in range(size):
+        side = index & 1
+        rest = index >> 1
+        squares = [(rest >> (6 * i)) & 63 for i in range(n)]
+        if len(set(squares)) != n or any(
+                piece % 6 == PAWN and (sq < 8 or sq >= 56) for piece, sq in zip(pieces, squares)):
+            values[index] = INVALID
+            done[index] = 1
+            continue
+        position = _place(squares, pieces, side)
+        if position.in_check(side ^ 1):
+            values[index] = INVALID
+            done[index] = 1
+            continue
+        moves = position.generate_legal_moves()
+        if not moves:
+            done[index] = 1
+            if position.in_check(side):
+                values[index] = encode_value(LOSS, 0)
+                losses.append(index)
+            continue
+        remaining[index] = len(moves)
+        mailbox = position.mailbox
+        for move in moves:
+            frm, to = move & 63, (move >> 6) & 63
+            if mailbox[to] is None and not move & PROMOTION_MASK:
+                if mailbox[frm] % 6 == PAWN and to - frm in (16, -16):
+                    _link_en_passant(position, move, index, squares.index(frm), tablebases,
+                                     ep_links, events)
+                continue
+            position.make_move(move)
+            entry = tablebases.probe(position)
+            position.unmake_move()
+            if entry is None or entry[0] == DRAW:
+                continue
+            result, dtm = entry
+            events.setdefault(dtm + 1, []).append((index, result == LOSS, None))
+
+    # Pasul 2: propagare înapoi, nivel cu nivel (nivel = plies până la mat)
+    level = 0
+    longest = 0
+    wins = []
+    while losses or wins or any(lvl > level for lvl in events):
+        if level + 1 > MAX_DTM:
+            raise ValueError(f"{signature}: distance to mate does not fit in a byte")
+        next_wins = []
+        next_losses = []
+        pending = events.pop(level + 1, [])
+        for index, is_win, _ in pending:
+            if is_win and not done[index]:
+                done[index] = 1
+                values[index] = encode_value(WIN, level + 1)
+                next_wins.append(index)
+        for lost in losses:
+            rest = lost >> 1
+            squares = [(rest >> (6 * i)) & 63 for i in range(n)]
+            occupied = 0
+            for sq in squares:
+                occupied |= 1 << sq
+            for parent in _predecessors(squares, pieces, lost & 1, occupied):
+                ep = ep_links.get((parent, lost))
+                if ep is not None:
+                    # Avansul dublu câștigă doar dacă și captura en passant pierde;
+                    # adversarul alege rezistența mai lungă
+                    if ep[0] != LOSS:
+                        continue
+                    if ep[1] > level:
+                        events.setdefault(ep[1] + 1, []).append((parent, True, None))
+                        continue
+                if not done[parent]:
+                    done[parent] = 1
+                    values[parent] = encode_value(WIN, level + 1)
+                    next_wins.append(parent)
+        for index, is_win, link in pending:
+            if link is not None:
+                # Avansul dublu pierde prin en passant, dacă nu l-a numărat deja copilul
+                if link in ep_done:
+                    continue
+                ep_done.add(link)
+            if not is_win and not done[index]:
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    done[index] = 1
+                    values[index] = encode_value(LOSS, level + 1)
+                    next_losses.append(index)
+        for won in wins:
+            rest = won >> 1
+            squares = [(rest >> (6 * i)) & 63 for i in range(n)]
+            occupied = 0
+            for sq in squares:
+                occupied |= 1 << sq
+            for parent in _predecessors(squares, pieces, won & 1, occupied):
+                if (parent, won) in ep_links:
+                    if (parent, won) in ep_done:
+                        continue
+                    ep_done.add((parent, won))
+                if not done[parent]:
+                    remaining[parent] -= 1
+                    if remaining[parent] == 0:
+                        done[parent] = 1
+                        values[parent] = encode_value(LOSS, level + 1)
+                        next_losses.append(parent)
+        losses, wins = next_losses, next_wins
+        level += 1
+        if losses or wins:
+            longest = level
+
+    table = Table(signature, None)
+    table.data = table.pack(values)
+    os.makedirs(tablebases.directory, exist_ok=True)
+    encoded = signature.encode()
+    with open(tablebases.path_for(signature), 'wb') as out:
+        out.write(MAGIC + bytes([len(encoded)]) + encoded)
+        out.write(table.data)
+    tablebases.add_table(table)
+    if verbose:
+        print(f"{signature}: {size} positions, {len(table.data)} stored, "
+              f"longest mate {longest} plies, {time.perf_counter() - start:.1f}s")
+    return table.data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endgame tablebase generator and prober")
+    sub = parser.add_subparsers(dest='command', required=True)
+    gen = sub.add_parser('generate', help="generate tables (and their sub-tables)")
+    gen.add_argument('signatures', nargs='+', help="material sets such as KQvK or KRvKP")
+    gen.add_argument('--dir', default='tablebases')
+    probe = sub.add_parser('probe', help="probe a FEN")
+    probe.add_argument('fen')
+    probe.add_argument('--dir', default='tablebases')
+    args = parser.parse_args()
+
+    tablebases = Tablebases(args.dir)
+    if args.command == 'generate':
+        for signature in args.signatures:
+            white, black = signature.upper().split('V')
+            if len(white + black) > 4 or white[:1] != 'K' or black[:1] != 'K':
+                parser.error(f"unsupported material set: {signature}")
+            generate_table(canonical_signature(white, black), tablebases)
+        return 0
+    position = Position.from_fen(args.fen)
+    entry = tablebases.probe(position)
+    if entry is None:
+        print("Position not covered by the available tables")
+        return 1
+    result, dtm = entry
+    print(["draw", "win", "loss"][result] + (f" (mate in {dtm} plies)" if result != DRAW else ""))
+    best = tablebases.best_move(position)
+    if best is not None:
+        print(f"best move: {move_to_str(best[0])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Front-end UCI pentru ChessBot, pe stdin/stdout.
+
+Căutarea rulează pe un fir separat, ca `stop` să fie tratat imediat: firul
+principal setează un Event pe care ChessBot îl verifică la fiecare 256 de
+noduri. La `go ponder` căutăm poziția de după mutarea așteptată fără limită
+de timp; la `ponderhit` aceeași căutare primește termenele din ceasul
+nostru, deci arborele (tabela de transpoziție, killers, istoric) continuă
+fără repornire.
+
+    python chess_uci.py
+"""
+import sys
+import threading
+import time
+
+from chess import MATE_BOUND, MATE_SCORE, SOFT_TIME_RATIO, ChessBot, Position, TranspositionTable, \
+    move_to_str
+
+ENGINE_NAME = "Pyautogui-bot ChessBot"
+ENGINE_AUTHOR = "Alex301-cell"
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+# Rezervă pentru comunicația cu GUI-ul, în secunde
+MOVE_OVERHEAD = 0.05
+DEFAULT_MOVES_TO_GO = 30
+GO_PARAMS = ('wtime', 'btime', 'winc', 'binc', 'movestogo', 'movetime', 'depth', 'nodes', 'mate')
+
+
+def format_score(score):
+    if abs(score) > MATE_BOUND:
+        plies = MATE_SCORE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+
+def parse_go(tokens):
+    params = {}
+    flags = set()
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in GO_PARAMS and i + 1 < len(tokens):
+            params[token] = int(tokens[i + 1])
+            i += 2
+        else:
+            flags.add(token)
+            i += 1
+    return params, flags
+
+
+def time_budget(params, side):
+    """Secundele alocate mutării sau None pentru căutare fără limită de timp"""
+    if 'movetime' in params:
+        return max(0.01, params['movetime'] / 1000 - MOVE_OVERHEAD)
+    left = params.get('wtime' if side == 0 else 'btime')
+    if left is None:
+        return None
+    inc = params.get('winc' if side == 0 else 'binc', 0) / 1000
+    left /= 1000
+    budget = left / max(1, params.get('movestogo', DEFAULT_MOVES_TO_GO)) + inc * 0.75
+    return max(0.01, min(budget, left * 0.5) - MOVE_OVERHEAD)
+
+
+class UciEngine:
+    def __init__(self, bot=None, output=None):
+        self.bot = bot if bot is not None else ChessBot()
+        self.output = output if output is not None else sys.stdout
+        self.stop_event = threading.Event()
+        # Setat când bestmove poate fi trimis (imediat, sau la stop/ponderhit)
+        self.release = threading.Event()
+        self.bot.stop_event = self.stop_event
+        self.bot.info_callback = self._info
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ponder_budget = None
+        self._start = 0.0
+
+    def send(self, text):
+        with self._lock:
+            self.output.write(text + "\n")
+            self.output.flush()
+
+    # ========================= COMENZI =========================
+
+    def handle(self, line):
+        """Tratează o linie de comandă; întoarce False la quit"""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {self.bot.tt.size_mb} min 1 max 1024")
+            self.send("option name Ponder type check default true")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'ucinewgame':
+            self.stop()
+            self.bot.tt.clear()
+        elif command == 'setoption':
+            self.stop()
+            self.set_option(args)
+        elif command == 'position':
+            self.stop()
+            self.set_position(args)
+        elif command == 'go':
+            self.stop()
+            self.go(args)
+        elif command == 'stop':
+            self.stop()
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'quit':
+            self.stop()
+            return False
+        return True
+
+    def set_option(self, args):
+        text = ' '.join(args)
+        if ' value ' not in text:
+            return
+        name, value = text.split(' value ', 1)
+        name = name.replace('name', '', 1).strip().lower()
+        if name == 'hash':
+            self.bot.tt = TranspositionTable(max(1, int(value)))
+
+    def set_position(self, args):
+        if 'moves' in args:
+            split = args.index('moves')
+            setup, moves = args[:split], args[split + 1:]
+        else:
+            setup, moves = args, []
+        if setup and setup[0] == 'fen':
+            position = Position.from_fen(' '.join(setup[1:]))
+        else:
+            position = Position.from_fen(START_FEN)
+        for text in moves:
+            move = position.parse_uci(text)
+            if move is None:
+                break
+            position.make_move(move)
+        self.bot.position = position
+
+    def go(self, args):
+        params, flags = parse_go(args)
+        budget = time_budget(params, self.bot.position.side)
+        ponder = 'ponder' in flags
+        self._ponder_budget = budget if ponder else None
+        # Fără limită cât timp ne gândim pe timpul adversarului sau la infinite
+        time_limit = None if ponder or 'infinite' in flags else budget
+        depth = params.get('depth')
+        self.stop_event.clear()
+        if ponder or 'infinite' in flags:
+            self.release.clear()
+        else:
+            self.release.set()
+        self._thread = threading.Thread(target=self._run, args=(depth, time_limit), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.stop_event.set()
+        self.release.set()
+        self._thread.join()
+        self._thread = None
+
+    def ponderhit(self):
+        # Căutarea curentă continuă, acum cu termenele noastre
+        budget = self._ponder_budget
+        if budget is not None:
+            now = time.perf_counter()
+            self.bot.soft_deadline = now + budget * SOFT_TIME_RATIO
+            self.bot.hard_deadline = now + budget
+        self._start = time.perf_counter()
+        self.release.set()
+
+    # ========================= CĂUTARE =========================
+
+    def _run(self, depth, time_limit):
+        bot = self.bot
+        self._start = time.perf_counter()
+        move = bot.book.choose(bot.position) if bot.book is not None else None
+        if move is None:
+            move, _, _ = bot.search(depth, time_limit)
+        # La infinite și ponder, bestmove se trimite doar după stop sau ponderhit
+        self.release.wait()
+        if move is None:
+            self.send("bestmove 0000")
+            return
+        pv = bot.principal_variation(move, 2)
+        reply = f" ponder {move_to_str(pv[1])}" if len(pv) > 1 else ""
+        self.send(f"bestmove {move_to_str(move)}{reply}")
+
+    def _info(self, depth, move, score, nodes):
+        elapsed = max(time.perf_counter() - self._start, 1e-6)
+        pv = ' '.join(move_to_str(m) for m in self.bot.principal_variation(move))
+        self.send(f"info depth {depth} score {format_score(score)} nodes {nodes} "
+                  f"nps {int(nodes / elapsed)} time {int(elapsed * 1000)} "
+                  f"hashfull {self.bot.tt.hashfull()} pv {pv}")
+
+    def loop(self, stream=None):
+        for line in stream if stream is not None else sys.stdin:
+            if not self.handle(line.strip()):
+                break
+        self.stop()
+
+
+def main():
+    UciEngine().loop()
+
+
+if __name__ == "__main__":
+    main()
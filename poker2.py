@@ -1,8 +1,9 @@
 import random
-import itertools
 from enum import Enum
 from typing import List, Tuple, Dict, Optional
-from collections import Counter
+
+from poker_equity import EquityCalculator
+from poker_eval import STRENGTH_CLASSES, evaluate, hand_category
 
 class Suit(Enum):
     HEARTS = "♥"
@@ -33,10 +34,32 @@ class Rank(Enum):
         }
         return displays[self.value]
 
-class Card:
-    def __init__(self, rank: Rank, suit: Suit):
-        self.rank = rank
-        self.suit = suit
+RANKS = list(Rank)
+SUITS = list(Suit)
+
+class Card(int):
+    """Carte ca întreg 0..51 (rang * 4 + culoare), folosită direct de poker_eval.
+    Cele 52 de instanțe sunt create o singură dată, în ALL_CARDS; Card(rank, suit)
+    întoarce instanța existentă. rank și suit sunt pentru afișare."""
+    __slots__ = ()
+    
+    def __new__(cls, rank: Rank, suit: Suit):
+        return ALL_CARDS[(rank.value - 2) * 4 + SUITS.index(suit)]
+    
+    def __reduce__(self):
+        return card_from_index, (int(self),)
+    
+    @property
+    def rank(self) -> Rank:
+        return RANKS[self >> 2]
+    
+    @property
+    def suit(self) -> Suit:
+        return SUITS[self & 3]
+    
+    @property
+    def mask(self) -> int:
+        return 1 << self
     
     def __str__(self):
         return f"{self.rank.display}{self.suit.value}"
@@ -44,6 +67,11 @@ class Card:
     def __repr__(self):
         return str(self)
 
+ALL_CARDS = [int.__new__(Card, index) for index in range(52)]
+
+def card_from_index(index: int) -> Card:
+    return ALL_CARDS[index]
+
 class HandRank(Enum):
     HIGH_CARD = 1
     PAIR = 2
@@ -62,93 +90,28 @@ class Deck:
         self.reset()
     
     def reset(self):
-        self.cards = [Card(rank, suit) for rank in Rank for suit in Suit]
+        # Aceleași 52 de instanțe la fiecare mână, doar amestecate
+        self.cards[:] = ALL_CARDS
         random.shuffle(self.cards)
     
     def deal(self) -> Card:
         return self.cards.pop()
 
+def hand_rank(strength: int) -> HandRank:
+    """Categoria HandRank pentru o forță din poker_eval"""
+    if strength == STRENGTH_CLASSES - 1:
+        return HandRank.ROYAL_FLUSH
+    return HandRank(hand_category(strength) + 1)
+
 class PokerHand:
+    """Cea mai bună mână de 5 cărți din 5-7 cărți, evaluată prin tabelele din poker_eval"""
     def __init__(self, cards: List[Card]):
-        self.cards = sorted(cards, key=lambda c: c.rank.value, reverse=True)
-        self.rank, self.rank_values = self._evaluate_hand()
-    
-    def _evaluate_hand(self) -> Tuple[HandRank, List[int]]:
-        ranks = [card.rank.value for card in self.cards]
-        suits = [card.suit for card in self.cards]
-        rank_counts = Counter(ranks)
-        
-        is_flush = len(set(suits)) == 1
-        is_straight = self._is_straight(ranks)
-        
-        # Royal Flush
-        if is_flush and is_straight and min(ranks) == 10:
-            return HandRank.ROYAL_FLUSH, [14]
-        
-        # Straight Flush
-        if is_flush and is_straight:
-            return HandRank.STRAIGHT_FLUSH, [max(ranks)]
-        
-        # Four of a Kind
-        if 4 in rank_counts.values():
-            quad = [rank for rank, count in rank_counts.items() if count == 4][0]
-            kicker = [rank for rank, count in rank_counts.items() if count == 1][0]
-            return HandRank.FOUR_OF_A_KIND, [quad, kicker]
-        
-        # Full House
-        if 3 in rank_counts.values() and 2 in rank_counts.values():
-            trips = [rank for rank, count in rank_counts.items() if count == 3][0]
-            pair = [rank for rank, count in rank_counts.items() if count == 2][0]
-            return HandRank.FULL_HOUSE, [trips, pair]
-        
-        # Flush
-        if is_flush:
-            return HandRank.FLUSH, sorted(ranks, reverse=True)
-        
-        # Straight
-        if is_straight:
-            return HandRank.STRAIGHT, [max(ranks)]
-        
-        # Three of a Kind
-        if 3 in rank_counts.values():
-            trips = [rank for rank, count in rank_counts.items() if count == 3][0]
-            kickers = sorted([rank for rank, count in rank_counts.items() if count == 1], reverse=True)
-            return HandRank.THREE_OF_A_KIND, [trips] + kickers
-        
-        # Two Pair
-        if list(rank_counts.values()).count(2) == 2:
-            pairs = sorted([rank for rank, count in rank_counts.items() if count == 2], reverse=True)
-            kicker = [rank for rank, count in rank_counts.items() if count == 1][0]
-            return HandRank.TWO_PAIR, pairs + [kicker]
-        
-        # One Pair
-        if 2 in rank_counts.values():
-            pair = [rank for rank, count in rank_counts.items() if count == 2][0]
-            kickers = sorted([rank for rank, count in rank_counts.items() if count == 1], reverse=True)
-            return HandRank.PAIR, [pair] + kickers
-        
-        # High Card
-        return HandRank.HIGH_CARD, sorted(ranks, reverse=True)
-    
-    def _is_straight(self, ranks: List[int]) -> bool:
-        sorted_ranks = sorted(set(ranks))
-        if len(sorted_ranks) != 5:
-            return False
-        
-        # Normal straight
-        if sorted_ranks[-1] - sorted_ranks[0] == 4:
-            return True
-        
-        # Wheel straight (A-2-3-4-5)
-        if sorted_ranks == [2, 3, 4, 5, 14]:
-            return True
-        
-        return False
+        self.cards = sorted(cards, reverse=True)
+        self.strength = evaluate(cards)
+        self.rank = hand_rank(self.strength)
     
     def __gt__(self, other):
-        if self.rank.value != other.rank.value:
-            return self.rank.value > other.rank.value
-        return self.rank_values > other.rank_values
+        return self.strength > other.strength
 
 class Player:
     def __init__(self, name: str, chips: int = 1000):
@@ -181,15 +144,18 @@ class PokerBot(Player):
         super().__init__(name, chips)
         self.aggression = aggression
         self.bluff_frequency = bluff_frequency
+        # Equity postflop: exact pe turn/river, altfel Monte Carlo limitat la 0.05s;
+        # PokerGame îl înlocuiește cu unul comun, ca rezultatele din cache să fie împărțite
+        self.equity_calculator = EquityCalculator(time_limit=0.05)
     
-    def calculate_hand_strength(self, community_cards: List[Card]) -> float:
-        """Calculează forța mâinii curente"""
+    def calculate_hand_strength(self, community_cards: List[Card], num_opponents: int = 1) -> float:
+        """Calculează forța mâinii curente: preflop euristic, postflop equity-ul
+        contra num_opponents mâini aleatoare"""
         all_cards = self.hand + community_cards
         if len(all_cards) < 5:
             return self._preflop_hand_strength()
         
-        best_hand = self._get_best_hand(all_cards)
-        return self._normalize_hand_strength(best_hand)
+        return self.equity_calculator.equity(self.hand, community_cards, num_opponents).equity
     
     def _preflop_hand_strength(self) -> float:
         """Evaluează forța mâinii preflop"""
@@ -197,9 +163,10 @@ class PokerBot(Player):
             return 0.1
         
         card1, card2 = self.hand
+        rank1, rank2 = (card1 >> 2) + 2, (card2 >> 2) + 2
         
         # Perechi
-        if card1.rank.value == card2.rank.value:
+        if rank1 == rank2:
             pair_strength = {
                 14: 0.95,  # AA
                 13: 0.90,  # KK
@@ -215,12 +182,12 @@ class PokerBot(Player):
                 3: 0.40,   # 33
                 2: 0.35    # 22
             }
-            return pair_strength.get(card1.rank.value, 0.35)
+            return pair_strength.get(rank1, 0.35)
         
         # Suited connectors și broadway cards
-        high_card = max(card1.rank.value, card2.rank.value)
-        low_card = min(card1.rank.value, card2.rank.value)
-        suited = card1.suit == card2.suit
+        high_card = max(rank1, rank2)
+        low_card = min(rank1, rank2)
+        suited = card1 & 3 == card2 & 3
         
         base_strength = 0.1
         
@@ -240,31 +207,6 @@ class PokerBot(Player):
         
         return min(base_strength, 0.9)
     
-    def _get_best_hand(self, cards: List[Card]) -> PokerHand:
-        """Găsește cea mai bună mână de 5 cărți"""
-        best_hand = None
-        for combo in itertools.combinations(cards, 5):
-            hand = PokerHand(list(combo))
-            if best_hand is None or hand > best_hand:
-                best_hand = hand
-        return best_hand
-    
-    def _normalize_hand_strength(self, hand: PokerHand) -> float:
-        """Normalizează forța mâinii la o valoare între 0 și 1"""
-        strength_map = {
-            HandRank.HIGH_CARD: 0.1,
-            HandRank.PAIR: 0.25,
-            HandRank.TWO_PAIR: 0.4,
-            HandRank.THREE_OF_A_KIND: 0.55,
-            HandRank.STRAIGHT: 0.7,
-            HandRank.FLUSH: 0.8,
-            HandRank.FULL_HOUSE: 0.9,
-            HandRank.FOUR_OF_A_KIND: 0.95,
-            HandRank.STRAIGHT_FLUSH: 0.98,
-            HandRank.ROYAL_FLUSH: 1.0
-        }
-        return strength_map.get(hand.rank, 0.1)
-    
     def calculate_pot_odds(self, pot_size: int, call_amount: int) -> float:
         """Calculează pot odds"""
         if call_amount == 0:
@@ -272,12 +214,12 @@ class PokerBot(Player):
         return pot_size / call_amount
     
     def make_decision(self, pot_size: int, call_amount: int, community_cards: List[Card], 
-                     min_raise: int) -> Tuple[str, int]:
+                     min_raise: int, num_opponents: int = 1) -> Tuple[str, int]:
         """Ia decizia botului"""
         if call_amount > self.chips:
             return "fold", 0
         
-        hand_strength = self.calculate_hand_strength(community_cards)
+        hand_strength = self.calculate_hand_strength(community_cards, num_opponents)
         pot_odds = self.calculate_pot_odds(pot_size, call_amount)
         
         # Calculează probabilitatea de bluff
@@ -319,11 +261,12 @@ class PokerBot(Player):
             return "fold", 0
     
     def get_decision_explanation(self, pot_size: int, call_amount: int, community_cards: List[Card], 
-                               min_raise: int) -> str:
+                               min_raise: int, num_opponents: int = 1) -> str:
         """Returnează explicația deciziei botului"""
-        hand_strength = self.calculate_hand_strength(community_cards)
+        hand_strength = self.calculate_hand_strength(community_cards, num_opponents)
         pot_odds = self.calculate_pot_odds(pot_size, call_amount)
-        action, amount = self.make_decision(pot_size, call_amount, community_cards, min_raise)
+        action, amount = self.make_decision(pot_size, call_amount, community_cards, min_raise,
+                                            num_opponents)
         
         explanation = f"Forță mână: {hand_strength:.2f}, Pot odds: {pot_odds:.1f}"
         
@@ -375,6 +318,10 @@ class PokerGame:
         self.round_stage = "preflop"
         self.advisor_mode = False
         self.advisor_bots = []
+        # Comun tuturor boților: consilierii văd aceeași mână și masă, deci
+        # după primul calcul equity-ul vine din cache. Un singur proces: la
+        # pragurile implicite, enumerările din joc sunt prea mici pentru pool
+        self.equity_calculator = EquityCalculator(time_limit=0.05)
         self.setup_advisors()
     
     def setup_advisors(self):
@@ -386,8 +333,11 @@ class PokerGame:
             AdvisorBot("Tight Tommy", "tight"),
             AdvisorBot("Loose Lucy", "loose")
         ]
+        for advisor in self.advisor_bots:
+            advisor.equity_calculator = self.equity_calculator
     
-    def get_advisor_recommendations(self, player_hand: List[Card], pot_size: int, call_amount: int, min_raise: int) -> List[str]:
+    def get_advisor_recommendations(self, player_hand: List[Card], pot_size: int, call_amount: int, min_raise: int,
+                                    num_opponents: int = 1) -> List[str]:
         """Obține recomandările de la toți boții consilieri"""
         recommendations = []
         
@@ -395,12 +345,19 @@ class PokerGame:
             # Setează mâna consilierului să fie aceeași cu a jucătorului
             advisor.hand = player_hand.copy()
             
-            decision = advisor.get_decision_explanation(pot_size, call_amount, self.community_cards, min_raise)
+            decision = advisor.get_decision_explanation(pot_size, call_amount, self.community_cards, min_raise,
+                                                        num_opponents)
             recommendations.append(f"{advisor.name}: {decision}")
         
         return recommendations
     
+    def _opponents_of(self, player: Player) -> int:
+        """Câți alți jucători sunt încă în mână"""
+        return sum(1 for p in self.players if p is not player and not p.folded)
+    
     def add_player(self, player: Player):
+        if isinstance(player, PokerBot):
+            player.equity_calculator = self.equity_calculator
         self.players.append(player)
     
     def start_hand(self):
@@ -472,8 +429,12 @@ class PokerGame:
         last_raiser = None
         
         while players_acted < len(active_players):
+            # Toți ceilalți au renunțat sau nimeni nu mai poate paria: runda s-a încheiat
+            in_hand = [p for p in self.players if not p.folded]
+            if len(in_hand) <= 1 or all(p.all_in for p in in_hand):
+                break
             player = self.players[player_index]
-            
+
             if player.folded or player.all_in:
                 player_index = (player_index + 1) % len(self.players)
                 continue
@@ -483,7 +444,8 @@ class PokerGame:
             
             if isinstance(player, PokerBot):
                 action, amount = player.make_decision(self.pot, call_amount, 
-                                                    self.community_cards, min_raise)
+                                                    self.community_cards, min_raise,
+                                                    self._opponents_of(player))
                 
                 if action == "fold":
                     player.fold()
@@ -512,7 +474,8 @@ class PokerGame:
                     print("\n" + "="*50)
                     print("RECOMANDĂRI CONSILIERI:")
                     print("="*50)
-                    recommendations = self.get_advisor_recommendations(player.hand, self.pot, call_amount, min_raise)
+                    recommendations = self.get_advisor_recommendations(player.hand, self.pot, call_amount, min_raise,
+                                                                     self._opponents_of(player))
                     for rec in recommendations:
                         print(rec)
                     print("="*50)
@@ -595,7 +558,8 @@ class PokerGame:
                             print("Introdu un număr valid!")
                 elif choice == "4" and self.advisor_mode:
                     print("\nRECOMANDĂRI CONSILIERI:")
-                    recommendations = self.get_advisor_recommendations(player.hand, self.pot, call_amount, min_raise)
+                    recommendations = self.get_advisor_recommendations(player.hand, self.pot, call_amount, min_raise,
+                                                                     self._opponents_of(player))
                     for rec in recommendations:
                         print(rec)
                     continue
@@ -641,8 +605,7 @@ class PokerGame:
         player_hands = []
         for player in active_players:
             all_cards = player.hand + self.community_cards
-            best_hand = self._get_best_hand(all_cards)
-            player_hands.append((player, best_hand))
+            player_hands.append((player, PokerHand(all_cards)))
         
         # Sortează după forța mâinii
         player_hands.sort(key=lambda x: x[1], reverse=True)
@@ -659,15 +622,6 @@ class PokerGame:
         
         print(f"\n{winner.name} câștigă {self.pot} chips cu {winning_hand.rank.name}!")
     
-    def _get_best_hand(self, cards: List[Card]) -> PokerHand:
-        """Găsește cea mai bună mână de 5 cărți"""
-        best_hand = None
-        for combo in itertools.combinations(cards, 5):
-            hand = PokerHand(list(combo))
-            if best_hand is None or hand > best_hand:
-                best_hand = hand
-        return best_hand
-    
     def play_hand(self):
         """Joacă o mână completă"""
         if not self.start_hand():
@@ -724,6 +678,8 @@ class PokerGame:
             PokerBot("Tight Tommy", 1000, 0.3, 0.02),
             PokerBot("Loose Lucy", 1000, 0.9, 0.3)
         ]
+        for bot in bot_players:
+            bot.equity_calculator = self.equity_calculator
         
         # Salvează jucătorii actuali
         original_players = self.players.copy()
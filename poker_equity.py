@@ -0,0 +1,550 @@
+"""Equity prin Monte Carlo: mâna noastră contra unor mâini aleatoare ale
+adversarilor, cu restul mesei completat aleator.
+
+Cu NumPy, eșantioanele se trag și se evaluează în loturi: cărțile fiecărui
+lot sunt o matrice (eșantioane x 7), iar evaluatorul din poker_eval devine
+vectorial: suma cheilor cărților pe rânduri, searchsorted în cheile
+sortate ale rangurilor și, doar pe rândurile cu culoare, tabela de culoare.
+Fără NumPy se folosește aceeași metodă eșantion cu eșantion.
+
+Rezultatul are și intervalul de încredere de 95% (aproximare normală);
+căutarea se oprește la numărul cerut de eșantioane sau la limita de timp.
+
+Pe turn și river, equity-ul se poate calcula exact, prin enumerarea tuturor
+runout-urilor și mâinilor adversarilor (aleatoare sau din intervale ca
+"QQ+, AKs"). Forța fiecărei mâini de adversar se evaluează o singură dată
+pe runout. Dintre perechile (runout, mâna primului adversar) se păstrează
+doar câte una din fiecare clasă de izomorfism de culori (permutările care
+lasă neschimbate mâna, masa și intervalele), cu ponderea clasei. Perechile
+se împart în bucăți între procesele unui ProcessPoolExecutor.
+EquityCalculator alege între enumerare și Monte Carlo și ține rezultatele în
+cache după (mână, masă, adversari).
+
+    python poker_equity.py Ah Kh --board "Qh Jh 2c" --opponents 2 --samples 20000
+    python poker_equity.py Ah Kh --board "Qh Jh 2c 7d" --exact --range "QQ+, AKs" --range random
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from poker_eval import (CARD_KEYS, CARDS, FLUSH_SUIT, RANK_KEY_MASK, SUIT_BITS, SUIT_SHIFT,
+                        cards_mask, evaluate_mask, load_tables)
+
+DEFAULT_SAMPLES = 2000
+BATCH_SIZE = 1000
+# z pentru intervalul de încredere de 95%
+CONFIDENCE_Z = 1.96
+RANK_LETTERS = '23456789TJQKA'
+# Ordinea culorilor din poker2.Suit: inimă, caro, treflă, pică
+SUIT_LETTERS = 'hdcs'
+
+# Enumerarea exactă se încearcă doar sub atâtea combinații (runout x mâini)
+MAX_ENUMERATION = 250000
+# Sub atâtea combinații, enumerarea rulează în procesul curent
+PARALLEL_MIN_COMBOS = 50000
+CACHE_SIZE = 4096
+# Toate cele 1326 de mâini de 2 cărți, ca măști
+ALL_COMBOS = [(1 << a) | (1 << b) for a, b in itertools.combinations(range(CARDS), 2)]
+SUIT_PERMUTATIONS = list(itertools.permutations(range(4)))
+
+# Tabelele poker_eval ca array-uri NumPy, create la primul lot
+_arrays = None
+
+
+@dataclass
+class EquityResult:
+    equity: float
+    # Jumătatea intervalului de încredere de 95%
+    margin: float
+    # Eșantioane sau, la enumerarea exactă, combinații
+    samples: int
+    seconds: float
+    exact: bool = False
+
+    @property
+    def low(self) -> float:
+        return max(0.0, self.equity - self.margin)
+
+    @property
+    def high(self) -> float:
+        return min(1.0, self.equity + self.margin)
+
+    def __str__(self):
+        if self.exact:
+            return f"{self.equity:.2%} exact ({self.samples} combinații)"
+        return f"{self.equity:.1%} ± {self.margin:.1%} ({self.samples} eșantioane)"
+
+
+def parse_card(text: str) -> int:
+    """'Ah', 'Td', '10s' -> indicele 0..51"""
+    text = text.strip()
+    rank, suit = text[:-1].upper(), text[-1].lower()
+    if rank == '10':
+        rank = 'T'
+    if len(rank) != 1 or rank not in RANK_LETTERS or suit not in SUIT_LETTERS:
+        raise ValueError(f"Carte invalidă: {text!r}")
+    return RANK_LETTERS.index(rank) * 4 + SUIT_LETTERS.index(suit)
+
+
+def parse_cards(text: str) -> List[int]:
+    return [parse_card(token) for token in text.replace(',', ' ').split()]
+
+
+# ========================= NUMPY =========================
+
+def _numpy_tables():
+    global _arrays
+    if _arrays is None:
+        flush, rank_table = load_tables()
+        keys = np.fromiter(rank_table.keys(), dtype=np.int64, count=len(rank_table))
+        values = np.fromiter(rank_table.values(), dtype=np.int32, count=len(rank_table))
+        order = np.argsort(keys)
+        _arrays = (np.array(CARD_KEYS, dtype=np.int64), np.array(FLUSH_SUIT, dtype=np.int8),
+                   np.array(flush, dtype=np.int32), keys[order], values[order],
+                   np.array([1 << (card >> 2) for card in range(CARDS)], dtype=np.int64))
+    return _arrays
+
+
+def evaluate_batch(cards):
+    """evaluate pe fiecare rând al unei matrice de cărți (n x 5..7)"""
+    card_keys, flush_suit, flush, rank_keys, rank_values, rank_bits = _numpy_tables()
+    keys = card_keys[cards].sum(axis=1)
+    strength = rank_values[np.searchsorted(rank_keys, keys & RANK_KEY_MASK)]
+    suits = flush_suit[keys >> SUIT_SHIFT]
+    rows = np.nonzero(suits >= 0)[0]
+    if rows.size:
+        flushed = cards[rows]
+        in_suit = (flushed & 3) == suits[rows, None]
+        # Rangurile din aceeași culoare sunt distincte, deci suma e și reuniunea biților
+        strength[rows] = flush[(rank_bits[flushed] * in_suit).sum(axis=1)]
+    return strength
+
+
+def _batch_scores(rng, hand, board, deck, opponents, size):
+    missing = 5 - len(board)
+    drawn = deck[np.argsort(rng.random((size, deck.size)), axis=1)[:, :missing + 2 * opponents]]
+    full_board = np.concatenate((np.broadcast_to(board, (size, len(board))), drawn[:, :missing]),
+                                axis=1)
+    ours = evaluate_batch(np.concatenate((np.broadcast_to(hand, (size, 2)), full_board), axis=1))
+    best = np.full(size, -1)
+    ties = np.zeros(size)
+    for index in range(opponents):
+        start = missing + 2 * index
+        theirs = evaluate_batch(np.concatenate((drawn[:, start:start + 2], full_board), axis=1))
+        ties += theirs == ours
+        best = np.maximum(best, theirs)
+    # Câștig 1, egalitate împărțită între cei la egalitate, pierdere 0
+    return np.where(ours > best, 1.0, np.where(ours == best, 1.0 / (ties + 1), 0.0))
+
+
+# ========================= PYTHON PUR =========================
+
+def _python_score(rng, hand_mask, board_mask, deck, missing, opponents):
+    drawn = rng.sample(deck, missing + 2 * opponents)
+    board = board_mask
+    for card in drawn[:missing]:
+        board |= 1 << card
+    ours = evaluate_mask(hand_mask | board)
+    best, ties = -1, 0
+    for index in range(opponents):
+        start = missing + 2 * index
+        theirs = evaluate_mask(board | 1 << drawn[start] | 1 << drawn[start + 1])
+        best = max(best, theirs)
+        ties += theirs == ours
+    if ours > best:
+        return 1.0
+    return 1.0 / (ties + 1) if ours == best else 0.0
+
+
+# ========================= EQUITY =========================
+
+def estimate_equity(hand: Iterable[int], board: Iterable[int] = (), opponents: int = 1,
+                    samples: int = DEFAULT_SAMPLES, time_limit: Optional[float] = None,
+                    seed: Optional[int] = None, use_numpy: bool = True) -> EquityResult:
+    """Equity-ul mâinii (2 cărți) pe masa dată (0-5 cărți) contra `opponents`
+    mâini aleatoare, din `samples` eșantioane sau cât permite time_limit"""
+    hand, board = list(hand), list(board)
+    hand_mask, board_mask = _check_cards(hand, board)
+    known = hand_mask | board_mask
+    deck = [card for card in range(CARDS) if not known >> card & 1]
+    missing = 5 - len(board)
+    if missing + 2 * opponents > len(deck):
+        raise ValueError("Prea mulți adversari pentru cărțile rămase")
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    total = squares = 0.0
+    count = 0
+    if np is not None and use_numpy:
+        rng = np.random.default_rng(seed)
+        hand_array, board_array = np.array(hand), np.array(board, dtype=np.int64)
+        deck_array = np.array(deck)
+        while count < samples:
+            size = min(BATCH_SIZE, samples - count)
+            scores = _batch_scores(rng, hand_array, board_array, deck_array, opponents, size)
+            total += scores.sum()
+            squares += (scores * scores).sum()
+            count += size
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+    else:
+        rng = random.Random(seed)
+        while count < samples:
+            score = _python_score(rng, hand_mask, board_mask, deck, missing, opponents)
+            total += score
+            squares += score * score
+            count += 1
+            if deadline is not None and not count % 256 and time.perf_counter() >= deadline:
+                break
+    return _sampled_result(total, squares, count, start)
+
+
+def _sampled_result(total, squares, count, start):
+    equity = total / count
+    variance = max(0.0, squares / count - equity * equity)
+    margin = CONFIDENCE_Z * math.sqrt(variance / count)
+    return EquityResult(equity, margin, count, time.perf_counter() - start)
+
+
+def _check_cards(hand, board):
+    if len(hand) != 2 or len(board) > 5:
+        raise ValueError("Mâna are 2 cărți, masa cel mult 5")
+    known = cards_mask(hand + board)
+    if known.bit_count() != len(hand) + len(board):
+        raise ValueError("Cărți duplicate")
+    return cards_mask(hand), cards_mask(board)
+
+
+# ========================= INTERVALE =========================
+
+Opponents = Union[int, Sequence[Union[str, Sequence[int]]]]
+
+
+def parse_range(text: str) -> List[int]:
+    """Intervalul unui adversar ca listă de măști de 2 cărți. Acceptă 'random',
+    perechi ('TT', 'TT+'), mâini suited/offsuit/oricare ('AKs', 'AQo', 'AJ',
+    'ATs+') și combinații exacte ('AhKh'), separate prin virgulă"""
+    if text.strip().lower() in ('random', 'any', '*'):
+        return list(ALL_COMBOS)
+    combos = set()
+    for token in text.replace(' ', '').split(','):
+        if token:
+            combos.update(_range_token(token))
+    if not combos:
+        raise ValueError(f"Interval gol: {text!r}")
+    return sorted(combos)
+
+
+def _range_token(token: str) -> List[int]:
+    if len(token) == 4 and token[1].lower() in SUIT_LETTERS and token[3].lower() in SUIT_LETTERS:
+        first, second = parse_card(token[:2]), parse_card(token[2:])
+        if first == second:
+            raise ValueError(f"Interval invalid: {token!r}")
+        return [(1 << first) | (1 << second)]
+    plus = token.endswith('+')
+    body = token.rstrip('+')
+    kind = ''
+    if len(body) == 3 and body[2].lower() in 'so':
+        kind, body = body[2].lower(), body[:2]
+    if len(body) != 2 or any(letter.upper() not in RANK_LETTERS for letter in body):
+        raise ValueError(f"Interval invalid: {token!r}")
+    high, low = sorted((RANK_LETTERS.index(body[0].upper()), RANK_LETTERS.index(body[1].upper())),
+                       reverse=True)
+    if high == low:
+        if kind:
+            raise ValueError(f"Interval invalid: {token!r}")
+        # 'TT+' = TT, JJ, ..., AA
+        pairs = [(rank, rank) for rank in range(high, 13 if plus else high + 1)]
+    else:
+        # 'ATs+' = ATs, AJs, AQs, AKs
+        pairs = [(high, rank) for rank in range(low, high if plus else low + 1)]
+    combos = []
+    for first, second in pairs:
+        for suit1, suit2 in itertools.product(range(4), repeat=2):
+            if first == second and suit1 >= suit2:
+                continue
+            if first != second and (kind == 's') != (suit1 == suit2) and kind:
+                continue
+            combos.append((1 << (first * 4 + suit1)) | (1 << (second * 4 + suit2)))
+    return combos
+
+
+def _opponent_ranges(opponents: Opponents) -> List[List[int]]:
+    if isinstance(opponents, int):
+        return [ALL_COMBOS] * opponents
+    return [parse_range(r) if isinstance(r, str) else list(r) for r in opponents]
+
+
+def _opponents_key(opponents: Opponents):
+    if isinstance(opponents, int):
+        return opponents
+    return tuple(r if isinstance(r, str) else tuple(sorted(r)) for r in opponents)
+
+
+def _sample_ranges(hand, board, ranges, samples, time_limit=None, seed=None) -> EquityResult:
+    """Monte Carlo contra unor intervale explicite: mâinile adversarilor se
+    trag uniform din intervale, eșantioanele cu cărți comune se resping"""
+    hand_mask, board_mask = _check_cards(hand, board)
+    dead = hand_mask | board_mask
+    missing = 5 - len(board)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    total = squares = 0.0
+    count = attempts = 0
+    while count < samples:
+        attempts += 1
+        if attempts > 100 * samples and not count:
+            raise ValueError("Intervalele nu au mâini compatibile cu masa")
+        used = dead
+        combos = []
+        for r in ranges:
+            combo = rng.choice(r)
+            if combo & used:
+                break
+            used |= combo
+            combos.append(combo)
+        else:
+            runout = rng.sample([card for card in range(CARDS) if not used >> card & 1], missing)
+            full = board_mask | cards_mask(runout)
+            ours = evaluate_mask(hand_mask | full)
+            best, ties = -1, 0
+            for combo in combos:
+                theirs = evaluate_mask(full | combo)
+                best = max(best, theirs)
+                ties += theirs == ours
+            score = 1.0 if ours > best else (1.0 / (ties + 1) if ours == best else 0.0)
+            total += score
+            squares += score * score
+            count += 1
+            if deadline is not None and not count % 256 and time.perf_counter() >= deadline:
+                break
+    return _sampled_result(total, squares, count, start)
+
+
+# ========================= ENUMERARE EXACTĂ =========================
+
+def permute_suits(mask: int, perm: Sequence[int]) -> int:
+    """Masca de cărți cu culoarea s înlocuită de perm[s]"""
+    out = 0
+    for suit in range(4):
+        out |= ((mask >> suit) & SUIT_BITS) << perm[suit]
+    return out
+
+
+def _symmetries(hand_mask, board_mask, ranges):
+    """Permutările de culori care lasă neschimbate mâna, masa și fiecare interval"""
+    result = []
+    for perm in SUIT_PERMUTATIONS:
+        if permute_suits(hand_mask, perm) != hand_mask or permute_suits(board_mask, perm) != board_mask:
+            continue
+        # Un interval complet (mai puțin cărțile moarte, deja fixate) e mereu simetric
+        if all(len(r) + _dead_combos(hand_mask | board_mask) == len(ALL_COMBOS)
+               or {permute_suits(combo, perm) for combo in r} == set(r) for r in ranges):
+            result.append(perm)
+    return result
+
+
+def _dead_combos(dead):
+    count = dead.bit_count()
+    return count * (CARDS - count) + count * (count - 1) // 2
+
+
+def _rest(ours, full, used, ranges, index, best, ties, start, identical, strengths):
+    # (suma scorurilor, număr de combinații) pentru adversarii index..N-1
+    if index == len(ranges):
+        if ours > best:
+            return 1.0, 1
+        return (1.0 / (ties + 1) if ours == best else 0.0), 1
+    total = 0.0
+    leaves = 0
+    combos = ranges[index]
+    # Adversarii identici de după primul se enumeră neordonat
+    for j in range(start if identical and index > 1 else 0, len(combos)):
+        combo = combos[j]
+        if combo & used:
+            continue
+        theirs = strengths.get(combo)
+        if theirs is None:
+            theirs = strengths[combo] = evaluate_mask(full | combo)
+        score, count = _rest(ours, full, used | combo, ranges, index + 1, max(best, theirs),
+                             ties + (theirs == ours), j + 1, identical, strengths)
+        total += score
+        leaves += count
+    return total, leaves
+
+
+def _score_items(hand_mask, board_mask, ranges, identical, items):
+    """(scor ponderat, combinații ponderate) pentru elementele
+    (pondere, runout, indicele mâinii primului adversar)"""
+    total = count = 0.0
+    full = None
+    for weight, runout, first in items:
+        if board_mask | runout != full:
+            full = board_mask | runout
+            ours = evaluate_mask(hand_mask | full)
+            strengths = {}
+        combo = ranges[0][first]
+        theirs = strengths.get(combo)
+        if theirs is None:
+            theirs = strengths[combo] = evaluate_mask(full | combo)
+        score, leaves = _rest(ours, full, hand_mask | full | combo, ranges, 1, theirs,
+                              int(theirs == ours), 0, identical, strengths)
+        total += weight * score
+        count += weight * leaves
+    return total, count
+
+
+def exact_equity(hand: Iterable[int], board: Iterable[int] = (), opponents: Opponents = 1,
+                 max_combos: int = MAX_ENUMERATION,
+                 executor: Optional[ProcessPoolExecutor] = None,
+                 workers: int = 1) -> Optional[EquityResult]:
+    """Equity-ul exact contra adversarilor aleatori (opponents = număr) sau a
+    unor intervale; None dacă enumerarea depășește max_combos. Cu executor,
+    lucrul se împarte în bucăți pentru cele `workers` procese."""
+    hand, board = list(hand), list(board)
+    hand_mask, board_mask = _check_cards(hand, board)
+    start = time.perf_counter()
+    dead = hand_mask | board_mask
+    ranges = [[combo for combo in r if not combo & dead] for r in _opponent_ranges(opponents)]
+    if not ranges:
+        # Toți ceilalți au renunțat: mâna câștigă sigur, ca în estimate_equity
+        return EquityResult(1.0, 0.0, 0, time.perf_counter() - start, exact=True)
+    identical = all(r == ranges[0] for r in ranges[1:])
+    deck = [card for card in range(CARDS) if not dead >> card & 1]
+    missing = 5 - len(board)
+    work = math.comb(len(deck), missing) * math.prod(len(r) for r in ranges)
+    if identical:
+        work //= math.factorial(len(ranges) - 1)
+    if work > max_combos:
+        return None
+    symmetries = _symmetries(hand_mask, board_mask, ranges)
+    items = []
+    for cards in itertools.combinations(deck, missing):
+        runout = cards_mask(cards)
+        for index, combo in enumerate(ranges[0]):
+            if combo & runout:
+                continue
+            weight = 1
+            if len(symmetries) > 1:
+                images = {(permute_suits(runout, perm), permute_suits(combo, perm))
+                          for perm in symmetries}
+                # Doar reprezentantul (minim) al clasei, cu ponderea clasei
+                if min(images) != (runout, combo):
+                    continue
+                weight = len(images)
+            items.append((weight, runout, index))
+    load_tables()
+    if executor is not None and work >= PARALLEL_MIN_COMBOS and len(items) > 1:
+        # Bucăți contigue, ca runout-urile să rămână grupate în același worker
+        size = max(1, -(-len(items) // (4 * workers)))
+        futures = [executor.submit(_score_items, hand_mask, board_mask, ranges, identical,
+                                   items[i:i + size]) for i in range(0, len(items), size)]
+        parts = [future.result() for future in futures]
+        total, count = sum(p[0] for p in parts), sum(p[1] for p in parts)
+    else:
+        total, count = _score_items(hand_mask, board_mask, ranges, identical, items)
+    if not count:
+        raise ValueError("Intervalele nu au mâini compatibile cu masa")
+    return EquityResult(total / count, 0.0, int(count), time.perf_counter() - start, exact=True)
+
+
+class EquityCalculator:
+    """Equity exact când enumerarea încape în max_combos (de regulă pe turn și
+    river), altfel Monte Carlo. Rezultatele rămân în cache după (mână, masă,
+    adversari), deci întrebările repetate pentru aceeași situație sunt gratuite."""
+
+    def __init__(self, workers: int = 1, max_combos: int = MAX_ENUMERATION,
+                 samples: int = DEFAULT_SAMPLES, time_limit: Optional[float] = None,
+                 cache_size: int = CACHE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_combos = max_combos
+        self.samples = samples
+        self.time_limit = time_limit
+        self.cache_size = cache_size
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def equity(self, hand: Iterable[int], board: Iterable[int] = (),
+               opponents: Opponents = 1) -> EquityResult:
+        hand, board = list(hand), list(board)
+        key = (cards_mask(hand), cards_mask(board), _opponents_key(opponents))
+        result = self.cache.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        if self.workers > 1 and self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+        result = exact_equity(hand, board, opponents, self.max_combos, self.executor, self.workers)
+        if result is None and isinstance(opponents, int):
+            result = estimate_equity(hand, board, opponents, self.samples, self.time_limit)
+        elif result is None:
+            result = _sample_ranges(hand, board, _opponent_ranges(opponents), self.samples,
+                                    self.time_limit)
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[key] = result
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo hold'em equity")
+    parser.add_argument('cards', nargs=2, help="hole cards, e.g. Ah Kd")
+    parser.add_argument('--board', default='', help="community cards, e.g. \"Qh Jh 2c\"")
+    parser.add_argument('--opponents', type=int, default=1)
+    parser.add_argument('--samples', type=int, default=20000)
+    parser.add_argument('--time', type=float, help="time budget in seconds")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--python', action='store_true', help="pure-Python sampler, without NumPy")
+    parser.add_argument('--range', action='append', dest='ranges',
+                        help="an opponent's range, e.g. \"QQ+, AKs\" (repeat per opponent)")
+    parser.add_argument('--exact', action='store_true',
+                        help="enumerate exactly when possible (turn/river), else Monte Carlo")
+    parser.add_argument('--max-combos', type=int, default=MAX_ENUMERATION * 20,
+                        help="largest enumeration attempted with --exact")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    hand = [parse_card(text) for text in args.cards]
+    board = parse_cards(args.board)
+    opponents = args.ranges if args.ranges else args.opponents
+    if args.exact:
+        with EquityCalculator(args.workers, args.max_combos, args.samples, args.time) as calculator:
+            result = calculator.equity(hand, board, opponents)
+    elif args.ranges:
+        result = _sample_ranges(hand, board, _opponent_ranges(opponents), args.samples, args.time,
+                                args.seed)
+    else:
+        result = estimate_equity(hand, board, opponents, args.samples, args.time, args.seed,
+                                 not args.python)
+    print(f"Equity: {result} în {result.seconds:.3f}s "
+          f"[{result.low:.1%}, {result.high:.1%}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
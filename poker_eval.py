@@ -0,0 +1,246 @@
+"""Evaluator de mâini de poker pe tabele precalculate, pentru 5, 6 sau 7 cărți.
+
+Orice mână primește direct forța celei mai bune combinații de 5 cărți: un
+întreg 0..7461 (cele 7462 de clase de echivalență), mai mare = mai bună.
+Cărțile sunt întregi 0..51: rang * 4 + culoare, cu rangul 0 = doiul și
+12 = asul; o mână sau o masă se poate da și ca mască de 52 de biți.
+
+Fiecare carte are o cheie: 5**rang pentru multisetul rangurilor, plus un
+contor de 3 biți pentru culoarea ei, peste bitul SUIT_SHIFT. Suma cheilor
+spune dintr-o privire dacă există o culoare cu cel puțin 5 cărți:
+    - cu culoare, forța se ia din FLUSH (8192 de intrări), după masca de 13
+      biți a rangurilor din acea culoare; cu 7 cărți nu poate exista în
+      paralel o careu sau full house, deci culoarea e mereu cea mai bună;
+    - altfel, din dicționarul rangurilor, după suma 5**rang (unică pentru
+      fiecare multiset, fiindcă un rang apare de cel mult 4 ori).
+Tabelele se generează o dată (câteva secunde) și se păstrează în CACHE_PATH.
+
+    python poker_eval.py            # generează cache-ul și măsoară viteza
+"""
+import itertools
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RANKS = 13
+CARDS = 52
+STRENGTH_CLASSES = 7462
+CATEGORY_NAMES = ['high card', 'pair', 'two pair', 'three of a kind', 'straight', 'flush',
+                  'full house', 'four of a kind', 'straight flush']
+# Prima clasă din fiecare categorie, în ordinea CATEGORY_NAMES
+CATEGORY_STARTS = [0, 1277, 4137, 4995, 5853, 5863, 7140, 7296, 7452]
+
+SUIT_SHIFT = 31
+RANK_KEY_MASK = (1 << SUIT_SHIFT) - 1
+CARD_KEYS = [5 ** (card >> 2) + (1 << (SUIT_SHIFT + 3 * (card & 3))) for card in range(CARDS)]
+# Culoarea cu cel puțin 5 cărți pentru fiecare combinație de contoare, sau -1
+FLUSH_SUIT = [next((suit for suit in range(4) if (counts >> (3 * suit)) & 7 >= 5), -1)
+              for counts in range(1 << 12)]
+WHEEL = 0b1000000001111
+# Bitul fiecărui rang pentru culoarea 0, în masca de 52 de biți
+SUIT_BITS = sum(1 << (4 * r) for r in range(RANKS))
+
+MAGIC = b'PYPK'
+VERSION = 1
+HEADER = struct.Struct('<4sII')
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'poker_tables.bin')
+
+# (tabela de culoare, dicționarul rangurilor), încărcate la prima evaluare
+_tables: Optional[Tuple[array, Dict[int, int]]] = None
+
+
+# ========================= GENERARE =========================
+
+def _straight_high(mask: int) -> Optional[int]:
+    for high in range(RANKS - 1, 3, -1):
+        if (mask >> (high - 4)) & 0b11111 == 0b11111:
+            return high
+    if mask & WHEEL == WHEEL:
+        return 3
+    return None
+
+
+def _flush_key(mask: int) -> tuple:
+    high = _straight_high(mask)
+    if high is not None:
+        return (8, high)
+    return (5,) + tuple(r for r in range(RANKS - 1, -1, -1) if mask >> r & 1)[:5]
+
+
+def _rank_key(counts: List[int]) -> tuple:
+    """Cea mai bună mână fără culoare, ca tuplu comparabil (categorie, ranguri...)"""
+    present = [r for r in range(RANKS - 1, -1, -1) if counts[r]]
+    quads = [r for r in present if counts[r] == 4]
+    trips = [r for r in present if counts[r] == 3]
+    pairs = [r for r in present if counts[r] == 2]
+    if quads:
+        return (7, quads[0], next(r for r in present if r != quads[0]))
+    if trips and (len(trips) > 1 or pairs):
+        return (6, trips[0], max(trips[1:] + pairs))
+    high = _straight_high(sum(1 << r for r in present))
+    if high is not None:
+        return (4, high)
+    if trips:
+        return (3, trips[0]) + tuple(r for r in present if r != trips[0])[:2]
+    if len(pairs) >= 2:
+        return (2, pairs[0], pairs[1], next(r for r in present if r not in pairs[:2]))
+    if pairs:
+        return (1, pairs[0]) + tuple(r for r in present if r != pairs[0])[:3]
+    return (0,) + tuple(present[:5])
+
+
+def _rank_multisets(size: int):
+    for ranks in itertools.combinations_with_replacement(range(RANKS), size):
+        counts = [0] * RANKS
+        for r in ranks:
+            counts[r] += 1
+        if max(counts) <= 4:
+            yield counts
+
+
+def generate_tables() -> Tuple[array, Dict[int, int]]:
+    """Tabela de culoare și dicționarul rangurilor, calculate de la zero"""
+    classes = {_rank_key(counts) for counts in _rank_multisets(5)}
+    classes.update(_flush_key(sum(1 << r for r in ranks))
+                   for ranks in itertools.combinations(range(RANKS), 5))
+    strength = {key: index for index, key in enumerate(sorted(classes))}
+    assert len(strength) == STRENGTH_CLASSES
+    flush = array('H', [0]) * (1 << RANKS)
+    for size in (5, 6, 7):
+        for ranks in itertools.combinations(range(RANKS), size):
+            mask = sum(1 << r for r in ranks)
+            flush[mask] = strength[_flush_key(mask)]
+    rank_table = {}
+    for size in (5, 6, 7):
+        for counts in _rank_multisets(size):
+            key = sum(count * 5 ** r for r, count in enumerate(counts))
+            rank_table[key] = strength[_rank_key(counts)]
+    return flush, rank_table
+
+
+# ========================= CACHE =========================
+
+def save_tables(tables: Tuple[array, Dict[int, int]], path: str = CACHE_PATH):
+    flush, rank_table = tables
+    keys = array('I', rank_table.keys())
+    values = array('H', rank_table.values())
+    if sys.byteorder == 'big':
+        for part in (flush, keys, values):
+            part.byteswap()
+    with open(path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+        for part in (flush, keys, values):
+            part.tofile(out)
+
+
+def load_tables(path: str = CACHE_PATH) -> Tuple[array, Dict[int, int]]:
+    """Tabelele din cache; dacă lipsesc sau sunt invalide, le generează și le salvează"""
+    global _tables
+    try:
+        with open(path, 'rb') as source:
+            magic, version, count = HEADER.unpack(source.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Invalid table file: {path}")
+            flush, keys, values = array('H'), array('I'), array('H')
+            flush.fromfile(source, 1 << RANKS)
+            keys.fromfile(source, count)
+            values.fromfile(source, count)
+        if sys.byteorder == 'big':
+            for part in (flush, keys, values):
+                part.byteswap()
+        _tables = flush, dict(zip(keys, values))
+    except (OSError, EOFError, ValueError, struct.error):
+        _tables = generate_tables()
+        try:
+            save_tables(_tables, path)
+        except OSError:
+            pass
+    return _tables
+
+
+# ========================= EVALUARE =========================
+
+def evaluate(cards: Iterable[int]) -> int:
+    """Forța celei mai bune mâini de 5 cărți din 5-7 cărți, 0..7461"""
+    flush, rank_table = _tables if _tables is not None else load_tables()
+    cards = tuple(cards)
+    key = 0
+    for card in cards:
+        key += CARD_KEYS[card]
+    suit = FLUSH_SUIT[key >> SUIT_SHIFT]
+    if suit < 0:
+        return rank_table[key & RANK_KEY_MASK]
+    mask = 0
+    for card in cards:
+        if card & 3 == suit:
+            mask |= 1 << (card >> 2)
+    return flush[mask]
+
+
+def evaluate_mask(mask: int) -> int:
+    """Ca evaluate, pentru o mască de 52 de biți cu 5-7 cărți"""
+    flush, rank_table = _tables if _tables is not None else load_tables()
+    key = 0
+    bits = mask
+    while bits:
+        low = bits & -bits
+        key += CARD_KEYS[low.bit_length() - 1]
+        bits ^= low
+    suit = FLUSH_SUIT[key >> SUIT_SHIFT]
+    if suit < 0:
+        return rank_table[key & RANK_KEY_MASK]
+    # Rangurile din culoare sunt la distanță de 4 biți; le strângem în 13 biți
+    suited = (mask >> suit) & SUIT_BITS
+    ranks = 0
+    while suited:
+        low = suited & -suited
+        ranks |= 1 << ((low.bit_length() - 1) >> 2)
+        suited ^= low
+    return flush[ranks]
+
+
+def cards_mask(cards: Iterable[int]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+
+def mask_cards(mask: int) -> List[int]:
+    cards = []
+    while mask:
+        low = mask & -mask
+        cards.append(low.bit_length() - 1)
+        mask ^= low
+    return cards
+
+
+def hand_category(strength: int) -> int:
+    """Indicele din CATEGORY_NAMES al unei forțe"""
+    return bisect_right(CATEGORY_STARTS, strength) - 1
+
+
+def benchmark(hands: int = 200000, size: int = 7) -> float:
+    """Evaluări pe secundă, pe mâini aleatoare"""
+    load_tables()
+    rng = random.Random(0)
+    deck = list(range(CARDS))
+    samples = [rng.sample(deck, size) for _ in range(hands)]
+    start = time.perf_counter()
+    for cards in samples:
+        evaluate(cards)
+    elapsed = time.perf_counter() - start
+    return hands / elapsed if elapsed > 0 else 0.0
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    load_tables()
+    print(f"Tabele încărcate în {time.perf_counter() - start:.2f}s ({CACHE_PATH})")
+    for size in (5, 6, 7):
+        print(f"{size} cărți: {benchmark(size=size):,.0f} evaluări/s")